@@ -1,22 +1,58 @@
-from typing import TypedDict, Annotated, Sequence, Optional, List, Literal
-from langchain_core.messages import BaseMessage, ToolMessage, SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
-from langgraph.graph import StateGraph, START, END
-from langgraph.graph.message import add_messages
-from dotenv import load_dotenv
 import os
-from langchain_core.tools import tool
-from langgraph.prebuilt import ToolNode
 
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from tavily import TavilyClient
+from langchain_core.messages import SystemMessage
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field
+
 from agents.state import AgentState
-from core.llm import llm
+from core.context_budget import assemble_context
+from core.llm import ANSWER_JSON_TAG, answer_llm, llm
 
 load_dotenv()
 
+# combined: one structured call returns verdict + answer | two_call: grade, then answer
+GRADER_MODE = os.getenv("GRADER_MODE", "combined").lower()
+
+
+# Field order matters: the verdict is generated first, so /chat/stream knows whether to stream the answer
+class GradedAnswer(BaseModel):
+    enough_info: bool = Field(description="True only if the context fully answers the question")
+    answer: str = Field(description="Concise answer from the context; empty when enough_info is false")
+
+
+grader_answer_llm = llm.with_structured_output(GradedAnswer).with_config(tags=[ANSWER_JSON_TAG])
+
+
+async def grade_and_answer(state: AgentState, context_list) -> AgentState:
+    """Single LLM round-trip for the RAG path (GRADER_MODE=combined)."""
+    prompt = SystemMessage(
+        content=f"""
+You are a relevance grader and answer writer.
+
+Context:
+{assemble_context(context_list)}
+
+Question:
+{state['question']}
+
+Decide whether the context fully answers the question.
+If it does, answer the question concisely using the context.
+If it does not, set enough_info to false and leave the answer empty.
+"""
+    )
+
+    graded = await grader_answer_llm.ainvoke([prompt])
+    enough_info = bool(graded.enough_info and graded.answer.strip())
+    state["enough_info"] = enough_info
 
-def unified_grader_answer_agent(state: AgentState) -> AgentState:
+    print(f"📊 Grader result: {'enough info' if enough_info else 'NOT enough info'}")
+
+    if enough_info:
+        state["final_answer"] = graded.answer.strip()
+    return state
+
+
+async def unified_grader_answer_agent(state: AgentState) -> AgentState:
     route = state.get("route")
 
     # =========================
@@ -30,12 +66,18 @@ def unified_grader_answer_agent(state: AgentState) -> AgentState:
             state["enough_info"] = False
             return state
 
+        if GRADER_MODE == "combined":
+            return await grade_and_answer(state, context_list)
+
+        # Deduplicated and budgeted once, shared by the grade and answer prompts
+        context = assemble_context(context_list)
+
         grader_prompt = SystemMessage(
             content=f"""
 You are a relevance grader.
 
 Context:
-{context_list}
+{context}
 
 Question:
 {state['question']}
@@ -45,7 +87,7 @@ Reply ONLY with 'yes' or 'no'.
 """
         )
 
-        grade_response = llm.invoke([grader_prompt])
+        grade_response = await llm.ainvoke([grader_prompt])
         enough_info = grade_response.content.strip().lower() == "yes"
         state["enough_info"] = enough_info
 
@@ -59,14 +101,14 @@ Reply ONLY with 'yes' or 'no'.
 Use the following context to answer the question concisely.
 
 Context:
-{context_list}
+{context}
 
 Question:
 {state['question']}
 """
         )
 
-        final_response = llm.invoke([answer_prompt])
+        final_response = await answer_llm.ainvoke([answer_prompt])
         state["final_answer"] = final_response.content.strip()
         return state
 
@@ -88,14 +130,14 @@ Question:
 Use the following web search results to answer the question clearly and concisely.
 
 Web Results:
-{context_list}
+{assemble_context(context_list)}
 
 Question:
 {state['question']}
 """
         )
 
-        final_response = llm.invoke([answer_prompt])
+        final_response = await answer_llm.ainvoke([answer_prompt])
         state["final_answer"] = final_response.content.strip()
         return state
 
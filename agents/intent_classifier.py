@@ -0,0 +1,165 @@
+import os
+import re
+import threading
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+from core.retriever_registry import retriever_registry
+
+# --- CONFIGURATION ---
+# hybrid: rules, then embeddings, then the LLM only when unsure | llm: always ask the LLM
+ROUTER_MODE = os.getenv("ROUTER_MODE", "hybrid").lower()
+# Cosine similarity the nearest example must reach, and its lead over the runner-up intent
+ROUTER_EMBED_THRESHOLD = float(os.getenv("ROUTER_EMBED_THRESHOLD", "0.6"))
+ROUTER_EMBED_MARGIN = float(os.getenv("ROUTER_EMBED_MARGIN", "0.1"))
+
+RULE_CONFIDENCE = 0.95
+
+# Whole-message greetings / small talk
+_CHAT_RULE = re.compile(
+    r"^\s*(hi|hello|hey|hiya|yo|good (morning|afternoon|evening)|thanks|thank you|thx|ok|okay|cool|great|bye|goodbye"
+    r"|who are you|what can you do|how are you)\b[\s!.?]*$",
+    re.IGNORECASE,
+)
+# Detection classes (data/dataset/data.yaml) and plant vocabulary. Generic words like
+# "treat" or "symptoms" are left to the embedding stage ("how do I treat a cold" is web)
+_RAG_RULE = re.compile(
+    r"\b(tomato\w*|leaf|leaves|blight|mou?ld|bacterial spot|target spot|black spot|mildew|fungicide\w*"
+    r"|fung(us|al|i)|pathogen\w*|lesion\w*|plant\w*|crop\w*|wilt\w*|pesticide\w*|soil|irrigat\w*|greenhouse\w*)\b",
+    re.IGNORECASE,
+)
+# Topics that are clearly outside plants/agriculture (only used when no plant term matched)
+_WEB_RULE = re.compile(
+    r"\b(weather|forecast|stock|stocks|bitcoin|crypto\w*|exchange rate|football|cricket|election\w*|movie\w*"
+    r"|news|recipe\w*|flight\w*|hotel\w*)\b",
+    re.IGNORECASE,
+)
+
+# Nearest-example classifier over MiniLM embeddings (shared with the retriever)
+_EXAMPLES = {
+    "chat": [
+        "hello there",
+        "thanks for the help",
+        "can you explain what you just said",
+        "what did you detect in my image",
+        "what is this disease called",
+        "can you repeat that in simpler words",
+    ],
+    "rag": [
+        "how do I treat this disease",
+        "what are the symptoms of late blight",
+        "what causes early blight on tomato plants",
+        "how can I prevent leaf mold in a greenhouse",
+        "which fungicide works against target spot",
+        "is bacterial spot contagious to other plants",
+        "how does the disease spread between leaves",
+        "should I remove the infected leaves",
+    ],
+    "web": [
+        "what is the weather tomorrow",
+        "latest stock market news",
+        "who won the football match yesterday",
+        "how do I treat a cold or flu",
+        "what is the exchange rate of the dollar",
+        "recommend a good movie",
+    ],
+}
+
+
+class IntentDecision(NamedTuple):
+    route: Optional[str]
+    confidence: Optional[float]
+    source: str
+
+
+def rule_intent(question: str) -> Optional[IntentDecision]:
+    # Class names arrive as "Early_Blight"; underscores would defeat the word boundaries
+    question = question.replace("_", " ")
+    if _CHAT_RULE.match(question):
+        return IntentDecision("chat", RULE_CONFIDENCE, "rule")
+    if _RAG_RULE.search(question):
+        return IntentDecision("rag", RULE_CONFIDENCE, "rule")
+    if _WEB_RULE.search(question):
+        return IntentDecision("web", RULE_CONFIDENCE, "rule")
+    return None
+
+
+class EmbeddingIntentClassifier:
+    def __init__(self, examples: Dict[str, list], threshold: float = ROUTER_EMBED_THRESHOLD, margin: float = ROUTER_EMBED_MARGIN):
+        self.examples = examples
+        self.threshold = threshold
+        self.margin = margin
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._labels: list = []
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+    def _load(self, embeddings):
+        if self._matrix is None:
+            with self._lock:
+                if self._matrix is None:
+                    labels = [intent for intent, texts in self.examples.items() for _ in texts]
+                    texts = [text for texts in self.examples.values() for text in texts]
+                    self._labels = labels
+                    self._matrix = self._normalize(embeddings.embed_documents(texts))
+        return self._matrix
+
+    def classify(self, question: str) -> Optional[IntentDecision]:
+        # Never block routing on a cold model; the LLM handles turns until the retriever is warm
+        if not retriever_registry.is_loaded:
+            return None
+        embeddings = retriever_registry.embeddings
+        matrix = self._load(embeddings)
+        sims = matrix @ self._normalize(embeddings.embed_query(question))
+
+        best = {}
+        for label, sim in zip(self._labels, sims):
+            best[label] = max(best.get(label, -1.0), float(sim))
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        (route, top), (_, runner_up) = ranked[0], ranked[1]
+
+        if top >= self.threshold and top - runner_up >= self.margin:
+            return IntentDecision(route, round(top, 4), "embedding")
+        # Undecided: report the confidence so callers can act on uncertainty
+        return IntentDecision(None, round(top, 4), "embedding")
+
+
+class RouterStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_source = {"rule": 0, "embedding": 0, "llm": 0}
+        self.llm_time_s = 0.0
+        self.fast_path_time_s = 0.0
+
+    def record(self, source: str, elapsed_s: float):
+        with self._lock:
+            self.by_source[source] += 1
+            if source == "llm":
+                self.llm_time_s += elapsed_s
+            else:
+                self.fast_path_time_s += elapsed_s
+
+    def stats(self) -> Dict:
+        with self._lock:
+            llm_calls = self.by_source["llm"]
+            fast = self.by_source["rule"] + self.by_source["embedding"]
+            total = fast + llm_calls
+            avg_llm = self.llm_time_s / llm_calls if llm_calls else None
+            return {
+                "mode": ROUTER_MODE,
+                "decisions": dict(self.by_source),
+                "fast_path_hit_rate": round(fast / total, 4) if total else None,
+                "avg_llm_route_ms": round(avg_llm * 1000, 2) if avg_llm is not None else None,
+                "avg_fast_path_ms": round(self.fast_path_time_s / fast * 1000, 2) if fast else None,
+                # Estimate: every fast-path decision would otherwise have cost an average LLM route
+                "est_time_saved_s": round(fast * avg_llm - self.fast_path_time_s, 2) if avg_llm is not None else None,
+            }
+
+
+embedding_classifier = EmbeddingIntentClassifier(_EXAMPLES)
+router_stats = RouterStats()
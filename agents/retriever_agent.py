@@ -1,29 +1,19 @@
-from typing import TypedDict, Annotated, Sequence, Optional, List, Literal
-from langchain_core.messages import BaseMessage, ToolMessage, SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
-from langgraph.graph import StateGraph, START, END
-from langgraph.graph.message import add_messages
+from langchain_core.messages import ToolMessage, SystemMessage
 from dotenv import load_dotenv
-import os
-from langchain_core.tools import tool
-from langgraph.prebuilt import ToolNode
-
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from tavily import TavilyClient
 
 from tools.retriever_tool import retriever_tool
+from tools.runner import run_tool_calls
 from tools.tavily_search_tool import tavily_search_tool
 from agents.state import AgentState
 from core.llm import llm
 
-
 load_dotenv()
 
 
 
 tools = [retriever_tool, tavily_search_tool]
 
-def retrieve_agent(state: AgentState) -> AgentState:
+async def retrieve_agent(state: AgentState) -> AgentState:
     """
     Retrieval-augmented RAG agent using tool-calling.
     """
@@ -41,23 +31,29 @@ def retrieve_agent(state: AgentState) -> AgentState:
     user_message = state["messages"][-1]
     
     # Invoke LLM with tool access
-    response = llm_with_tools.invoke([system_prompt, user_message])
+    response = await llm_with_tools.ainvoke([system_prompt, user_message])
 
     # Build tools dictionary
     tools_dict = {tool.name: tool for tool in tools}
 
-    # Execute tool calls
-    tool_results = []
-    for t in getattr(response, 'tool_calls', []):
-        if t['name'] in tools_dict:
-            result = tools_dict[t['name']].invoke(t['args'].get('query', ''))
-            tool_results.append(ToolMessage(tool_call_id=t['id'], name=t['name'], content=str(result)))
-        else:
-            tool_results.append(ToolMessage(tool_call_id=t['id'], name=t['name'], content="Invalid tool"))
-
-    # Store retrieved content for grading
+    # Execute tool calls concurrently (FAISS on the retriever pool, Tavily async), results in call order
+    tool_calls = [t for t in getattr(response, 'tool_calls', []) if t['name'] in tools_dict]
+    calls = []
+    for t in tool_calls:
+        args = {"query": t['args'].get('query', '')}
+        if t['name'] == retriever_tool.name:
+            args["disease"] = state.get("detected_disease")
+        calls.append((tools_dict[t['name']], args))
+    results = dict(zip((t['id'] for t in tool_calls), await run_tool_calls(calls)))
+
+    tool_results = [
+        ToolMessage(tool_call_id=t['id'], name=t['name'], content=results[t['id']].output if t['id'] in results else "Invalid tool")
+        for t in getattr(response, 'tool_calls', [])
+    ]
+
+    # Store retrieved content for grading; failed or empty calls are left out so the grader falls back
     if tool_results:
-        state["retrieved_docs"] = [tm.content for tm in tool_results]
+        state["retrieved_docs"] = [r.output for r in results.values() if r.ok and r.output.strip()]
 
     print("🔧 RAG agent executed with tool-calling")
     return state
@@ -1,21 +1,38 @@
-from typing import TypedDict, Annotated, Sequence, Optional, List, Literal
-from langchain_core.messages import BaseMessage, ToolMessage, SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
-from langgraph.graph import StateGraph, START, END
-from langgraph.graph.message import add_messages
+import asyncio
+import time
+
+from langchain_core.messages import SystemMessage
 from dotenv import load_dotenv
-import os
-from langchain_core.tools import tool
-from langgraph.prebuilt import ToolNode
 
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from tavily import TavilyClient
+from agents.intent_classifier import ROUTER_MODE, embedding_classifier, router_stats, rule_intent
 from agents.state import AgentState
+from core.context_budget import fit_history
 from core.llm import llm
 
 load_dotenv()
 
-def router_agent(state: AgentState) -> AgentState:
+
+async def fast_path_route(question: str):
+    """Local intent decision (rules, then MiniLM similarity); route is None when unsure."""
+    decision = rule_intent(question)
+    if decision is None:
+        # Embedding the question is CPU work; keep it off the event loop
+        decision = await asyncio.to_thread(embedding_classifier.classify, question)
+    return decision
+
+
+async def router_agent(state: AgentState) -> AgentState:
+    start = time.perf_counter()
+    decision = None
+    if ROUTER_MODE == "hybrid":
+        decision = await fast_path_route(state["question"])
+        if decision and decision.route:
+            router_stats.record(decision.source, time.perf_counter() - start)
+            state["route"] = state["routed_to"] = decision.route
+            state["route_confidence"] = decision.confidence
+            print(f"🔀 Router: Routed to {state['route']} (fast path: {decision.source}, confidence {decision.confidence})")
+            return state
+
     system_prompt = SystemMessage(
         content = """
         Classify the user's question into one of these intents:
@@ -33,8 +50,8 @@ def router_agent(state: AgentState) -> AgentState:
         """
     )
 
-    messages = [system_prompt] + state["messages"]
-    response = llm.invoke(messages)
+    messages = [system_prompt] + fit_history(state["messages"])
+    response = await llm.ainvoke(messages)
 
     route = response.content.strip().lower().replace("\n", "").replace(" ", "")
 
@@ -43,6 +60,9 @@ def router_agent(state: AgentState) -> AgentState:
         print(f"⚠️ Router returned invalid route: {repr(route)}. Defaulting to 'rag'.")
         route = "rag"
 
-    state["route"] = route
+    router_stats.record("llm", time.perf_counter() - start)
+    state["route"] = state["routed_to"] = route
+    # Local classifier's best score, even though it was too unsure to decide alone
+    state["route_confidence"] = decision.confidence if decision else None
     print(f"🔀 Router: Routed to {state['route']}")
     return state
\ No newline at end of file
@@ -0,0 +1,59 @@
+import asyncio
+
+from langchain_core.runnables.config import ensure_config, var_child_runnable_config
+
+from agents.grader_answer_agent import unified_grader_answer_agent
+from agents.retriever_agent import retrieve_agent
+from agents.state import AgentState
+from agents.web_agent import web_answer_agent
+from core.speculation import SPECULATIVE_CONFIDENCE, speculation_registry
+
+
+# Node name the speculative search's LLM calls are counted under (core.callbacks.LLMCallCounter)
+SPECULATIVE_NODE = "web_speculative"
+
+
+async def _speculative_web_search(state: AgentState) -> AgentState:
+    # The task inherits the retriever node's run config; relabel it so its LLM calls aren't billed to "retriever".
+    # Set inside the task, so only the task's copy of the context changes
+    config = ensure_config()
+    var_child_runnable_config.set({**config, "metadata": {**config.get("metadata", {}), "langgraph_node": SPECULATIVE_NODE}})
+    return await web_answer_agent(state)
+
+
+def should_speculate(state: AgentState) -> bool:
+    confidence = state.get("route_confidence")
+    return state.get("route") == "rag" and (confidence is None or confidence < SPECULATIVE_CONFIDENCE)
+
+
+async def speculative_retrieve_agent(state: AgentState) -> AgentState:
+    """
+    retrieve_agent, with the web search started alongside it when the router was unsure.
+    The web agent works on a copy of the state; its result waits in the registry for a fallback.
+    """
+    if should_speculate(state):
+        print(f"🎲 Speculating: web search started alongside retrieval (route confidence {state.get('route_confidence')})")
+        speculation_registry.start(state["run_id"], _speculative_web_search(dict(state)))
+        # Let the web agent send its request before retrieval takes the loop
+        await asyncio.sleep(0)
+    return await retrieve_agent(state)
+
+
+async def speculative_grader_agent(state: AgentState) -> AgentState:
+    state = await unified_grader_answer_agent(state)
+    if state.get("enough_info"):
+        # RAG answered it; the web search is no longer needed
+        speculation_registry.cancel(state.get("run_id"))
+    return state
+
+
+async def speculative_web_agent(state: AgentState) -> AgentState:
+    """Use the speculative search for this run if one was started, else search now."""
+    speculated = await speculation_registry.take(state.get("run_id"))
+    if speculated is None:
+        return await web_answer_agent(state)
+
+    print("🎲 Speculative web search used for the fallback")
+    state["route"] = "web"
+    state["web_retrievals"] = speculated.get("web_retrievals", [])
+    return state
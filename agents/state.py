@@ -4,9 +4,14 @@ from langgraph.graph.message import add_messages
 
 
 class AgentState(TypedDict):
+    run_id: str
     question: str
     messages: Annotated[Sequence[BaseMessage], add_messages]
     route: Optional[Literal["chat", "rag", "web"]]
+    # The router's decision; `route` becomes "web" when the grader falls back, this stays
+    routed_to: Optional[Literal["chat", "rag", "web"]]
+    route_confidence: Optional[float]
+    detected_disease: Optional[str]
     retrieved_docs: Optional[List[str]]
     web_retrievals: Optional[List[str]]
     enough_info: Optional[bool]
@@ -1,22 +1,14 @@
-from typing import TypedDict, Annotated, Sequence, Optional, List, Literal
-from langchain_core.messages import BaseMessage, ToolMessage, SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
-from langgraph.graph import StateGraph, START, END
-from langgraph.graph.message import add_messages
+from langchain_core.messages import HumanMessage, SystemMessage
 from dotenv import load_dotenv
-import os
-from langchain_core.tools import tool
-from langgraph.prebuilt import ToolNode
 
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from tavily import TavilyClient
+from tools.runner import run_tool_calls
 from tools.tavily_search_tool import tavily_search_tool
 from agents.state import AgentState
 from core.llm import llm
 
 load_dotenv()
 
-def web_answer_agent(state: AgentState) -> AgentState:
+async def web_answer_agent(state: AgentState) -> AgentState:
     """
     Answers the question by searching the Web using tool-calling.
     Stores retrieved web results separately in state['web_retrievals'].
@@ -38,24 +30,21 @@ def web_answer_agent(state: AgentState) -> AgentState:
     user_message = HumanMessage(content=state["question"])
 
     # Step 1 — LLM decides whether to call the tool
-    response = llm_with_tools.invoke([system_prompt, user_message])
+    response = await llm_with_tools.ainvoke([system_prompt, user_message])
 
-    # Step 2 — Execute tool calls (same pattern as retrieve_agent)
+    # Step 2 — Execute tool calls concurrently (same pattern as retrieve_agent)
     tool_calls = getattr(response, "tool_calls", [])
-    tool_outputs = []
+    calls = []
 
     for t in tool_calls:
-        tool_name = t["name"]
         query = t["args"].get("query", "")
+        print(f"🔧 WebAgent executing tool: {t['name']} with query: {query}")
+        calls.append((tavily_search_tool, {"query": query}))
 
-        print(f"🔧 WebAgent executing tool: {tool_name} with query: {query}")
+    results = await run_tool_calls(calls)
 
-        # Directly invoke tool function
-        result = tavily_search_tool.invoke(query)
-        tool_outputs.append(result)
-
-    # Step 3 — Store web results separately
-    state["web_retrievals"] = tool_outputs
+    # Step 3 — Store web results separately (failed searches are not context)
+    state["web_retrievals"] = [r.output for r in results if r.ok and r.output.strip()]
 
     print(state)
 
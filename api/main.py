@@ -1,12 +1,60 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from api.routes.health import router as health_router
 from api.routes.chat import router as chat_router
 from api.routes.detect import router as detect_router
+from api.routes.metrics import router as metrics_router
 from fastapi.staticfiles import StaticFiles
+from api.readiness import readiness, STARTUP_MODE
+from core.answer_pack import answer_pack
+from core.retriever_registry import retriever_registry
+from core.run_graph import get_graph, is_graph_loaded
+from tools.runner import retriever_executor
+from vision.batching import YOLO_BATCHING
+from vision.executor import inference_executor
+from vision.model import is_model_loaded, warm_yolo_models
+
+# One detector per thread that runs YOLO: each thread-pool worker, plus the micro-batcher's thread
+YOLO_COPIES = (inference_executor.workers if inference_executor.kind == "thread" else 0) + (1 if YOLO_BATCHING else 0)
+
+# Heavy resources, warmed according to STARTUP_MODE
+WARM_UP = [
+    ("yolo_model", lambda: warm_yolo_models(max(YOLO_COPIES, 1))),
+    ("retriever", retriever_registry.load),
+    ("agent_graph", get_graph),
+    ("answer_pack", answer_pack.load),
+]
+
+# Reported by /health/ready under STARTUP_MODE=lazy, where nothing above is warmed up front
+LOADED_PROBES = {
+    "yolo_model": is_model_loaded,
+    "retriever": lambda: retriever_registry.is_loaded,
+    "agent_graph": is_graph_loaded,
+    "answer_pack": lambda: answer_pack.is_loaded,
+}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if STARTUP_MODE == "eager":
+        # Load everything before accepting requests
+        await asyncio.to_thread(readiness.warm_all, WARM_UP)
+    elif STARTUP_MODE == "background":
+        # Serve /health immediately; /health/ready flips once warm-up is done
+        readiness.start_background(WARM_UP)
+    else:
+        readiness.track_lazy(LOADED_PROBES)
+    yield
+    inference_executor.shutdown()
+    retriever_executor.shutdown()
+
 
 app = FastAPI(
     title="Tomato plant disease detection",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 @app.get("/")
@@ -16,5 +64,6 @@ async def root():
 app.include_router(health_router) # Register the router
 app.include_router(detect_router)
 app.include_router(chat_router)
+app.include_router(metrics_router)
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
\ No newline at end of file
+app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+# eager: load everything before serving | background: serve at once, warm up in a thread
+# lazy: no warm-up, each resource loads on first use
+STARTUP_MODE = os.getenv("STARTUP_MODE", "background").lower()
+
+
+class Readiness:
+    """Tracks warm-up of heavy resources (YOLO, retriever, agent graph) for /health/ready."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.components: Dict[str, Dict] = {}
+        # STARTUP_MODE=lazy: name -> "is it loaded yet?" probe, reported but never awaited
+        self.lazy_probes: Dict[str, Callable[[], bool]] = {}
+        self.started_at = time.time()
+
+    def warm(self, name: str, loader: Callable):
+        with self._lock:
+            self.components[name] = {"status": "loading"}
+        start = time.perf_counter()
+        try:
+            loader()
+        except Exception as e:
+            with self._lock:
+                self.components[name] = {"status": "failed", "error": str(e)}
+            print(f"❌ Warm-up of {name} failed: {e}")
+            return
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.components[name] = {"status": "ready", "load_time_s": round(elapsed, 3)}
+        print(f"🔥 {name} warmed up in {elapsed:.2f}s")
+
+    def warm_all(self, loaders: List[Tuple[str, Callable]]):
+        for name, loader in loaders:
+            self.warm(name, loader)
+
+    def start_background(self, loaders: List[Tuple[str, Callable]]) -> threading.Thread:
+        with self._lock:
+            for name, _ in loaders:
+                self.components.setdefault(name, {"status": "pending"})
+        thread = threading.Thread(target=self.warm_all, args=(loaders,), name="warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def track_lazy(self, probes: Dict[str, Callable[[], bool]]):
+        """List resources that load on first use, so /health/ready shows which ones are still cold."""
+        with self._lock:
+            self.lazy_probes.update(probes)
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return all(c["status"] == "ready" for c in self.components.values())
+
+    def status(self) -> Dict:
+        with self._lock:
+            components = {name: dict(c) for name, c in self.components.items()}
+            probes = dict(self.lazy_probes)
+        status = {
+            "mode": STARTUP_MODE,
+            "ready": all(c["status"] == "ready" for c in components.values()),
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "components": components,
+        }
+        if probes:
+            # Lazy components don't gate readiness: the first request that needs one loads it
+            for name, probe in probes.items():
+                components.setdefault(name, {"status": "loaded" if probe() else "not loaded"})
+            status["note"] = "lazy startup: ready only means the process is serving; cold components load on first use"
+        return status
+
+
+readiness = Readiness()
@@ -1,47 +1,38 @@
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from api.schemas.chat_schema import ChatRequest, ChatResponse
-from core.run_graph import run_graph
-from langchain_core.messages import SystemMessage
+from api.session_store import session_store
+from core.answer_cache import ANSWER_CACHE_ENABLED, answer_cache
+from core.answer_pack import answer_pack, first_question
+from core.run_graph import append_answer, run_graph, stream_graph
+import asyncio
 import json
+import time
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
-# Session storage: {session_id: {"messages": [], "detected_disease": str, "report": dict}}
-CHAT_MEMORY = {}
 
-@router.post("", response_model=ChatResponse)
-async def chat_endpoint(req: ChatRequest):
-    print("In the chat endpoint")
-    print("Chat memory: ", CHAT_MEMORY)
+def prepare_chat_session(req: ChatRequest):
+    """Load the session, apply disease changes and build (session_data, user_question, system_context)."""
     session_id = req.session_id
-    
-    # Get or initialize session data
-    if session_id not in CHAT_MEMORY:
-        CHAT_MEMORY[session_id] = {
-            "messages": [],
-            "detected_disease": None,
-            "report": None,
-        }
-    
-    session_data = CHAT_MEMORY[session_id]
-    print(session_data)
-    messages = session_data["messages"]
-    print("messages: ",messages)
-    
+
+    # Session data: {"messages": [], "detected_disease": str, "report": dict}
+    # Bounded store: LRU + idle TTL eviction, message window applied on save
+    session_data = session_store.get(session_id)
+    print(f"Session {session_id}: {len(session_data['messages'])} messages")
+
     # If disease changes, reset conversation so memory only reflects the latest detection
     if req.detected_disease and req.detected_disease != session_data.get("detected_disease"):
         print("disease changed")
         session_data["messages"] = []
         session_data["detected_disease"] = req.detected_disease
         session_data["report"] = req.report
-        # IMPORTANT: also reset local reference so downstream uses the cleared list
-        messages = session_data["messages"]
     elif req.detected_disease:
         print("disease not changed")
         session_data["detected_disease"] = req.detected_disease
         if req.report:
             session_data["report"] = req.report
-    
+
     system_context = None
     user_question = req.message
     print("Request first message da? ",req.is_first_message)
@@ -58,23 +49,136 @@ async def chat_endpoint(req: ChatRequest):
             f"You are an agricultural assistant. Give accurate, safe, and practical advice. "
             f"Use this detection report to ground your answer: {json.dumps(report_blob)}"
         )
-        print("System context: ",system_context)
 
         # If frontend sends empty message, auto-generate first question
         if not user_question.strip():
-            user_question = f"What is the treatment for {detected_disease}?"
+            user_question = first_question(detected_disease)
+
+    return session_data, user_question, system_context
 
-    answer, messages = run_graph(
+
+async def lookup_cached_answer(question: str, disease):
+    """(answer or None, question vector for `remember_answer`)."""
+    # Offline-built answer to the auto-generated first question, then the semantic cache
+    if not answer_pack.is_loaded:
+        # First use under STARTUP_MODE=lazy: reading packs and fingerprinting the corpus is disk I/O
+        await asyncio.to_thread(answer_pack.load)
+    packed = answer_pack.get(disease, question)
+    if packed is not None:
+        return packed, None
+    if not ANSWER_CACHE_ENABLED:
+        return None, None
+    # Embedding the question is CPU work; keep it off the event loop
+    return await asyncio.to_thread(answer_cache.lookup, question, disease)
+
+
+def remember_answer(vector, question: str, disease, answer: str, stats: dict):
+    # Only grounded RAG answers depend on nothing but the question and the corpus
+    if vector is not None and stats.get("route") == "rag" and stats.get("enough_info"):
+        answer_cache.put(vector, question, disease, answer)
+
+
+@router.post("", response_model=ChatResponse)
+async def chat_endpoint(req: ChatRequest):
+    print("In the chat endpoint")
+    session_data, user_question, system_context = prepare_chat_session(req)
+    disease = session_data["detected_disease"]
+
+    cached, vector = await lookup_cached_answer(user_question, disease)
+    if cached is not None:
+        session_data["messages"] = append_answer(user_question, cached, session_data["messages"], system_context)
+        session_store.save(req.session_id, session_data)
+        return ChatResponse(answer=cached, detected_disease=disease, session_id=req.session_id, llm_calls=0, prompt_tokens=0, cached=True)
+
+    stats = {}
+    answer, messages = await run_graph(
         user_input=user_question,
-        messages=messages,
-        system_context=system_context
+        messages=session_data["messages"],
+        system_context=system_context,
+        stats=stats,
+        detected_disease=disease,
     )
 
     # Update session with new messages
-    CHAT_MEMORY[session_id]["messages"] = messages
-    
+    session_data["messages"] = messages
+    session_store.save(req.session_id, session_data)
+    remember_answer(vector, user_question, disease, answer, stats)
+
     return ChatResponse(
         answer=answer,
         detected_disease=session_data["detected_disease"],
-        session_id=session_id
-    )
\ No newline at end of file
+        session_id=req.session_id,
+        llm_calls=stats.get("llm_calls"),
+        prompt_tokens=stats.get("prompt_tokens"),
+    )
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/stream")
+async def chat_stream_endpoint(req: ChatRequest):
+    """
+    Same conversation as POST /chat, delivered as Server-Sent Events:
+    `node` when a graph step finishes, `token` for each answer token,
+    then `done` with the full answer (or `error`).
+    """
+    print("In the chat stream endpoint")
+    session_data, user_question, system_context = prepare_chat_session(req)
+    disease = session_data["detected_disease"]
+
+    async def events():
+        start = time.perf_counter()
+        first_token_ms = None
+        stats = {}
+        try:
+            cached, vector = await lookup_cached_answer(user_question, disease)
+            if cached is not None:
+                session_data["messages"] = append_answer(user_question, cached, session_data["messages"], system_context)
+                session_store.save(req.session_id, session_data)
+                elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+                yield sse_event("token", {"text": cached})
+                yield sse_event("done", {
+                    "answer": cached,
+                    "detected_disease": disease,
+                    "session_id": req.session_id,
+                    "ttft_ms": elapsed_ms,
+                    "elapsed_ms": elapsed_ms,
+                    "llm_calls": 0,
+                    "prompt_tokens": 0,
+                    "cached": True,
+                })
+                return
+
+            async for kind, value in stream_graph(user_question, session_data["messages"], system_context, stats=stats, detected_disease=disease):
+                elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+                if kind == "node":
+                    yield sse_event("node", {"node": value, "elapsed_ms": elapsed_ms})
+                elif kind == "token":
+                    if first_token_ms is None:
+                        first_token_ms = elapsed_ms
+                    yield sse_event("token", {"text": value})
+                else:
+                    session_store.save(req.session_id, session_data)
+                    remember_answer(vector, user_question, disease, value, stats)
+                    yield sse_event("done", {
+                        "answer": value,
+                        "detected_disease": session_data["detected_disease"],
+                        "session_id": req.session_id,
+                        "ttft_ms": first_token_ms,
+                        "elapsed_ms": elapsed_ms,
+                        "llm_calls": stats.get("llm_calls"),
+                        "prompt_tokens": stats.get("prompt_tokens"),
+                        "cached": False,
+                    })
+        except Exception as e:
+            print(f"❌ Chat stream failed: {e}")
+            yield sse_event("error", {"detail": str(e)})
+
+    # X-Accel-Buffering stops nginx-style proxies from holding back the stream
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
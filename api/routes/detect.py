@@ -1,70 +1,193 @@
-from fastapi import APIRouter, UploadFile, File, Request
+from fastapi import APIRouter, UploadFile, File, Request, HTTPException, Query, Response
+from typing import List, Literal
+import asyncio
+import hashlib
+import os
+import threading
 import uuid
+import time
+import zipfile
 from pathlib import Path
-import numpy as np
-import cv2
 import base64
 
-from vision.inference import run_yolo_inference
-from vision.utils import draw_boxes
-from api.schemas.vision_schema import VisionResponse
+from vision.cache import detection_cache
+from vision.executor import inference_executor, InferenceBusyError
+from vision.pipeline import process_image
+from vision.batch import detect_images, iter_zip_images, is_image_name, BATCH_SIZE, ZipLimitError
+from api.schemas.vision_schema import VisionResponse, BatchVisionResponse
 
 router = APIRouter(prefix="/detect", tags=["Detect"])
 
 OUTPUT_DIR = Path("static/outputs")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# Annotated images published for `image_delivery=url` are deleted after this many seconds
+OUTPUT_TTL_SECONDS = int(os.getenv("OUTPUT_TTL_SECONDS", "3600"))
+_CLEANUP_INTERVAL_S = 60
+_last_cleanup = 0.0
+_cleanup_lock = threading.Lock()
+
+# Upper bound on images accepted by one /detect/batch call (zip contents included)
+BATCH_MAX_IMAGES = int(os.getenv("BATCH_MAX_IMAGES", "500"))
+# Upper bound on image bytes held for one /detect/batch call, counted uncompressed for zip members
+BATCH_MAX_BYTES = int(float(os.getenv("BATCH_MAX_MB", "512")) * 2**20)
+
+
+def cleanup_expired_outputs(now: float):
+    """Delete published images older than OUTPUT_TTL_SECONDS (at most once a minute)."""
+    global _last_cleanup
+    with _cleanup_lock:
+        if now - _last_cleanup < _CLEANUP_INTERVAL_S:
+            return
+        _last_cleanup = now
+
+    for path in OUTPUT_DIR.glob("*.jpg"):
+        try:
+            if now - path.stat().st_mtime > OUTPUT_TTL_SECONDS:
+                path.unlink()
+        except OSError:
+            continue
+
+
+def publish_output_image(image_jpeg: bytes) -> str:
+    """Store the annotated JPEG under static/outputs by content hash; returns the file name."""
+    file_name = f"{hashlib.sha256(image_jpeg).hexdigest()[:32]}.jpg"
+    output_path = OUTPUT_DIR / file_name
+    if output_path.exists():
+        # Same image already published: just extend its TTL
+        os.utime(output_path)
+    else:
+        tmp_path = output_path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(image_jpeg)
+        tmp_path.replace(output_path)
+
+    cleanup_expired_outputs(time.time())
+    return file_name
+
+
+def multipart_response(payload: VisionResponse, image_jpeg: bytes) -> Response:
+    """multipart/mixed: JSON report part followed by the raw annotated JPEG part."""
+    boundary = uuid.uuid4().hex
+    body = b"".join([
+        f"--{boundary}\r\nContent-Type: application/json\r\n\r\n".encode(),
+        payload.model_dump_json().encode(),
+        f"\r\n--{boundary}\r\nContent-Type: image/jpeg\r\nContent-ID: <annotated-image>\r\n\r\n".encode(),
+        image_jpeg,
+        f"\r\n--{boundary}--\r\n".encode(),
+    ])
+    return Response(content=body, media_type=f"multipart/mixed; boundary={boundary}")
+
 
 @router.post("", response_model=VisionResponse)
-async def detect_disease(request: Request, file: UploadFile = File(...)):
+async def detect_disease(
+    request: Request,
+    file: UploadFile = File(...),
+    image_delivery: Literal["base64", "url", "binary"] = Query(
+        "base64",
+        description="base64: inline data URL; url: link under /static/outputs; binary: multipart/mixed with the raw JPEG",
+    ),
+):
     # 1️⃣ Read image bytes from request
     image_bytes = await file.read()
 
-    # 2️⃣ Run YOLO inference (supports 3- or 4-value return)
-    inference_result = run_yolo_inference(image_bytes)
-    if not isinstance(inference_result, tuple):
-        raise ValueError("run_yolo_inference did not return a tuple as expected")
-
-    if len(inference_result) == 3:
-        first, second, third = inference_result
-        if isinstance(first, np.ndarray):
-            # Current signature: (image, detections, report)
-            image, detections, report = first, second, third
-            detected_disease = (report or {}).get("primary_diagnosis", "Healthy")
-        elif isinstance(first, str):
-            # Legacy signature: (detected_disease, detections, image)
-            detected_disease, detections, image = first, second, third
-            report = None
-        else:
-            raise ValueError("Unsupported return signature from run_yolo_inference (len=3)")
+    # 2️⃣ Re-uploads of the same photo skip decode + YOLO entirely
+    start = time.perf_counter()
+    cache_key = detection_cache.key_for(image_bytes)
+    result = detection_cache.get(cache_key)
+    cached = result is not None
+
+    if cached:
+        timings = {"cache_lookup_ms": round((time.perf_counter() - start) * 1000, 2)}
     else:
-        raise ValueError(f"run_yolo_inference returned unexpected tuple length {len(inference_result)}")
+        # 3️⃣ Decode, run YOLO, draw boxes and encode in the inference pool
+        #    so the event loop keeps serving /health and /chat meanwhile
+        try:
+            result = await inference_executor.run(process_image, image_bytes)
+        except InferenceBusyError as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+        timings = result.pop("timings")
+        detection_cache.put(cache_key, result)
 
-    # 3️⃣ Ensure image is a numpy array and draw bounding boxes
-    if image is None or not hasattr(image, "shape"):
-        # Fallback: decode again from the original bytes
-        np_arr = np.frombuffer(image_bytes, np.uint8)
-        image = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-    annotated_img = draw_boxes(image, detections)
+    print(f"⏱️ Detection timings (ms): {timings} cached={cached}")
 
-    # 4️⃣ Save annotated image using OpenCV
-    # file_name = f"{uuid.uuid4()}.jpg"
-    # output_path = OUTPUT_DIR / file_name
+    # 4️⃣ Deliver the annotated image as requested
+    if image_delivery == "url":
+        # File write + periodic sweep of static/outputs are blocking disk I/O; keep them off the event loop
+        file_name = await asyncio.to_thread(publish_output_image, result["image_jpeg"])
+        output_image_path = f"{request.base_url}static/outputs/{file_name}"
+    elif image_delivery == "binary":
+        output_image_path = "cid:annotated-image"
+    else:
+        base64_image = base64.b64encode(result["image_jpeg"]).decode('utf-8')
+        output_image_path = f"data:image/jpeg;base64,{base64_image}"
 
-    if annotated_img is None:
-        raise ValueError("Annotated image is empty")
-    
-    _, buffer = cv2.imencode('.jpg',annotated_img)
-    base64_image = base64.b64encode(buffer).decode('utf-8')
+    # 5️⃣ Return validated response
+    response = VisionResponse(
+        detected_disease=result["detected_disease"],
+        detections=result["detections"],
+        output_image_path=output_image_path,
+        report=result["report"],
+        timings=timings,
+        cached=cached
+    )
+    if image_delivery == "binary":
+        return multipart_response(response, result["image_jpeg"])
+    return response
 
-    # cv2.imwrite(str(output_path), annotated_img)
 
-    # image_url = f"{request.base_url}static/outputs/{file_name}"
 
-    # 5️⃣ Return validated response
-    return VisionResponse(
-        detected_disease=detected_disease,
-        detections=detections,
-        output_image_path=f"data:image/jpeg;base64,{base64_image}",
-        report=report
+@router.post("/batch", response_model=BatchVisionResponse)
+async def detect_disease_batch(files: List[UploadFile] = File(...)):
+    """
+    Detect diseases on many leaf photos at once. Accepts image files and/or
+    zip archives of images; returns per-image reports (no annotated images).
+    """
+    start = time.perf_counter()
+
+    # 1️⃣ Collect (name, bytes) for every image, expanding zip archives
+    items = []
+    total_bytes = 0
+    for upload in files:
+        data = await upload.read()
+        name = upload.filename or "upload"
+        if name.lower().endswith(".zip"):
+            try:
+                # Limits are enforced while extracting, before a member is decompressed
+                for inner, inner_bytes in iter_zip_images(data, BATCH_MAX_IMAGES - len(items), BATCH_MAX_BYTES - total_bytes):
+                    items.append((f"{name}/{inner}", inner_bytes))
+                    total_bytes += len(inner_bytes)
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail=f"{name} is not a valid zip archive")
+            except ZipLimitError as e:
+                raise HTTPException(status_code=413, detail=f"Batch too large: {name} brings it to {e} "
+                                                            f"(limits: {BATCH_MAX_IMAGES} images, {BATCH_MAX_BYTES // 2**20} MB)")
+        elif is_image_name(name) or (upload.content_type or "").startswith("image/"):
+            items.append((name, data))
+            total_bytes += len(data)
+
+        if len(items) > BATCH_MAX_IMAGES:
+            raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_IMAGES} images per batch")
+        if total_bytes > BATCH_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_BYTES // 2**20} MB of images per batch")
+
+    if not items:
+        raise HTTPException(status_code=400, detail="No images found in upload")
+
+    # 2️⃣ Batched inference, one executor job per batch so other requests interleave
+    rows = []
+    for i in range(0, len(items), BATCH_SIZE):
+        try:
+            rows.extend(await inference_executor.run(detect_images, items[i:i + BATCH_SIZE]))
+        except InferenceBusyError as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+
+    elapsed = time.perf_counter() - start
+    print(f"⏱️ Batch detection: {len(rows)} images in {elapsed:.2f}s ({len(rows) / elapsed:.2f} images/sec)")
+
+    return BatchVisionResponse(
+        results=[{**row, "file_name": row["file"]} for row in rows],
+        total_images=len(rows),
+        failed=sum(row["error"] is not None for row in rows),
+        elapsed_ms=round(elapsed * 1000, 2),
+        images_per_sec=round(len(rows) / elapsed, 2) if elapsed > 0 else 0.0
     )
\ No newline at end of file
@@ -1,4 +1,6 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from api.readiness import readiness
 
 router = APIRouter(prefix="/health", tags=["Health"]) # container to register endpoints
 # /health is the primary endpoint. That's why it is in prefix
@@ -7,4 +9,18 @@ router = APIRouter(prefix="/health", tags=["Health"]) # container to register en
 async def health():
     return {
         "status":"ok"
-    }
\ No newline at end of file
+    }
+
+@router.get("/live")
+async def liveness():
+    # Process is up and the event loop responds; says nothing about loaded models
+    return {
+        "status":"ok"
+    }
+
+@router.get("/ready")
+async def readiness_check():
+    # 503 until YOLO, retriever and agent graph are warm (see STARTUP_MODE).
+    # With STARTUP_MODE=lazy it is always 200 and lists which components are still "not loaded"
+    status = readiness.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
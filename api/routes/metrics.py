@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from api.session_store import session_store
+from agents.intent_classifier import router_stats
+from core.answer_cache import answer_cache
+from core.answer_pack import answer_pack
+from core.retriever_registry import retriever_registry
+from core.speculation import path_latency, speculation_registry
+from tools.runner import tool_stats
+from vision.cache import detection_cache
+from vision.executor import inference_executor
+from vision.inference import yolo_batcher
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("")
+async def metrics():
+    return {
+        "retriever": retriever_registry.stats(),
+        "inference_executor": inference_executor.stats(),
+        "detection_cache": detection_cache.stats(),
+        "sessions": session_store.stats(),
+        "router": router_stats.stats(),
+        "answer_cache": answer_cache.stats(),
+        "answer_pack": answer_pack.stats(),
+        "tool_calls": tool_stats.stats(),
+        "graph": {"speculation": speculation_registry.stats(), "path_latency": path_latency.stats()},
+        "yolo_batching": yolo_batcher.stats() if yolo_batcher else {"enabled": False},
+    }
@@ -12,4 +12,9 @@ class ChatResponse(BaseModel):
     answer: str
     detected_disease: Optional[str] = None
     session_id: str = "default"
-    
\ No newline at end of file
+    # LLM round-trips and prompt tokens (local tokenizer) spent on this turn
+    llm_calls: Optional[int] = None
+    prompt_tokens: Optional[int] = None
+    # Served from the semantic answer cache
+    cached: bool = False
+    
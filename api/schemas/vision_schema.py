@@ -16,4 +16,20 @@ class VisionResponse(BaseModel):
     detected_disease: str
     detections: List[DetectionBox]
     output_image_path: str
-    report: Optional[Dict] = None
\ No newline at end of file
+    report: Optional[Dict] = None
+    timings: Optional[Dict[str, float]] = None
+    cached: bool = False
+
+class BatchDetectionItem(BaseModel):
+    file_name: str
+    detected_disease: Optional[str] = None
+    detections: List[DetectionBox] = []
+    report: Optional[Dict] = None
+    error: Optional[str] = None
+
+class BatchVisionResponse(BaseModel):
+    results: List[BatchDetectionItem]
+    total_images: int
+    failed: int
+    elapsed_ms: float
+    images_per_sec: float
\ No newline at end of file
@@ -0,0 +1,194 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List
+
+from langchain_core.messages import BaseMessage, SystemMessage, messages_from_dict, messages_to_dict
+
+# --- CONFIGURATION ---
+# memory: per-process dict | sqlite: file shared by all uvicorn workers on the host
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory").lower()
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "sessions.db")
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "1000"))
+SESSION_IDLE_TTL_S = float(os.getenv("SESSION_IDLE_TTL_S", "3600"))
+# Most recent non-system messages kept per session (system context is always kept)
+SESSION_MAX_MESSAGES = int(os.getenv("SESSION_MAX_MESSAGES", "20"))
+
+
+def new_session() -> Dict:
+    return {"messages": [], "detected_disease": None, "report": None}
+
+
+def trim_messages(messages: List[BaseMessage], max_messages: int = SESSION_MAX_MESSAGES) -> List[BaseMessage]:
+    """Keep every SystemMessage plus the last `max_messages` conversation messages."""
+    system = [m for m in messages if isinstance(m, SystemMessage)]
+    dialogue = [m for m in messages if not isinstance(m, SystemMessage)]
+    if len(dialogue) <= max_messages:
+        return list(messages)
+    return system + dialogue[-max_messages:]
+
+
+def session_size(session: Dict) -> int:
+    """Approximate bytes held by a session (message text + report JSON)."""
+    size = sum(len(str(m.content)) for m in session["messages"])
+    if session.get("report"):
+        size += len(json.dumps(session["report"]))
+    return size
+
+
+class InMemorySessionStore:
+    """Session dict for a single process, bounded by count (least recently saved go first) and idle TTL."""
+
+    def __init__(self, max_sessions: int = SESSION_MAX_SESSIONS, idle_ttl_s: float = SESSION_IDLE_TTL_S, max_messages: int = SESSION_MAX_MESSAGES):
+        self.max_sessions = max_sessions
+        self.idle_ttl_s = idle_ttl_s
+        self.max_messages = max_messages
+        self._sessions: "OrderedDict[str, Dict]" = OrderedDict()
+        self._last_seen: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.evicted_lru = 0
+        self.evicted_idle = 0
+
+    def get(self, session_id: str) -> Dict:
+        # Reads don't refresh a session (same as the SQLite store): order and idle time follow the last save
+        now = time.time()
+        with self._lock:
+            self._evict_idle(now)
+            session = self._sessions.get(session_id)
+            if session is None or now - self._last_seen.get(session_id, now) > self.idle_ttl_s:
+                return new_session()
+            return session
+
+    def save(self, session_id: str, session: Dict):
+        session["messages"] = trim_messages(session["messages"], self.max_messages)
+        with self._lock:
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            self._last_seen[session_id] = time.time()
+            self._sizes[session_id] = session_size(session)
+            while len(self._sessions) > self.max_sessions:
+                oldest, _ = self._sessions.popitem(last=False)
+                self._forget(oldest)
+                self.evicted_lru += 1
+
+    def _forget(self, session_id: str):
+        self._last_seen.pop(session_id, None)
+        self._sizes.pop(session_id, None)
+
+    def _evict_idle(self, now: float):
+        # Sessions are ordered by last save, so idle ones are at the front
+        while self._sessions:
+            session_id = next(iter(self._sessions))
+            if now - self._last_seen.get(session_id, now) <= self.idle_ttl_s:
+                break
+            self._sessions.popitem(last=False)
+            self._forget(session_id)
+            self.evicted_idle += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "approx_bytes": sum(self._sizes.values()),
+                "max_sessions": self.max_sessions,
+                "idle_ttl_s": self.idle_ttl_s,
+                "max_messages": self.max_messages,
+                "evicted_lru": self.evicted_lru,
+                "evicted_idle": self.evicted_idle,
+            }
+
+
+class SQLiteSessionStore:
+    """
+    Sessions in a SQLite file so several uvicorn workers share them.
+    Messages are stored with LangChain's message dict serialization.
+    """
+
+    def __init__(self, path: str = SESSION_DB_PATH, max_sessions: int = SESSION_MAX_SESSIONS, idle_ttl_s: float = SESSION_IDLE_TTL_S, max_messages: int = SESSION_MAX_MESSAGES):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.idle_ttl_s = idle_ttl_s
+        self.max_messages = max_messages
+        self.evicted_lru = 0
+        self.evicted_idle = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " session_id TEXT PRIMARY KEY, data TEXT NOT NULL,"
+                " updated_at REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions(updated_at)")
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call: safe across threads and processes.
+        # `with conn` only commits; the connection is closed here so none outlive the request
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, session_id: str) -> Dict:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ? AND updated_at >= ?",
+                (session_id, time.time() - self.idle_ttl_s),
+            ).fetchone()
+        if row is None:
+            return new_session()
+        data = json.loads(row[0])
+        data["messages"] = messages_from_dict(data["messages"])
+        return data
+
+    def save(self, session_id: str, session: Dict):
+        session["messages"] = trim_messages(session["messages"], self.max_messages)
+        data = json.dumps({**session, "messages": messages_to_dict(session["messages"])})
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO sessions (session_id, data, updated_at, size) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at, size = excluded.size",
+                (session_id, data, now, len(data)),
+            )
+            self.evicted_idle += conn.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.idle_ttl_s,)).rowcount
+            self.evicted_lru += conn.execute(
+                "DELETE FROM sessions WHERE session_id IN ("
+                " SELECT session_id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,),
+            ).rowcount
+
+    def stats(self) -> Dict:
+        with self._connect() as conn:
+            count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM sessions").fetchone()
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "sessions": count,
+            "approx_bytes": size,
+            "max_sessions": self.max_sessions,
+            "idle_ttl_s": self.idle_ttl_s,
+            "max_messages": self.max_messages,
+            # Counters below are for this worker process only
+            "evicted_lru": self.evicted_lru,
+            "evicted_idle": self.evicted_idle,
+        }
+
+
+def create_session_store(backend: str = SESSION_BACKEND):
+    if backend == "memory":
+        return InMemorySessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    raise ValueError(f"Unknown SESSION_BACKEND: {backend!r} (use memory or sqlite)")
+
+
+session_store = create_session_store()
@@ -0,0 +1,89 @@
+"""
+Parity + latency of a CPU inference backend against the PyTorch baseline on data/dataset/test.
+
+    python -m benchmarks.backends --backend onnx --threads 4
+    python -m benchmarks.backends --backend onnx-int8 --images 50
+
+Parity compares the final detections produced by vision.inference.analyze_result:
+same labels, boxes matched at IoU >= --min-iou and confidence within --max-conf-diff.
+"""
+import argparse
+import time
+
+from benchmarks.common import list_images, latency_summary
+from vision.backends import load_model
+from vision.inference import analyze_result, decode_image
+from vision.model import MODEL_PATH
+from vision.nms import iou
+
+
+def _detections_match(expected, actual, min_iou, max_conf_diff) -> bool:
+    if len(expected) != len(actual):
+        return False
+    unmatched = list(actual)
+    for det in expected:
+        match = next(
+            (a for a in unmatched
+             if a["label"] == det["label"]
+             and iou(a, det) >= min_iou
+             and abs(a["confidence"] - det["confidence"]) <= max_conf_diff),
+            None,
+        )
+        if match is None:
+            return False
+        unmatched.remove(match)
+    return True
+
+
+def _run(model, images):
+    outputs, latencies = [], []
+    for image in images:
+        start = time.perf_counter()
+        result = model(image, verbose=False)[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        outputs.append(analyze_result(result, image.shape))
+    return outputs, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="onnx", choices=["onnx", "onnx-int8", "openvino"])
+    parser.add_argument("--split", default="test")
+    parser.add_argument("--images", type=int, default=0, help="0 = whole split")
+    parser.add_argument("--threads", type=int, default=None, help="ONNX intra-op threads (default: ONNX_INTRA_OP_THREADS)")
+    parser.add_argument("--min-iou", type=float, default=0.9)
+    parser.add_argument("--max-conf-diff", type=float, default=0.05)
+    args = parser.parse_args()
+
+    images = [decode_image(p.read_bytes()) for p in list_images(args.split, args.images)]
+    baseline = load_model("torch", MODEL_PATH)
+    candidate = load_model(args.backend, MODEL_PATH, intra_op_threads=args.threads)
+
+    # Warm-up both so lazy initialisation is not timed
+    baseline(images[0], verbose=False)
+    candidate(images[0], verbose=False)
+
+    base_out, base_lat = _run(baseline, images)
+    cand_out, cand_lat = _run(candidate, images)
+
+    same_diagnosis = sum(b[1]["primary_diagnosis"] == c[1]["primary_diagnosis"] for b, c in zip(base_out, cand_out))
+    same_detections = sum(
+        _detections_match(b[0], c[0], args.min_iou, args.max_conf_diff) for b, c in zip(base_out, cand_out)
+    )
+
+    base_summary, cand_summary = latency_summary(base_lat), latency_summary(cand_lat)
+    print(f"{len(images)} images from {args.split}")
+    print(f"{'backend':>10} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8}")
+    for name, summary in (("torch", base_summary), (args.backend, cand_summary)):
+        print(f"{name:>10} | {summary['p50_ms']:>8} | {summary['p95_ms']:>8} | {summary['p99_ms']:>8}")
+    print(f"Speedup (p50): {base_summary['p50_ms'] / cand_summary['p50_ms']:.2f}x")
+    print(f"Same primary diagnosis: {same_diagnosis}/{len(images)}")
+    print(f"Same detections:        {same_detections}/{len(images)}")
+
+    if same_diagnosis != len(images):
+        raise SystemExit("❌ Parity check failed: primary diagnosis differs on some images")
+    print("✅ Parity check passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Throughput vs. latency of YOLO micro-batching at different concurrency levels.
+
+    python -m benchmarks.batching --images 64 --concurrency 1 2 4 8 16 --max-batch 8 --max-wait-ms 10
+"""
+import argparse
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import list_images, latency_summary
+from vision.batching import MicroBatcher
+from vision.inference import decode_image
+from vision.backends import VISION_BACKEND, load_model
+from vision.model import MODEL_PATH
+
+
+def _run(images, concurrency, predict):
+    latencies = []
+
+    def one(image):
+        start = time.perf_counter()
+        predict(image)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, images))
+    elapsed = time.perf_counter() - start
+
+    return {"images_per_sec": round(len(images) / elapsed, 2), **latency_summary(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--split", default="test")
+    parser.add_argument("--images", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    args = parser.parse_args()
+
+    paths = list_images(args.split, args.images)
+    images = [decode_image(p.read_bytes()) for p in paths]
+    # YOLO models are not thread-safe: unbatched threads check a copy out of a pool, the batcher has its own
+    copies = queue.Queue()
+    for _ in range(max(args.concurrency) + 1):
+        model = load_model(VISION_BACKEND, MODEL_PATH)
+        # Warm-up so model/graph initialisation is not billed to the first row
+        model(images[0], verbose=False)
+        copies.put(model)
+    yolo_model = copies.get()
+
+    def unbatched(image):
+        model = copies.get()
+        try:
+            return model(image, verbose=False)[0]
+        finally:
+            copies.put(model)
+
+    batcher = MicroBatcher(
+        lambda batch: yolo_model(batch, verbose=False),
+        max_batch=args.max_batch,
+        max_wait_ms=args.max_wait_ms,
+    )
+
+    print(f"{len(images)} images from {args.split}, max_batch={args.max_batch}, max_wait_ms={args.max_wait_ms}")
+    print(f"{'concurrency':>11} | {'mode':>9} | {'img/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8}")
+    for concurrency in args.concurrency:
+        for mode, predict in (("single", unbatched), ("batched", batcher.predict)):
+            row = _run(images, concurrency, predict)
+            print(
+                f"{concurrency:>11} | {mode:>9} | {row['images_per_sec']:>8} | "
+                f"{row['p50_ms']:>8} | {row['p95_ms']:>8} | {row['p99_ms']:>8}"
+            )
+
+    print("Batch sizes seen:", batcher.stats()["batch_size_counts"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Concurrent chat sessions against a local stub LLM: throughput and latency per concurrency level.
+
+    python -m benchmarks.chat_load --concurrency 1 8 32 64 --sessions 64
+    python -m benchmarks.chat_load --api-url http://127.0.0.1:8000 --concurrency 1 16 64
+    GRADER_MODE=two_call python -m benchmarks.chat_load --route rag   # compare LLM calls per session
+
+Without --api-url the agent graph runs on one event loop in this process
+(the same way the API's /chat awaits it) against benchmarks/stub_llm_server.py.
+With async nodes, throughput should grow with concurrency until the stub or CPU saturates.
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict, List
+
+from benchmarks.common import latency_summary
+from benchmarks.stub_llm_server import StubLLMConfig, start_stub_server, stub_base_url
+
+QUESTION = "What is the treatment for Early Blight?"
+
+
+async def run_level(call, sessions: int, concurrency: int) -> Dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            t0 = time.perf_counter()
+            try:
+                await call(i)
+            except Exception as e:
+                errors += 1
+                print(f"session {i} failed: {e}")
+                return
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "errors": errors,
+        "sessions_per_sec": round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+        "latency": latency_summary(latencies),
+    }
+
+
+async def benchmark(args, stub_config: StubLLMConfig = None) -> List[Dict]:
+    if args.api_url:
+        import httpx
+
+        client = httpx.AsyncClient(timeout=300, limits=httpx.Limits(max_connections=max(args.concurrency)))
+
+        async def call(i: int):
+            payload = {"message": args.question, "session_id": f"load-{i}"}
+            response = await client.post(f"{args.api_url}/chat", json=payload)
+            response.raise_for_status()
+    else:
+        from core.run_graph import get_graph, run_graph
+
+        get_graph()
+        client = None
+
+        async def call(i: int):
+            await run_graph(args.question, [])
+
+    results = []
+    try:
+        for concurrency in args.concurrency:
+            before = stub_config.requests if stub_config else None
+            result = await run_level(call, args.sessions, concurrency)
+            if stub_config:
+                # Round-trips the stub served per chat turn (router + agents + grader)
+                result["llm_calls_per_session"] = round((stub_config.requests - before) / args.sessions, 2)
+            results.append(result)
+        return results
+    finally:
+        if client is not None:
+            await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--sessions", type=int, default=64, help="Chat sessions per concurrency level")
+    parser.add_argument("--question", default=QUESTION)
+    parser.add_argument("--api-url", default=None, help="Load a running API instead of the in-process graph")
+    parser.add_argument("--route", choices=["chat", "rag", "web"], default="chat", help="Stub router reply")
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-delay-ms", type=float, default=5)
+    parser.add_argument("--answer-tokens", type=int, default=40)
+    args = parser.parse_args()
+
+    server = config = None
+    if not args.api_url:
+        config = StubLLMConfig(args.route, args.first_token_ms, args.token_delay_ms, args.answer_tokens)
+        server = start_stub_server(config=config)
+        # Must be set before core.llm is imported
+        os.environ["LLM_BASE_URL"] = stub_base_url(server)
+        os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+
+    results = asyncio.run(benchmark(args, config))
+    if server is not None:
+        server.shutdown()
+
+    print(f"\n{'concurrency':>11} | {'sessions/s':>10} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'LLM calls':>9} | errors")
+    for r in results:
+        lat = r["latency"]
+        print(f"{r['concurrency']:>11} | {r['sessions_per_sec']:>10} | {lat['p50_ms']:>8.1f} | "
+              f"{lat['p95_ms']:>8.1f} | {lat['p99_ms']:>8.1f} | {r.get('llm_calls_per_session', '-'):>9} | {r['errors']}")
+
+
+if __name__ == "__main__":
+    main()
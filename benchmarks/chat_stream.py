@@ -0,0 +1,123 @@
+"""
+Time-to-first-token of streamed chat vs. total latency of the blocking /chat.
+
+    python -m benchmarks.chat_stream --runs 20                      # in-process graph + local stub LLM
+    python -m benchmarks.chat_stream --first-token-ms 500 --token-delay-ms 30 --route rag
+    python -m benchmarks.chat_stream --api-url http://127.0.0.1:8000 --runs 20
+
+Without --api-url the agent graph runs in this process against
+benchmarks/stub_llm_server.py, so the numbers isolate orchestration from
+real LLM latency. With --api-url a running API is measured over HTTP.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List
+
+from benchmarks.common import latency_summary
+from benchmarks.stub_llm_server import StubLLMConfig, start_stub_server, stub_base_url
+
+QUESTION = "What is the treatment for Early Blight?"
+
+
+async def stream_once_in_process(question: str) -> Dict[str, float]:
+    from core.run_graph import stream_graph
+
+    start = time.perf_counter()
+    ttft = None
+    async for kind, _ in stream_graph(question, []):
+        if kind == "token" and ttft is None:
+            ttft = (time.perf_counter() - start) * 1000
+    return {"ttft_ms": ttft, "total_ms": (time.perf_counter() - start) * 1000}
+
+
+async def blocking_once_in_process(question: str) -> float:
+    from core.run_graph import run_graph
+
+    start = time.perf_counter()
+    await run_graph(question, [])
+    return (time.perf_counter() - start) * 1000
+
+
+async def run_in_process(question: str, runs: int):
+    # One event loop for every run: the LLM's async HTTP client is bound to it
+    blocking, streamed = [], []
+    for _ in range(runs):
+        blocking.append(await blocking_once_in_process(question))
+        streamed.append(await stream_once_in_process(question))
+    return blocking, streamed
+
+
+def stream_once_http(client, api_url: str, question: str, session_id: str) -> Dict[str, float]:
+    payload = {"message": question, "session_id": session_id}
+    start = time.perf_counter()
+    ttft = None
+    event = None
+    with client.stream("POST", f"{api_url}/chat/stream", json=payload) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:") and event == "token" and ttft is None:
+                ttft = (time.perf_counter() - start) * 1000
+            elif line.startswith("data:") and event == "error":
+                raise RuntimeError(json.loads(line[len("data:"):])["detail"])
+    return {"ttft_ms": ttft, "total_ms": (time.perf_counter() - start) * 1000}
+
+
+def blocking_once_http(client, api_url: str, question: str, session_id: str) -> float:
+    start = time.perf_counter()
+    client.post(f"{api_url}/chat", json={"message": question, "session_id": session_id}).raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+def summarize(label: str, values: List[float]):
+    values = [v for v in values if v is not None]
+    if not values:
+        print(f"{label:>22}: no samples")
+        return
+    lat = latency_summary(values)
+    print(f"{label:>22}: p50 {lat['p50_ms']:>8.1f} ms | p95 {lat['p95_ms']:>8.1f} ms | p99 {lat['p99_ms']:>8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--question", default=QUESTION)
+    parser.add_argument("--api-url", default=None, help="Measure a running API instead of the in-process graph")
+    parser.add_argument("--route", choices=["chat", "rag", "web"], default="chat", help="Stub router reply")
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-delay-ms", type=float, default=20)
+    parser.add_argument("--answer-tokens", type=int, default=60)
+    args = parser.parse_args()
+
+    streamed, blocking = [], []
+    if args.api_url:
+        import httpx
+
+        with httpx.Client(timeout=120) as client:
+            for i in range(args.runs):
+                blocking.append(blocking_once_http(client, args.api_url, args.question, f"bench-block-{i}"))
+                streamed.append(stream_once_http(client, args.api_url, args.question, f"bench-stream-{i}"))
+    else:
+        config = StubLLMConfig(args.route, args.first_token_ms, args.token_delay_ms, args.answer_tokens)
+        server = start_stub_server(config=config)
+        # Must be set before core.llm is imported
+        os.environ["LLM_BASE_URL"] = stub_base_url(server)
+        os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+
+        blocking, streamed = asyncio.run(run_in_process(args.question, args.runs))
+        server.shutdown()
+        print(f"Stub LLM: route={args.route}, first token {args.first_token_ms} ms, "
+              f"{args.answer_tokens} tokens x {args.token_delay_ms} ms, {config.requests} requests served")
+
+    print(f"\n{args.runs} runs")
+    summarize("/chat total", blocking)
+    summarize("/chat/stream first token", [s["ttft_ms"] for s in streamed])
+    summarize("/chat/stream total", [s["total_ms"] for s in streamed])
+
+
+if __name__ == "__main__":
+    main()
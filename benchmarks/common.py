@@ -0,0 +1,32 @@
+from pathlib import Path
+from typing import List, Sequence
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DATASET_DIR = BASE_DIR / "data" / "dataset"
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+
+
+def list_images(split: str = "test", limit: int = 0) -> List[Path]:
+    """Image paths of a dataset split (`train`, `valid` or `test`), sorted for repeatable runs."""
+    image_dir = DATASET_DIR / split / "images"
+    paths = sorted(p for p in image_dir.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    return paths[:limit] if limit else paths
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile (same definition as numpy's default)."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_summary(latencies_ms: Sequence[float]) -> dict:
+    return {
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+    }
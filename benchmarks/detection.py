@@ -0,0 +1,200 @@
+"""
+Accuracy + latency benchmark of the full detection pipeline (vision.inference.run_yolo_inference)
+over the labelled dataset splits, so performance changes can be checked for quality regressions.
+
+    python -m benchmarks.detection --splits test valid --output bench_detection.json
+    python -m benchmarks.detection --output new.json --compare bench_detection.json
+
+Reports per-class AP@0.5 / precision / recall (class names from data.yaml), mAP@0.5,
+p50/p95/p99 latency, images/sec and peak RSS, and writes a JSON that diffs cleanly between commits.
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import yaml
+
+from benchmarks.common import DATASET_DIR, list_images, latency_summary
+
+MATCH_IOU = 0.5
+
+
+def load_class_names() -> List[str]:
+    with open(DATASET_DIR / "data.yaml") as f:
+        return list(yaml.safe_load(f)["names"])
+
+
+def load_ground_truth(label_path: Path, width: int, height: int) -> List[Dict]:
+    """YOLO label file -> pixel xyxy boxes. Polygon rows are reduced to their bounding box."""
+    boxes = []
+    if not label_path.exists():
+        return boxes
+    for line in label_path.read_text().splitlines():
+        values = line.split()
+        if len(values) < 5:
+            continue
+        cls, coords = int(values[0]), np.array(values[1:], dtype=float)
+        if len(coords) == 4:
+            cx, cy, w, h = coords
+            x1, y1, x2, y2 = cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2
+        else:
+            xs, ys = coords[0::2], coords[1::2]
+            x1, y1, x2, y2 = xs.min(), ys.min(), xs.max(), ys.max()
+        boxes.append({"cls": cls, "x1": x1 * width, "y1": y1 * height, "x2": x2 * width, "y2": y2 * height})
+    return boxes
+
+
+def average_precision(scores: List[float], matched: List[bool], num_gt: int) -> float:
+    """All-point interpolated AP from per-detection (confidence, is_true_positive)."""
+    if num_gt == 0:
+        return float("nan")
+    if not scores:
+        return 0.0
+    order = np.argsort(-np.array(scores), kind="stable")
+    tp = np.array(matched, dtype=float)[order]
+    tp_cum, fp_cum = np.cumsum(tp), np.cumsum(1 - tp)
+    recall = tp_cum / num_gt
+    precision = tp_cum / (tp_cum + fp_cum)
+
+    mrec = np.concatenate([[0.0], recall, [1.0]])
+    mpre = np.concatenate([[1.0], precision, [0.0]])
+    mpre = np.flip(np.maximum.accumulate(np.flip(mpre)))
+    steps = np.flatnonzero(mrec[1:] != mrec[:-1])
+    return float(np.sum((mrec[steps + 1] - mrec[steps]) * mpre[steps + 1]))
+
+
+def evaluate_split(split: str, names: List[str], limit: int = 0) -> Dict:
+    from vision.inference import run_yolo_inference
+    from vision.nms import iou
+
+    label_ids = {name: i for i, name in enumerate(names)}
+    scores = {i: [] for i in range(len(names))}
+    matched = {i: [] for i in range(len(names))}
+    num_gt = {i: 0 for i in range(len(names))}
+    latencies = []
+
+    paths = list_images(split, limit)
+    start = time.perf_counter()
+    for path in paths:
+        image_bytes = path.read_bytes()
+
+        t0 = time.perf_counter()
+        image, detections, _ = run_yolo_inference(image_bytes)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+        height, width = image.shape[:2]
+        ground_truth = load_ground_truth(path.parents[1] / "labels" / f"{path.stem}.txt", width, height)
+        for gt in ground_truth:
+            num_gt[gt["cls"]] += 1
+
+        # Greedy matching per class, strongest detections first
+        used = set()
+        for det in sorted(detections, key=lambda d: d["confidence"], reverse=True):
+            cls = label_ids.get(det["label"])
+            if cls is None:
+                continue
+            best, best_iou = None, MATCH_IOU
+            for k, gt in enumerate(ground_truth):
+                if k in used or gt["cls"] != cls:
+                    continue
+                overlap = iou(det, gt)
+                if overlap >= best_iou:
+                    best, best_iou = k, overlap
+            if best is not None:
+                used.add(best)
+            scores[cls].append(det["confidence"])
+            matched[cls].append(best is not None)
+    elapsed = time.perf_counter() - start
+
+    per_class = {}
+    for i, name in enumerate(names):
+        tp = sum(matched[i])
+        predicted = len(matched[i])
+        per_class[name] = {
+            "ap50": round(average_precision(scores[i], matched[i], num_gt[i]), 4) if num_gt[i] else None,
+            "precision": round(tp / predicted, 4) if predicted else None,
+            "recall": round(tp / num_gt[i], 4) if num_gt[i] else None,
+            "ground_truth": num_gt[i],
+            "detections": predicted,
+        }
+
+    aps = [c["ap50"] for c in per_class.values() if c["ap50"] is not None]
+    return {
+        "images": len(paths),
+        "map50": round(float(np.mean(aps)), 4) if aps else None,
+        "per_class": per_class,
+        "latency": latency_summary(latencies),
+        "images_per_sec": round(len(paths) / elapsed, 2) if elapsed > 0 else None,
+    }
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(rss / (1024 * 1024) if platform.system() == "Darwin" else rss / 1024, 1)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: Dict, baseline: Dict):
+    print(f"\nΔ vs. baseline ({baseline.get('commit')}):")
+    for split, result in current["splits"].items():
+        base = baseline.get("splits", {}).get(split)
+        if not base:
+            continue
+        d_map = (result["map50"] or 0) - (base["map50"] or 0)
+        d_p50 = result["latency"]["p50_ms"] - base["latency"]["p50_ms"]
+        d_p95 = result["latency"]["p95_ms"] - base["latency"]["p95_ms"]
+        print(f"  {split}: mAP50 {d_map:+.4f} | p50 {d_p50:+.1f} ms | p95 {d_p95:+.1f} ms")
+        for name, cls in result["per_class"].items():
+            base_ap = base["per_class"].get(name, {}).get("ap50")
+            if cls["ap50"] is not None and base_ap is not None and abs(cls["ap50"] - base_ap) >= 0.01:
+                print(f"    {name}: AP50 {cls['ap50'] - base_ap:+.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--splits", nargs="+", default=["test", "valid"])
+    parser.add_argument("--images", type=int, default=0, help="Limit images per split (0 = all)")
+    parser.add_argument("--output", type=Path, default=Path("bench_detection.json"))
+    parser.add_argument("--compare", type=Path, default=None, help="Previous result JSON to diff against")
+    args = parser.parse_args()
+
+    from vision.backends import VISION_BACKEND
+
+    names = load_class_names()
+    result = {
+        "commit": git_commit(),
+        "backend": VISION_BACKEND,
+        "splits": {split: evaluate_split(split, names, args.images) for split in args.splits},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+    for split, summary in result["splits"].items():
+        lat = summary["latency"]
+        print(f"{split}: {summary['images']} images | mAP50 {summary['map50']} | "
+              f"p50 {lat['p50_ms']} ms, p95 {lat['p95_ms']} ms, p99 {lat['p99_ms']} ms | {summary['images_per_sec']} img/s")
+        for name, cls in summary["per_class"].items():
+            print(f"    {name:>15}: AP50 {cls['ap50']}  P {cls['precision']}  R {cls['recall']}  (gt {cls['ground_truth']})")
+    print(f"Peak RSS: {result['peak_rss_mb']} MB")
+
+    args.output.write_text(json.dumps(result, indent=2, sort_keys=True) + "\n")
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        compare(result, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
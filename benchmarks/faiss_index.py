@@ -0,0 +1,124 @@
+"""
+FAISS index types against the exact flat baseline: recall@k, single-query latency, size and load time.
+
+    python -m benchmarks.faiss_index                         # synthetic clustered vectors (no model needed)
+    python -m benchmarks.faiss_index --n 200000 --types flat ivf_flat ivf_pq hnsw
+    python -m benchmarks.faiss_index --real                  # vectors in faiss_db/, queries embedded with MiniLM
+
+Recall is measured against exact (flat) neighbours of the same vectors. Search knobs come from
+FAISS_NPROBE / FAISS_EF_SEARCH, or --nprobe / --ef-search.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import faiss
+import numpy as np
+
+import core.faiss_setup as faiss_setup
+from benchmarks.common import latency_summary
+
+
+def synthetic_vectors(n: int, dim: int, queries: int, clusters: int = 64, seed: int = 0):
+    """Normalised vectors around random topic centres, roughly like sentence embeddings of a corpus."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim)).astype(np.float32)
+
+    def sample(count):
+        points = centres[rng.integers(0, clusters, count)] + 0.6 * rng.normal(size=(count, dim)).astype(np.float32)
+        return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+    return sample(n), sample(queries)
+
+
+def real_vectors(queries: int, seed: int = 0):
+    from benchmarks.router import LABELLED_QUESTIONS
+
+    embeddings = faiss_setup.load_embeddings()
+    vectorstore = faiss_setup.load_vectorstore(embeddings)
+    vectors = vectorstore.index.reconstruct_n(0, vectorstore.index.ntotal)
+
+    # Labelled plant questions, topped up with the opening sentence of random chunks
+    texts = [q for q, route in LABELLED_QUESTIONS if route == "rag"]
+    docs = list(vectorstore.docstore._dict.values())
+    rng = np.random.default_rng(seed)
+    for i in rng.permutation(len(docs))[:max(0, queries - len(texts))]:
+        texts.append(docs[i].page_content.split(".")[0][:200])
+    return vectors, np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+
+
+def measure(index_type: str, vectors: np.ndarray, queries: np.ndarray, truth: np.ndarray, k: int) -> dict:
+    start = time.perf_counter()
+    index = faiss_setup.build_index(vectors, index_type)
+    build_s = time.perf_counter() - start
+
+    latencies, hits = [], 0
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, ids = index.search(query[None], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(set(ids[0]) & set(truth[i]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.faiss")
+        faiss.write_index(index, path)
+        size_mb = os.path.getsize(path) / 1e6
+        start = time.perf_counter()
+        faiss.read_index(path)
+        load_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        mmap_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "type": index_type,
+        "index": type(index).__name__,
+        f"recall@{k}": hits / (len(queries) * k),
+        "build_s": build_s,
+        "size_mb": size_mb,
+        "load_ms": load_ms,
+        "mmap_load_ms": mmap_ms,
+        **latency_summary(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--real", action="store_true", help="Use the vectors in faiss_db/ instead of synthetic ones")
+    parser.add_argument("--n", type=int, default=50000, help="Synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=384, help="Synthetic dimensions (MiniLM: 384)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=faiss_setup.RETRIEVER_K)
+    parser.add_argument("--types", nargs="+", default=list(faiss_setup.INDEX_TYPES), choices=faiss_setup.INDEX_TYPES)
+    parser.add_argument("--nprobe", type=int, default=None)
+    parser.add_argument("--ef-search", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.nprobe is not None:
+        faiss_setup.FAISS_NPROBE = args.nprobe
+    if args.ef_search is not None:
+        faiss_setup.FAISS_EF_SEARCH = args.ef_search
+
+    if args.real:
+        vectors, queries = real_vectors(args.queries)
+    else:
+        vectors, queries = synthetic_vectors(args.n, args.dim, args.queries)
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, k={args.k}, "
+          f"nprobe={faiss_setup.FAISS_NPROBE}, efSearch={faiss_setup.FAISS_EF_SEARCH}")
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    _, truth = exact.search(queries, args.k)
+
+    print(f"{'type':>9} | {'index':>22} | {'recall':>6} | {'p50 ms':>7} | {'p95 ms':>7} | {'build s':>7} | "
+          f"{'MB':>7} | {'load ms':>8} | {'mmap ms':>7}")
+    for index_type in args.types:
+        r = measure(index_type, vectors, queries, truth, args.k)
+        print(f"{r['type']:>9} | {r['index']:>22} | {r[f'recall@{args.k}']:>6.3f} | {r['p50_ms']:>7.3f} | "
+              f"{r['p95_ms']:>7.3f} | {r['build_s']:>7.2f} | {r['size_mb']:>7.1f} | {r['load_ms']:>8.1f} | "
+              f"{r['mmap_load_ms']:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Retrieval quality and latency per RETRIEVAL_MODE on labelled questions per disease.
+
+    python -m benchmarks.retrieval                    # vector, bm25, hybrid over faiss_db/
+    python -m benchmarks.retrieval --rerank           # + hybrid with the cross-encoder rerank
+    python -m benchmarks.retrieval --k 3 --modes vector hybrid
+    python -m benchmarks.retrieval --scoped           # + each mode restricted to the question's disease partition
+
+A retrieved chunk is relevant when it comes from one of the disease's PDFs in context/.
+hit@k: at least one relevant chunk in the top k. MRR: 1 / rank of the first relevant chunk.
+precision@k: share of the top k that is relevant (what the grader gets to see).
+"""
+import argparse
+import time
+from pathlib import Path
+
+from benchmarks.common import latency_summary
+
+# Disease (data.yaml class) -> context/ PDFs about it
+DISEASE_SOURCES = {
+    "Bacterial Spot": ["bacterial_spot1.pdf", "bacterial_spot2.pdf"],
+    "Early_Blight": ["early_blight1.pdf", "early_blight2.pdf"],
+    "Late_blight": ["late_blight1.pdf", "late_blight2.pdf"],
+    "Leaf Mold": ["leaf_mold1.pdf"],
+    "Target_Spot": ["target_spot1.pdf", "9068_SE_S9_Target-Spot-of-Tomato.pdf"],
+}
+
+LABELLED_QUESTIONS = [
+    ("Bacterial Spot", "What is the treatment for Bacterial Spot?"),
+    ("Bacterial Spot", "How does Xanthomonas spread between tomato plants?"),
+    ("Bacterial Spot", "Do copper sprays control bacterial spot on tomato leaves?"),
+    ("Bacterial Spot", "What do bacterial spot lesions look like on tomato fruit?"),
+    ("Early_Blight", "What is the treatment for Early_Blight?"),
+    ("Early_Blight", "What causes concentric ring target-like lesions on older tomato leaves?"),
+    ("Early_Blight", "How does Alternaria solani survive between seasons?"),
+    ("Early_Blight", "Which fungicides are recommended for early blight?"),
+    ("Late_blight", "What is the treatment for Late_blight?"),
+    ("Late_blight", "How fast can Phytophthora infestans destroy a tomato crop?"),
+    ("Late_blight", "What weather conditions favour late blight outbreaks?"),
+    ("Late_blight", "Why do tomato leaves get water-soaked grey-green patches with white mould underneath?"),
+    ("Leaf Mold", "What is the treatment for Leaf Mold?"),
+    ("Leaf Mold", "Why does leaf mold spread in humid greenhouses?"),
+    ("Leaf Mold", "What are the olive green velvety patches under tomato leaves?"),
+    ("Target_Spot", "What is the treatment for Target_Spot?"),
+    ("Target_Spot", "How is Corynespora cassiicola managed on tomato?"),
+    ("Target_Spot", "What are the symptoms of target spot on tomato fruit?"),
+]
+
+
+def evaluate(registry, mode: str, rerank: bool, k: int, scoped: bool = False) -> dict:
+    hits = reciprocal_ranks = relevant_share = 0.0
+    latencies = []
+    per_disease = {}
+    for disease, question in LABELLED_QUESTIONS:
+        start = time.perf_counter()
+        docs = registry.retrieve(question, k, mode=mode, rerank=rerank, disease=disease if scoped else None)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        relevant = [Path(d.metadata.get("source", "")).name in DISEASE_SOURCES[disease] for d in docs]
+        first = relevant.index(True) + 1 if any(relevant) else None
+        hits += first is not None
+        reciprocal_ranks += 1 / first if first else 0.0
+        relevant_share += sum(relevant) / k
+        per_disease.setdefault(disease, []).append(first is not None)
+
+    n = len(LABELLED_QUESTIONS)
+    return {
+        "hit@k": hits / n,
+        "mrr": reciprocal_ranks / n,
+        "precision@k": relevant_share / n,
+        "per_disease_hits": {d: f"{sum(v)}/{len(v)}" for d, v in per_disease.items()},
+        **latency_summary(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=None, help="Chunks per query (default RETRIEVER_K)")
+    parser.add_argument("--modes", nargs="+", default=["vector", "bm25", "hybrid"], choices=["vector", "bm25", "hybrid"])
+    parser.add_argument("--rerank", action="store_true", help="Also run hybrid + cross-encoder rerank (RERANK_MODEL)")
+    parser.add_argument("--scoped", action="store_true", help="Also run every mode filtered to the labelled disease")
+    args = parser.parse_args()
+
+    from core.retriever_registry import retriever_registry
+
+    retriever_registry.load()
+    k = args.k or retriever_registry.k
+    runs = [(mode, False, False) for mode in args.modes] + ([("hybrid", True, False)] if args.rerank else [])
+    if args.scoped:
+        if retriever_registry.partitions is None:
+            parser.error("--scoped needs DISEASE_FILTER=1")
+        runs += [(mode, rerank, True) for mode, rerank, _ in runs]
+
+    # One untimed pass per run so lazy loads (BM25, reranker) and caches don't skew latency
+    for mode, rerank, _ in runs:
+        retriever_registry.retrieve(LABELLED_QUESTIONS[0][1], k, mode=mode, rerank=rerank)
+
+    print(f"{len(LABELLED_QUESTIONS)} questions, {len(DISEASE_SOURCES)} diseases, k={k}, {retriever_registry.index_size} chunks")
+    print(f"{'mode':>24} | {'hit@k':>5} | {'MRR':>5} | {'prec@k':>6} | {'p50 ms':>7} | {'p95 ms':>7} | per disease")
+    for mode, rerank, scoped in runs:
+        r = evaluate(retriever_registry, mode, rerank, k, scoped)
+        label = (f"{mode}+rerank" if rerank else mode) + (" @disease" if scoped else "")
+        per_disease = ", ".join(f"{d} {h}" for d, h in r["per_disease_hits"].items())
+        print(f"{label:>24} | {r['hit@k']:>5.2f} | {r['mrr']:>5.2f} | {r['precision@k']:>6.2f} | "
+              f"{r['p50_ms']:>7.2f} | {r['p95_ms']:>7.2f} | {per_disease}")
+
+
+if __name__ == "__main__":
+    main()
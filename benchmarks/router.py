@@ -0,0 +1,74 @@
+"""
+Fast-path router accuracy on labelled questions: how many turns skip the LLM, and how often the local decision is right.
+
+    python -m benchmarks.router                  # rules + MiniLM embeddings (loads the retriever)
+    python -m benchmarks.router --rules-only
+
+Questions the fast path leaves undecided would go to the LLM router.
+"""
+import argparse
+import time
+
+from benchmarks.common import latency_summary
+
+LABELLED_QUESTIONS = [
+    ("hi", "chat"),
+    ("Hello!", "chat"),
+    ("thanks", "chat"),
+    ("what can you do", "chat"),
+    ("can you say that again more simply?", "chat"),
+    ("What is the treatment for Early_Blight?", "rag"),
+    ("What are the symptoms of Late_blight?", "rag"),
+    ("How do I stop leaf mold spreading in my greenhouse?", "rag"),
+    ("Which fungicide should I use for target spot?", "rag"),
+    ("Is bacterial spot dangerous for the rest of my tomato plants?", "rag"),
+    ("How often should I spray copper?", "rag"),
+    ("Should I remove the infected leaves?", "rag"),
+    ("What causes black spot?", "rag"),
+    ("How does this disease spread?", "rag"),
+    ("Can I still eat the fruit?", "rag"),
+    ("What's the weather tomorrow in Colombo?", "web"),
+    ("latest bitcoin price", "web"),
+    ("who won the cricket match yesterday", "web"),
+    ("how do I treat a fever", "web"),
+    ("what is the dollar exchange rate today", "web"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules-only", action="store_true", help="Skip the embedding stage")
+    args = parser.parse_args()
+
+    from agents.intent_classifier import embedding_classifier, rule_intent
+    from core.retriever_registry import retriever_registry
+
+    if not args.rules_only:
+        retriever_registry.load()
+
+    decided = correct = 0
+    latencies = []
+    for question, expected in LABELLED_QUESTIONS:
+        start = time.perf_counter()
+        decision = rule_intent(question)
+        if decision is None and not args.rules_only:
+            decision = embedding_classifier.classify(question)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        route = decision.route if decision else None
+        source = decision.source if decision else "-"
+        if route:
+            decided += 1
+            correct += route == expected
+        mark = "LLM" if route is None else ("ok" if route == expected else "WRONG")
+        print(f"{mark:>5} | {source:>9} | {str(route):>4} (expected {expected}) | {question}")
+
+    total = len(LABELLED_QUESTIONS)
+    lat = latency_summary(latencies)
+    print(f"\nFast-path hit rate: {decided}/{total} ({decided / total:.0%}) | "
+          f"accuracy when decided: {correct}/{decided} ({correct / max(decided, 1):.0%})")
+    print(f"Fast-path latency: p50 {lat['p50_ms']} ms, p95 {lat['p95_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+End-to-end latency of a RAG turn in GRAPH_MODE=sequential vs. speculative, for both grader outcomes:
+RAG accepted (speculative web search cancelled) and RAG rejected (web fallback).
+
+    python -m benchmarks.speculation --runs 10 --llm-ms 300 --web-ms 800 --retrieval-ms 50
+
+Runs in process against the stub LLM server. Retrieval and the Tavily search are simulated with
+fixed latencies so only the graph shape differs. The router is the LLM (ROUTER_MODE=llm), so
+every RAG turn has no local confidence and speculates.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.common import latency_summary
+from benchmarks.stub_llm_server import StubLLMConfig, start_stub_server, stub_base_url
+
+QUESTION = "Why are my tomato leaves curling after rain?"
+
+
+def simulate_tools(retrieval_ms: float, web_ms: float):
+    from langchain_core.documents import Document
+
+    import tools.tavily_search_tool as tavily_module
+    from core.retriever_registry import retriever_registry
+
+    def search(query, disease=None):
+        time.sleep(retrieval_ms / 1000)
+        return [Document(page_content="Leaf curl can follow heavy rain and temperature swings.")]
+
+    class SimulatedTavily:
+        async def search(self, query, max_results=3):
+            await asyncio.sleep(web_ms / 1000)
+            return {"results": [{"content": "Leaf roll is a physiological response to stress."}]}
+
+    retriever_registry.load = lambda: None
+    retriever_registry.search = search
+    tavily_module._async_tavily = SimulatedTavily()
+
+
+async def run_in_process(config: StubLLMConfig, runs: int):
+    import core.build_graph as build_module
+    from core.run_graph import initial_state, prepare_messages
+    from core.speculation import speculation_registry, turn_path
+
+    graphs = {}
+    for mode in ("sequential", "speculative"):
+        build_module.GRAPH_MODE = mode
+        graphs[mode] = build_module.build_graph()
+
+    results = {}
+    for grade in ("yes", "no"):
+        config.grade = grade
+        for mode, graph in graphs.items():
+            latencies, path = [], None
+            for _ in range(runs):
+                start = time.perf_counter()
+                state = await graph.ainvoke(initial_state(QUESTION, prepare_messages(QUESTION)))
+                latencies.append((time.perf_counter() - start) * 1000)
+                speculation_registry.cancel(state["run_id"])
+                path = turn_path(state)
+            results[(grade, mode)] = (path, latency_summary(latencies))
+    return results, speculation_registry.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--llm-ms", type=float, default=300, help="Stub LLM latency per call")
+    parser.add_argument("--web-ms", type=float, default=800, help="Simulated Tavily search latency")
+    parser.add_argument("--retrieval-ms", type=float, default=50, help="Simulated FAISS retrieval latency")
+    args = parser.parse_args()
+
+    config = StubLLMConfig(route="rag", first_token_ms=args.llm_ms, token_delay_ms=0, answer_tokens=20)
+    server = start_stub_server(config=config)
+    # Must be set before core.llm is imported
+    os.environ["LLM_BASE_URL"] = stub_base_url(server)
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+    os.environ["ROUTER_MODE"] = "llm"
+
+    simulate_tools(args.retrieval_ms, args.web_ms)
+    try:
+        # One event loop for every run: the async OpenAI client is bound to the loop it first ran on
+        results, speculation = asyncio.run(run_in_process(config, args.runs))
+    finally:
+        server.shutdown()
+
+    print(f"{args.runs} runs per cell | LLM {args.llm_ms:.0f} ms/call, web {args.web_ms:.0f} ms, retrieval {args.retrieval_ms:.0f} ms")
+    print(f"{'grader':>8} | {'path':>12} | {'sequential p50':>14} | {'speculative p50':>15} | {'saved':>7}")
+    for grade in ("yes", "no"):
+        path, sequential = results[(grade, "sequential")]
+        _, speculative = results[(grade, "speculative")]
+        saved = sequential["p50_ms"] - speculative["p50_ms"]
+        print(f"{grade:>8} | {path:>12} | {sequential['p50_ms']:>11.0f} ms | {speculative['p50_ms']:>12.0f} ms | {saved:>4.0f} ms")
+    print(f"Speculative searches: {speculation['started']} started, {speculation['used_by_fallback']} used, "
+          f"{speculation['cancelled']} cancelled | fallback time saved {speculation['fallback_time_saved_s']} s, "
+          f"discarded search time {speculation['discarded_search_time_s']} s")
+
+
+if __name__ == "__main__":
+    main()
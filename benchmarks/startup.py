@@ -0,0 +1,95 @@
+"""
+Cold-start profile of the API process.
+
+    python -m benchmarks.startup                 # import profile + startup for each STARTUP_MODE
+    python -m benchmarks.startup --top 25 --modes background eager
+
+Each measurement runs in a fresh interpreter so nothing is cached between runs.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import BASE_DIR
+
+# Runs in the child process: time import, lifespan startup, and time until /health/ready is 200
+_PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import api.main
+t_import = time.perf_counter() - t0
+from fastapi.testclient import TestClient
+with TestClient(api.main.app) as client:
+    t_live = time.perf_counter() - t0
+    ready = None
+    while time.perf_counter() - t0 < TIMEOUT:
+        if client.get("/health/ready").status_code == 200:
+            ready = time.perf_counter() - t0
+            break
+        time.sleep(0.05)
+print(json.dumps({"import_s": t_import, "live_s": t_live, "ready_s": ready}))
+"""
+
+
+def _env(mode: str):
+    return dict(os.environ, STARTUP_MODE=mode, PYTHONPATH=str(BASE_DIR))
+
+
+def import_profile(top: int):
+    """Heaviest modules (cumulative µs) when importing api.main, via `python -X importtime`."""
+    with tempfile.TemporaryDirectory() as cwd:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import api.main"],
+            cwd=cwd, env=_env("lazy"), capture_output=True, text=True,
+        )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nesting is shown by indentation; top-level imports have none
+        rows.append((int(cumulative_us), int(self_us), name[1:].rstrip()))
+    total = max((r[0] for r in rows if not r[2].startswith(" ")), default=0)
+    return total, sorted(rows, reverse=True)[:top]
+
+
+def startup(mode: str, timeout: float):
+    with tempfile.TemporaryDirectory() as cwd:
+        proc = subprocess.run(
+            [sys.executable, "-c", f"TIMEOUT = {timeout}\n" + _PROBE],
+            cwd=cwd, env=_env(mode), capture_output=True, text=True,
+        )
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        return {"error": (proc.stderr.strip().splitlines() or ["failed"])[-1]}
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--modes", nargs="+", default=["lazy", "background", "eager"])
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    total, rows = import_profile(args.top)
+    print(f"import api.main: {total / 1000:.0f} ms")
+    print(f"{'cumulative ms':>14} | {'self ms':>8} | module")
+    for cumulative, self_us, name in rows:
+        print(f"{cumulative / 1000:>14.1f} | {self_us / 1000:>8.1f} | {name}")
+
+    print(f"\n{'mode':>10} | {'import s':>9} | {'live s':>7} | {'ready s':>8}")
+    for mode in args.modes:
+        result = startup(mode, args.timeout)
+        if "error" in result:
+            print(f"{mode:>10} | error: {result['error']}")
+            continue
+        ready = f"{result['ready_s']:.2f}" if result["ready_s"] is not None else "timeout"
+        print(f"{mode:>10} | {result['import_s']:>9.2f} | {result['live_s']:>7.2f} | {ready:>8}")
+
+
+if __name__ == "__main__":
+    main()
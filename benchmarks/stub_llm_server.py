@@ -0,0 +1,211 @@
+"""
+Minimal OpenAI-compatible chat completions server with configurable latency,
+for testing streaming / concurrency without a real LLM (stdlib only).
+
+    python -m benchmarks.stub_llm_server --port 8001 --first-token-ms 300 --token-delay-ms 20
+    LLM_BASE_URL=http://127.0.0.1:8001/v1 OPENROUTER_API_KEY=stub uvicorn api.main:app
+
+Replies are picked from the prompt so the agent graph runs end to end:
+the router prompt gets `--route`, the relevance grader gets `--grade`, requests
+with tools get one tool call, structured-output requests get a JSON object
+matching their schema, everything else gets an `--answer-tokens` word answer.
+"""
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+ANSWER_WORDS = (
+    "Remove infected leaves, improve air circulation, avoid overhead watering "
+    "and apply a copper based fungicide every seven to ten days."
+).split()
+
+
+class StubLLMConfig:
+    def __init__(self, route: str = "chat", first_token_ms: float = 300, token_delay_ms: float = 20, answer_tokens: int = 60,
+                 grade: str = "yes"):
+        self.route = route
+        # Grader verdict on retrieved context; "no" drives the graph into the web fallback
+        self.grade = grade
+        self.first_token_ms = first_token_ms
+        self.token_delay_ms = token_delay_ms
+        self.answer_tokens = answer_tokens
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+
+def _text(message: Dict) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+def plan_reply(body: Dict, config: StubLLMConfig):
+    """(text tokens, tool_call or None) for a chat completions request body."""
+    messages = body.get("messages", [])
+    prompt = "\n".join(_text(m) for m in messages)
+
+    if body.get("tools"):
+        question = next((_text(m) for m in reversed(messages) if m.get("role") == "user"), prompt)
+        tool = body["tools"][0]["function"]["name"]
+        return [], {"id": f"call_{uuid.uuid4().hex[:12]}", "name": tool, "arguments": json.dumps({"query": question})}
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        # Streamed a few characters per token, like a real model writing JSON
+        return re.findall(r"\S+\s*|\s+", json.dumps(structured_reply(response_format["json_schema"].get("schema", {}), config))), None
+    if "Classify the user's question" in prompt:
+        return [config.route], None
+    if "relevance grader" in prompt:
+        return [config.grade], None
+    words = [ANSWER_WORDS[i % len(ANSWER_WORDS)] for i in range(config.answer_tokens)]
+    return [w + " " for w in words[:-1]] + words[-1:], None
+
+
+def structured_reply(schema: Dict, config: StubLLMConfig) -> Dict:
+    """Fill a JSON schema object: booleans follow `grade`, numbers 1, strings the canned answer."""
+    reply = {}
+    for name, prop in schema.get("properties", {}).items():
+        kind = prop.get("type")
+        if kind == "boolean":
+            reply[name] = config.grade == "yes"
+        elif kind in ("number", "integer"):
+            reply[name] = 1
+        elif kind == "string":
+            reply[name] = " ".join(ANSWER_WORDS[i % len(ANSWER_WORDS)] for i in range(config.answer_tokens))
+        else:
+            reply[name] = None
+    return reply
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config: StubLLMConfig = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        # /v1/models, enough for clients that probe the server
+        self._send_json({"object": "list", "data": [{"id": "stub", "object": "model"}]})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json({"error": {"message": f"unknown path {self.path}"}}, status=404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        self.config.count()
+        tokens, tool_call = plan_reply(body, self.config)
+        model = body.get("model", "stub")
+        if body.get("stream"):
+            self._stream(model, tokens, tool_call)
+        else:
+            time.sleep((self.config.first_token_ms + self.config.token_delay_ms * max(len(tokens) - 1, 0)) / 1000)
+            self._send_json(_completion(model, "".join(tokens), tool_call))
+
+    def _send_json(self, payload: Dict, status: int = 200):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, model: str, tokens: List[str], tool_call: Optional[Dict]):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        time.sleep(self.config.first_token_ms / 1000)
+        if tool_call:
+            delta = {"role": "assistant", "tool_calls": [{
+                "index": 0, "id": tool_call["id"], "type": "function",
+                "function": {"name": tool_call["name"], "arguments": tool_call["arguments"]},
+            }]}
+            self._chunk(_chunk(completion_id, model, delta))
+            self._chunk(_chunk(completion_id, model, {}, "tool_calls"))
+        else:
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(self.config.token_delay_ms / 1000)
+                delta = {"role": "assistant", "content": token} if i == 0 else {"content": token}
+                self._chunk(_chunk(completion_id, model, delta))
+            self._chunk(_chunk(completion_id, model, {}, "stop"))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _chunk(self, payload: Dict):
+        self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode())
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+def _chunk(completion_id: str, model: str, delta: Dict, finish_reason: Optional[str] = None) -> Dict:
+    return {
+        "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+def _completion(model: str, text: str, tool_call: Optional[Dict]) -> Dict:
+    message = {"role": "assistant", "content": text or None}
+    if tool_call:
+        message["tool_calls"] = [{
+            "id": tool_call["id"], "type": "function",
+            "function": {"name": tool_call["name"], "arguments": tool_call["arguments"]},
+        }]
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool_call else "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, config: Optional[StubLLMConfig] = None) -> ThreadingHTTPServer:
+    """Serve in a daemon thread; port 0 picks a free port (see `server.server_address`)."""
+    handler = type("ConfiguredStubLLMHandler", (StubLLMHandler,), {"config": config or StubLLMConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stub_base_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--route", choices=["chat", "rag", "web"], default="chat", help="Router reply")
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-delay-ms", type=float, default=20)
+    parser.add_argument("--answer-tokens", type=int, default=60)
+    parser.add_argument("--grade", choices=["yes", "no"], default="yes", help="Grader verdict on retrieved context")
+    args = parser.parse_args()
+
+    config = StubLLMConfig(args.route, args.first_token_ms, args.token_delay_ms, args.answer_tokens, args.grade)
+    server = start_stub_server(args.host, args.port, config)
+    print(f"Stub LLM serving on {stub_base_url(server)} (route={args.route})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
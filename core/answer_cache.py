@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.retriever_registry import retriever_registry
+
+# --- CONFIGURATION ---
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE", "1") == "1"
+# Cosine similarity between (disease + question) embeddings needed to reuse an answer
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+ANSWER_CACHE_TTL_S = float(os.getenv("ANSWER_CACHE_TTL_S", "86400"))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1000"))
+
+# Same layout as core/faiss_setup.py (not imported: it pulls in langchain_community)
+BASE_DIR = Path(__file__).resolve().parents[1]
+PDF_FOLDER = BASE_DIR / "context"
+MANIFEST_PATH = BASE_DIR / "faiss_db" / "manifest.json"
+_FINGERPRINT_CHECK_INTERVAL_S = 30
+
+# (path, size, mtime_ns) -> sha256, so the periodic check only re-reads files that changed
+_content_hashes: Dict[Tuple[str, int, int], str] = {}
+
+
+def _file_sha256(path: Path) -> str:
+    stat = path.stat()
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _content_hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _content_hashes[key] = digest.hexdigest()
+    return _content_hashes[key]
+
+
+def corpus_fingerprint(manifest_path: Path = MANIFEST_PATH, pdf_folder: Path = PDF_FOLDER) -> str:
+    """
+    Hash of the indexed PDFs' contents and the index settings, taken from faiss_db/manifest.json
+    (or the PDFs themselves before the first index build). Survives clones, copies and deploys,
+    and ignores derived files such as bm25.json.
+    """
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        files = {name: entry["sha256"] for name, entry in manifest.get("files", {}).items()}
+        settings = {k: v for k, v in manifest.items() if k != "files"}
+    else:
+        files = {path.name: _file_sha256(path) for path in sorted(pdf_folder.glob("*.pdf"))}
+        settings = {}
+    payload = json.dumps({"settings": settings, "files": files}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class CachedAnswer:
+    __slots__ = ("question", "disease", "answer", "created_at", "last_used")
+
+    def __init__(self, question: str, disease: Optional[str], answer: str):
+        self.question = question
+        self.disease = disease
+        self.answer = answer
+        self.created_at = self.last_used = time.time()
+
+
+class SemanticAnswerCache:
+    """
+    Answers to previously asked RAG questions, looked up by embedding similarity of
+    "disease: question". Entries only match the same detected disease, expire after
+    `ttl_s`, are LRU-evicted past `max_entries`, and are dropped when the corpus changes.
+    """
+
+    def __init__(self, threshold: float = ANSWER_CACHE_THRESHOLD, ttl_s: float = ANSWER_CACHE_TTL_S, max_entries: int = ANSWER_CACHE_SIZE, fingerprint_fn=corpus_fingerprint):
+        self.threshold = threshold
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.fingerprint_fn = fingerprint_fn
+
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._entries: List[CachedAnswer] = []
+        self._fingerprint: Optional[str] = None
+        self._last_fingerprint_check = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lookup_time_s = 0.0
+
+    @staticmethod
+    def cache_text(question: str, disease: Optional[str]) -> str:
+        return f"{(disease or 'unknown').replace('_', ' ')}: {question.strip()}"
+
+    def embed(self, question: str, disease: Optional[str]) -> Optional[np.ndarray]:
+        # Only with a warm retriever; the cache is an optimisation, never a reason to wait
+        if not retriever_registry.is_loaded:
+            return None
+        vector = np.asarray(retriever_registry.embeddings.embed_query(self.cache_text(question, disease)), dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def _check_corpus(self, now: float):
+        if now - self._last_fingerprint_check < _FINGERPRINT_CHECK_INTERVAL_S:
+            return
+        self._last_fingerprint_check = now
+        fingerprint = self.fingerprint_fn()
+        if self._fingerprint is not None and fingerprint != self._fingerprint and self._entries:
+            print(f"♻️ Corpus changed; dropping {len(self._entries)} cached answers")
+            self._matrix, self._entries = None, []
+            self.invalidations += 1
+        self._fingerprint = fingerprint
+
+    def _remove(self, rows: List[int]):
+        drop = set(rows)
+        keep = [i for i in range(len(self._entries)) if i not in drop]
+        self._entries = [self._entries[i] for i in keep]
+        self._matrix = self._matrix[keep] if keep else None
+
+    def lookup(self, question: str, disease: Optional[str]) -> Tuple[Optional[str], Optional[np.ndarray]]:
+        """(cached answer or None, question vector to pass to `put` on a miss)."""
+        start = time.perf_counter()
+        vector = self.embed(question, disease)
+        if vector is None:
+            with self._lock:
+                self.skipped += 1
+            return None, None
+
+        now = time.time()
+        with self._lock:
+            self._check_corpus(now)
+            answer = None
+            if self._entries:
+                expired = [i for i, e in enumerate(self._entries) if now - e.created_at > self.ttl_s]
+                if expired:
+                    self._remove(expired)
+            if self._entries:
+                sims = self._matrix @ vector
+                same_disease = np.array([e.disease == disease for e in self._entries])
+                sims = np.where(same_disease, sims, -1.0)
+                best = int(np.argmax(sims))
+                if sims[best] >= self.threshold:
+                    entry = self._entries[best]
+                    entry.last_used = now
+                    answer = entry.answer
+                    print(f"🎯 Answer cache hit ({sims[best]:.3f}): {entry.question!r}")
+
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            self.lookup_time_s += time.perf_counter() - start
+        return answer, vector
+
+    def put(self, vector: Optional[np.ndarray], question: str, disease: Optional[str], answer: str):
+        if vector is None or not answer:
+            return
+        with self._lock:
+            self._entries.append(CachedAnswer(question, disease, answer))
+            self._matrix = vector[None] if self._matrix is None else np.vstack([self._matrix, vector])
+            if len(self._entries) > self.max_entries:
+                oldest = min(range(len(self._entries)), key=lambda i: self._entries[i].last_used)
+                self._remove([oldest])
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._matrix, self._entries = None, []
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": ANSWER_CACHE_ENABLED,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "skipped_cold": self.skipped,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "avg_lookup_ms": round(self.lookup_time_s / lookups * 1000, 2) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "corpus_fingerprint": self._fingerprint,
+            }
+
+
+answer_cache = SemanticAnswerCache()
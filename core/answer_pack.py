@@ -0,0 +1,170 @@
+"""
+Precomputed answers to the auto-generated first chat question for every detection class.
+
+    python -m core.answer_pack build            # retrieve + answer each class in data.yaml, write a new pack
+    python -m core.answer_pack show             # print the pack the API would serve
+
+Packs are written as answer_pack/pack-<UTC timestamp>.json and never overwritten; the API serves
+the newest one built from the current corpus (see core.answer_cache.corpus_fingerprint).
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from core.answer_cache import corpus_fingerprint
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+ANSWER_PACK_ENABLED = os.getenv("ANSWER_PACK", "1") == "1"
+ANSWER_PACK_DIR = Path(os.getenv("ANSWER_PACK_DIR", str(BASE_DIR / "answer_pack")))
+DATA_YAML = BASE_DIR / "data" / "dataset" / "data.yaml"
+
+
+def first_question(disease: str) -> str:
+    """The question /chat asks on behalf of the user right after a detection."""
+    return f"What is the treatment for {disease}?"
+
+
+def load_class_names(path: Path = DATA_YAML) -> List[str]:
+    # Only the build CLI reads data.yaml; keeps PyYAML off the API import path
+    import yaml
+
+    with open(path) as f:
+        return list(yaml.safe_load(f)["names"])
+
+
+class AnswerPack:
+    """Newest on-disk pack matching the current corpus, loaded on first use."""
+
+    def __init__(self, pack_dir: Path = ANSWER_PACK_DIR):
+        self.pack_dir = pack_dir
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.version: Optional[str] = None
+        self.answers: Dict[str, Dict] = {}
+        self.hits = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def load(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            fingerprint = corpus_fingerprint()
+            for path in sorted(self.pack_dir.glob("pack-*.json"), reverse=True):
+                pack = json.loads(path.read_text())
+                if pack.get("corpus_fingerprint") != fingerprint:
+                    print(f"⚠️ Skipping answer pack {path.name}: built from a different corpus "
+                          f"(pack {pack.get('corpus_fingerprint')}, current {fingerprint}); rebuild it with `python -m core.answer_pack build`")
+                    continue
+                self.version = pack["version"]
+                self.answers = pack["answers"]
+                print(f"📦 Answer pack {self.version} loaded ({len(self.answers)} diseases)")
+                break
+            else:
+                if any(self.pack_dir.glob("pack-*.json")):
+                    print("⚠️ No answer pack matches the current corpus; first questions go to the live graph")
+            self._loaded = True
+
+    def get(self, disease: Optional[str], question: str) -> Optional[str]:
+        """Precomputed answer when `question` is the auto-generated first question for `disease`."""
+        if not ANSWER_PACK_ENABLED or not disease or question != first_question(disease):
+            return None
+        self.load()
+        entry = self.answers.get(disease)
+        if entry is None:
+            return None
+        with self._lock:
+            self.hits += 1
+        print(f"📦 Answer pack hit for {disease}")
+        return entry["answer"]
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": ANSWER_PACK_ENABLED,
+            "loaded": self._loaded,
+            "version": self.version,
+            "diseases": sorted(self.answers),
+            "hits": self.hits,
+        }
+
+
+answer_pack = AnswerPack()
+
+
+async def build_answer(disease: str) -> Optional[Dict]:
+    """Retrieve from FAISS and produce a grounded answer with the same grader/answer prompt as /chat."""
+    from agents.grader_answer_agent import grade_and_answer
+    from core.context_budget import CHUNK_SEPARATOR
+    from core.retriever_registry import retriever_registry
+
+    question = first_question(disease)
+    docs = await asyncio.to_thread(retriever_registry.search, question, disease)
+    context = CHUNK_SEPARATOR.join(d.page_content for d in docs)
+    state = await grade_and_answer({"question": question}, [context])
+    if not state.get("enough_info"):
+        return None
+    return {
+        "question": question,
+        "answer": state["final_answer"],
+        "sources": sorted({f"{Path(d.metadata.get('source', '?')).name}:{d.metadata.get('page', '?')}" for d in docs}),
+    }
+
+
+async def build_pack(diseases: List[str]) -> Dict:
+    from core.llm import LLM_MODEL
+
+    answers = {}
+    for disease in diseases:
+        start = time.perf_counter()
+        entry = await build_answer(disease)
+        elapsed = time.perf_counter() - start
+        if entry is None:
+            print(f"  ✗ {disease}: corpus does not answer it ({elapsed:.1f}s); left to the live graph")
+            continue
+        answers[disease] = entry
+        print(f"  ✓ {disease} ({elapsed:.1f}s)")
+
+    created = datetime.now(timezone.utc)
+    return {
+        "version": created.strftime("%Y%m%dT%H%M%SZ"),
+        "created_at": created.isoformat(),
+        "corpus_fingerprint": corpus_fingerprint(),
+        "model": LLM_MODEL,
+        "answers": answers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["build", "show"])
+    parser.add_argument("--diseases", nargs="+", default=None, help="Subset of data.yaml class names")
+    args = parser.parse_args()
+
+    if args.command == "show":
+        answer_pack.load()
+        print(json.dumps({"version": answer_pack.version, "answers": answer_pack.answers}, indent=2))
+        return
+
+    diseases = args.diseases or load_class_names()
+    print(f"Building answer pack for {len(diseases)} classes...")
+    start = time.perf_counter()
+    pack = asyncio.run(build_pack(diseases))
+
+    ANSWER_PACK_DIR.mkdir(parents=True, exist_ok=True)
+    path = ANSWER_PACK_DIR / f"pack-{pack['version']}.json"
+    path.write_text(json.dumps(pack, indent=2, sort_keys=True) + "\n")
+    print(f"Answer pack written to {path} ({len(pack['answers'])}/{len(diseases)} classes, {time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
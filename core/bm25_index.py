@@ -0,0 +1,116 @@
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i in is it its my of on or should "
+    "that the their this to was what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    # "Early_Blight" and "early blight" must produce the same terms
+    return [t for t in _TOKEN.findall(text.lower().replace("_", " ")) if t not in _STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the chunks in the FAISS docstore, keyed by docstore id.
+    Postings are kept as numpy arrays so a query scores every matching chunk in a few vector ops.
+    """
+
+    def __init__(self, doc_ids: List[str], doc_lens: Sequence[int], postings: Dict[str, Tuple[Sequence[int], Sequence[int]]],
+                 k1: float = 1.5, b: float = 0.75):
+        self.doc_ids = doc_ids
+        self.k1 = k1
+        self.b = b
+        self.doc_lens = np.asarray(doc_lens, dtype=np.float32)
+        self.avg_len = float(self.doc_lens.mean()) if len(doc_ids) else 0.0
+        self.postings = {
+            term: (np.asarray(rows, dtype=np.int32), np.asarray(tfs, dtype=np.float32))
+            for term, (rows, tfs) in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @classmethod
+    def from_texts(cls, doc_ids: List[str], texts: List[str], **kwargs) -> "BM25Index":
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        doc_lens = []
+        for row, text in enumerate(texts):
+            terms = Counter(tokenize(text))
+            doc_lens.append(sum(terms.values()))
+            for term, tf in terms.items():
+                rows, tfs = postings.setdefault(term, ([], []))
+                rows.append(row)
+                tfs.append(tf)
+        return cls(doc_ids, doc_lens, postings, **kwargs)
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore, **kwargs) -> "BM25Index":
+        doc_ids = list(vectorstore.index_to_docstore_id.values())
+        texts = [vectorstore.docstore.search(doc_id).page_content for doc_id in doc_ids]
+        return cls.from_texts(doc_ids, texts, **kwargs)
+
+    def search(self, query: str, k: int, subset: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """
+        Top-k (docstore id, score) pairs; chunks sharing no term with the query are never returned.
+        `subset` restricts the result to those chunk positions (e.g. one disease's partition).
+        """
+        if not self.doc_ids:
+            return []
+        n = len(self.doc_ids)
+        scores = np.zeros(n, dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * self.doc_lens / max(self.avg_len, 1e-9))
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            rows, tfs = posting
+            idf = math.log(1 + (n - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[rows] += idf * tfs * (self.k1 + 1) / (tfs + norm[rows])
+
+        if subset is not None:
+            mask = np.zeros(n, dtype=bool)
+            mask[subset] = True
+            scores[~mask] = 0.0
+        matched = np.flatnonzero(scores)
+        top = matched[np.argsort(-scores[matched])[:k]]
+        return [(self.doc_ids[i], float(scores[i])) for i in top]
+
+    def save(self, path: str):
+        data = {
+            "k1": self.k1,
+            "b": self.b,
+            "doc_ids": self.doc_ids,
+            "doc_lens": self.doc_lens.astype(int).tolist(),
+            "postings": {term: [rows.tolist(), tfs.astype(int).tolist()] for term, (rows, tfs) in self.postings.items()},
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["BM25Index"]:
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["doc_ids"], data["doc_lens"], {t: tuple(p) for t, p in data["postings"].items()}, k1=data["k1"], b=data["b"])
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Merge ranked id lists: each id scores sum(1 / (k + rank)) over the lists it appears in."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -5,16 +5,20 @@ from agents.chat_agent import chat_agent
 from agents.retriever_agent import retrieve_agent
 from agents.web_agent import web_answer_agent
 from agents.grader_answer_agent import unified_grader_answer_agent
+from agents.speculative_agent import speculative_grader_agent, speculative_retrieve_agent, speculative_web_agent
+from core.speculation import GRAPH_MODE
 
 
 def build_graph():
     graph = StateGraph(AgentState)
 
+    # Same topology in both modes; speculative nodes overlap the web fallback with retrieval
+    speculative = GRAPH_MODE == "speculative"
     graph.add_node("router", router_agent)
     graph.add_node("chat_agent", chat_agent)
-    graph.add_node("retriever", retrieve_agent)
-    graph.add_node("web_scraper", web_answer_agent)
-    graph.add_node("grader_answer_generator", unified_grader_answer_agent)
+    graph.add_node("retriever", speculative_retrieve_agent if speculative else retrieve_agent)
+    graph.add_node("web_scraper", speculative_web_agent if speculative else web_answer_agent)
+    graph.add_node("grader_answer_generator", speculative_grader_agent if speculative else unified_grader_answer_agent)
 
     graph.set_entry_point("router")
 
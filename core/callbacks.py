@@ -0,0 +1,45 @@
+import threading
+from collections import Counter
+from typing import Any, Dict
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from core.context_budget import count_tokens, message_tokens
+
+
+class LLMCallCounter(BaseCallbackHandler):
+    """
+    Counts LLM round-trips and prompt tokens (local tokenizer) in one graph run,
+    per graph node (from LangGraph's run metadata).
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_node: Counter = Counter()
+        self.prompt_tokens_by_node: Counter = Counter()
+
+    def on_chat_model_start(self, serialized, messages, *, metadata: Dict[str, Any] | None = None, **kwargs):
+        self._count(metadata, sum(message_tokens(batch) for batch in messages))
+
+    def on_llm_start(self, serialized, prompts, *, metadata: Dict[str, Any] | None = None, **kwargs):
+        self._count(metadata, sum(count_tokens(p) for p in prompts))
+
+    def _count(self, metadata, prompt_tokens: int):
+        node = (metadata or {}).get("langgraph_node", "other")
+        with self._lock:
+            self.by_node[node] += 1
+            self.prompt_tokens_by_node[node] += prompt_tokens
+
+    @property
+    def total(self) -> int:
+        return sum(self.by_node.values())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "llm_calls": self.total,
+            "llm_calls_by_node": dict(self.by_node),
+            "prompt_tokens": sum(self.prompt_tokens_by_node.values()),
+            "prompt_tokens_by_node": dict(self.prompt_tokens_by_node),
+        }
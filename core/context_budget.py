@@ -0,0 +1,152 @@
+import os
+import threading
+from typing import List, Optional, Sequence
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+# --- CONFIGURATION ---
+# Tokens of retrieved / web context put into one grader or answer prompt
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2000"))
+# Tokens of conversation history sent to the router / chat agent (system context always kept)
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "1500"))
+# tiktoken encoding of the LLM (gpt-4o family: o200k_base)
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "o200k_base")
+
+# Between chunks in tool output, so the assembler can split them again
+CHUNK_SEPARATOR = "\n\n---\n\n"
+# Adjacent chunks share up to CHUNK_OVERLAP (150) characters; shorter matches are coincidence
+MIN_OVERLAP_CHARS = 20
+MAX_OVERLAP_CHARS = 300
+# Per-message framing tokens in chat APIs
+MESSAGE_OVERHEAD_TOKENS = 4
+HISTORY_NOTE_PREFIX = "Earlier in this conversation the user asked: "
+NOTE_QUESTION_CHARS = 120
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_failed = False
+
+
+def get_encoding():
+    """tiktoken encoding, loaded on first use; None (character estimate) when it can't be loaded offline."""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_failed:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+                except Exception as e:
+                    _encoding_failed = True
+                    print(f"⚠️ Tokenizer {TOKENIZER_ENCODING} unavailable ({type(e).__name__}); estimating 4 chars/token")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, budget: int) -> str:
+    encoding = get_encoding()
+    if encoding is None:
+        return text[:budget * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:budget])
+
+
+def message_tokens(messages: Sequence[BaseMessage]) -> int:
+    return sum(count_tokens(m.content if isinstance(m.content, str) else str(m.content)) + MESSAGE_OVERHEAD_TOKENS
+               for m in messages)
+
+
+def split_passages(context_list: Sequence[str]) -> List[str]:
+    return [p.strip() for entry in context_list for p in str(entry).split(CHUNK_SEPARATOR) if p.strip()]
+
+
+def trim_overlap(previous: str, passage: str) -> str:
+    """Drop the head of `passage` that repeats the tail of `previous` (text-splitter overlap)."""
+    for size in range(min(len(previous), len(passage), MAX_OVERLAP_CHARS), MIN_OVERLAP_CHARS - 1, -1):
+        if previous.endswith(passage[:size]):
+            return passage[size:].lstrip()
+    return passage
+
+
+def assemble_context(context_list: Sequence[str], budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    """
+    Prompt-ready context from tool outputs: passages in rank order, exact and contained
+    duplicates dropped, splitter overlaps trimmed, cut off at `budget` tokens.
+    """
+    passages = split_passages(context_list)
+    kept: List[str] = []
+    kept_normalized: List[str] = []
+    duplicates = trimmed_chars = used = 0
+
+    for passage in passages:
+        normalized = " ".join(passage.split())
+        if any(normalized in seen for seen in kept_normalized):
+            duplicates += 1
+            continue
+        original_len = len(passage)
+        for previous in kept:
+            passage = trim_overlap(previous, passage)
+        if not passage:
+            duplicates += 1
+            continue
+
+        tokens = count_tokens(passage)
+        if used + tokens > budget:
+            if not kept:
+                kept.append(truncate_tokens(passage, budget))
+                used = budget
+            break
+        kept.append(passage)
+        kept_normalized.append(normalized)
+        trimmed_chars += original_len - len(passage)
+        used += tokens
+
+    print(f"📐 Context: {len(kept)}/{len(passages)} passages kept ({duplicates} duplicates, "
+          f"{trimmed_chars} overlap chars trimmed), ~{used} tokens (budget {budget})")
+    return CHUNK_SEPARATOR.join(kept)
+
+
+def fit_history(messages: Sequence[BaseMessage], budget: int = HISTORY_TOKEN_BUDGET) -> List[BaseMessage]:
+    """
+    System messages plus the newest turns that fit `budget` tokens. Older turns are folded into
+    one short note listing what the user asked, so follow-ups keep their referents without an extra LLM call.
+    """
+    if message_tokens(messages) <= budget:
+        return list(messages)
+
+    system = [m for m in messages if isinstance(m, SystemMessage)]
+    turns = [m for m in messages if not isinstance(m, SystemMessage)]
+    # A fifth of the budget is kept back for the note about dropped turns
+    note_budget = budget // 5
+
+    used = message_tokens(system)
+    start = len(turns)
+    while start > 0:
+        tokens = message_tokens([turns[start - 1]])
+        # The newest message is always kept, whatever its size
+        if start < len(turns) and used + tokens > budget - note_budget:
+            break
+        used += tokens
+        start -= 1
+
+    dropped = turns[:start]
+    asked: List[str] = []
+    note_tokens = count_tokens(HISTORY_NOTE_PREFIX)
+    for m in reversed(dropped):
+        if not isinstance(m, HumanMessage) or not isinstance(m.content, str):
+            continue
+        question = m.content[:NOTE_QUESTION_CHARS]
+        tokens = count_tokens(question) + 1
+        if note_tokens + tokens > note_budget:
+            break
+        asked.insert(0, question)
+        note_tokens += tokens
+
+    note: Optional[SystemMessage] = SystemMessage(content=HISTORY_NOTE_PREFIX + "; ".join(asked)) if asked else None
+    print(f"✂️ History: {len(dropped)} older messages condensed, {len(turns) - start} kept (~{used} tokens)")
+    return system + ([note] if note else []) + turns[start:]
@@ -0,0 +1,117 @@
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Detection classes (data/dataset/data.yaml) -> names the literature uses for them
+DISEASE_ALIASES = {
+    "bacterial spot": ("bacterial spot", "xanthomonas"),
+    "early blight": ("early blight", "alternaria solani"),
+    "late blight": ("late blight", "phytophthora infestans"),
+    "leaf mold": ("leaf mold", "leaf mould", "fulvia fulva", "passalora fulva", "cladosporium fulvum"),
+    "target spot": ("target spot", "corynespora"),
+    "black spot": ("black spot",),
+}
+# Chunks not about one disease (reviews, general agronomy); searched for every disease
+GENERAL = "general"
+# A document is tagged from its content only when one disease clearly dominates the mentions
+MIN_MENTIONS = 3
+DOMINANCE = 2.0
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"[\s_\-]+", " ", text.lower()).strip()
+
+
+def disease_key(name: Optional[str]) -> Optional[str]:
+    """'Early_Blight' -> 'early blight'; None for 'Healthy' and unknown classes."""
+    if not name:
+        return None
+    key = normalize(name)
+    return key if key in DISEASE_ALIASES else None
+
+
+def tag_disease(file_name: str, text: str) -> str:
+    """Disease a PDF is about: from its file name when it names one, else from dominant mentions in the text."""
+    stem = normalize(file_name.rsplit(".", 1)[0])
+    for disease in DISEASE_ALIASES:
+        if disease in stem:
+            return disease
+
+    text = normalize(text)
+    mentions = Counter({disease: sum(text.count(alias) for alias in aliases) for disease, aliases in DISEASE_ALIASES.items()})
+    ranked = mentions.most_common(2)
+    top_disease, top = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0
+    if top >= MIN_MENTIONS and top >= DOMINANCE * runner_up:
+        return top_disease
+    return GENERAL
+
+
+def search_parameters(index, selector):
+    """faiss search parameters limiting `index` to `selector`, keeping its configured nprobe / efSearch."""
+    import faiss
+
+    if hasattr(index, "hnsw"):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        return faiss.SearchParameters(sel=selector)
+    return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+
+
+class Partition:
+    __slots__ = ("rows", "selector", "bm25_rows")
+
+    def __init__(self, rows: np.ndarray, bm25_rows: Optional[np.ndarray]):
+        import faiss
+
+        self.rows = rows
+        # Referenced by every search's parameters; must outlive them
+        self.selector = faiss.IDSelectorBatch(rows)
+        self.bm25_rows = bm25_rows
+
+    def vector_ids(self, vectorstore, vector: np.ndarray, n: int) -> List[str]:
+        index = vectorstore.index
+        _, rows = index.search(vector, min(n, len(self.rows)), params=search_parameters(index, self.selector))
+        return [vectorstore.index_to_docstore_id[int(r)] for r in rows[0] if r != -1]
+
+
+class DiseasePartitions:
+    """
+    The rows of each disease's chunks plus the general ones. Scoped searches run on the main FAISS index
+    (whatever its type, in RAM or memory-mapped) filtered to those rows, and on the matching BM25 rows.
+    """
+
+    def __init__(self, partitions: Dict[str, Partition], untagged: int = 0):
+        self.partitions = partitions
+        # Chunks without disease metadata (indexed before disease tagging existed)
+        self.untagged = untagged
+
+    @classmethod
+    def build(cls, vectorstore, bm25=None) -> "DiseasePartitions":
+        rows_by_disease: Dict[str, List[int]] = {}
+        untagged = 0
+        for row, doc_id in vectorstore.index_to_docstore_id.items():
+            metadata = vectorstore.docstore.search(doc_id).metadata
+            untagged += "disease" not in metadata
+            rows_by_disease.setdefault(metadata.get("disease", GENERAL), []).append(row)
+
+        general = rows_by_disease.pop(GENERAL, [])
+        bm25_row = {doc_id: i for i, doc_id in enumerate(bm25.doc_ids)} if bm25 is not None else None
+        partitions = {}
+        for disease, rows in rows_by_disease.items():
+            rows = np.asarray(sorted(rows + general), dtype=np.int64)
+            doc_ids = [vectorstore.index_to_docstore_id[int(r)] for r in rows]
+            bm25_rows = np.asarray([bm25_row[d] for d in doc_ids if d in bm25_row], dtype=np.int32) if bm25_row else None
+            partitions[disease] = Partition(rows, bm25_rows)
+        return cls(partitions, untagged)
+
+    def get(self, disease: Optional[str]) -> Optional[Partition]:
+        key = disease_key(disease)
+        return self.partitions.get(key) if key else None
+
+    def sizes(self) -> Dict[str, int]:
+        return {disease: len(p.rows) for disease, p in sorted(self.partitions.items())}
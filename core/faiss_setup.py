@@ -1,37 +1,417 @@
+import argparse
+import hashlib
+import json
+import math
 import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import faiss
+import numpy as np
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from core.bm25_index import BM25Index
+from core.disease_partitions import tag_disease
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 PDF_FOLDER = os.path.join(BASE_DIR, "context")
 FAISS_PATH = os.path.join(BASE_DIR, "faiss_db")
+MANIFEST_PATH = os.path.join(FAISS_PATH, "manifest.json")
+BM25_PATH = os.path.join(FAISS_PATH, "bm25.json")
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+RETRIEVER_K = 5
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 150
+# 1: bring the index in line with context/ (new/changed/removed PDFs) whenever it is loaded
+FAISS_AUTO_UPDATE = os.getenv("FAISS_AUTO_UPDATE", "0") == "1"
+# Ingestion: PDF parser processes, texts per embedding forward pass, chunks held before each index add
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+INGEST_ADD_BATCH = int(os.getenv("INGEST_ADD_BATCH", "1024"))
+# Index structure: flat (exact) | ivf_flat | ivf_pq | hnsw | sq8 | fp16 (changing it rebuilds the index)
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat").lower()
+FAISS_NLIST = int(os.getenv("FAISS_NLIST", "0"))  # IVF cells; 0 = ~4*sqrt(vectors)
+FAISS_PQ_M = int(os.getenv("FAISS_PQ_M", "48"))  # PQ sub-quantizers (bytes per vector)
+FAISS_HNSW_M = int(os.getenv("FAISS_HNSW_M", "32"))
+FAISS_TRAIN_SIZE = int(os.getenv("FAISS_TRAIN_SIZE", "100000"))  # vectors sampled to train IVF/PQ
+# Search-time knobs, applied on load (no rebuild needed)
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "8"))
+FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "64"))
+# 1: memory-map index.faiss read-only when serving instead of reading it into RAM
+FAISS_MMAP = os.getenv("FAISS_MMAP", "0") == "1"
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw", "sq8", "fp16")
+# langchain's FAISS.delete assumes positions are compacted after remove_ids, which only
+# holds for flat-code indexes; IVF keeps the old labels and HNSW cannot remove at all
+DELETABLE_INDEX_TYPES = ("flat", "sq8", "fp16")
+PQ_NBITS = 8
+
+
+def load_embeddings():
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL, encode_kwargs={"batch_size": EMBED_BATCH_SIZE})
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def list_pdfs() -> List[str]:
+    return sorted(f for f in os.listdir(PDF_FOLDER) if f.endswith(".pdf"))
+
+
+def load_and_split(folder: str, file_name: str, file_hash: str) -> Tuple[List[Document], int]:
+    """
+    (chunks, page count) of one PDF. Chunk ids are `<hash of name + content>-<n>`,
+    stable while the file is unchanged. Every chunk is tagged with the file name and the
+    disease the PDF is about (see core.disease_partitions). Runs in a worker process during ingestion.
+    """
+    pages = PyPDFLoader(os.path.join(folder, file_name)).load()
+    disease = tag_disease(file_name, " ".join(page.page_content for page in pages))
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    chunks = text_splitter.split_documents(pages)
+    # The name is mixed in so two copies of the same PDF never collide on ids
+    prefix = hashlib.sha256(f"{file_name}:{file_hash}".encode()).hexdigest()[:16]
+    for i, chunk in enumerate(chunks):
+        chunk.metadata.update(chunk_id=f"{prefix}-{i}", source_file=file_name, disease=disease)
+    return chunks, len(pages)
+
+
+def iter_parsed(names: List[str], hashes: Dict[str, str], workers: int = INGEST_WORKERS) -> Iterator[Tuple[str, List[Document], int]]:
+    """
+    Yield (file name, chunks, pages) as PDFs finish parsing in a process pool.
+    At most 2 * workers files are in flight, so memory stays flat however large the corpus.
+    """
+    if workers <= 1 or len(names) <= 1:
+        for name in names:
+            yield (name, *load_and_split(PDF_FOLDER, name, hashes[name]))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        queue = iter(names)
+        for name in queue:
+            pending[pool.submit(load_and_split, PDF_FOLDER, name, hashes[name])] = name
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                chunks, pages = future.result()
+                yield name, chunks, pages
+                next_name = next(queue, None)
+                if next_name is not None:
+                    pending[pool.submit(load_and_split, PDF_FOLDER, next_name, hashes[next_name])] = next_name
+
+
+def add_chunks(vectorstore, embeddings, chunks: List[Document], timings: Dict[str, float]):
+    """Embed `chunks` in EMBED_BATCH_SIZE batches and add them to the index (created on first use)."""
+    for i in range(0, len(chunks), EMBED_BATCH_SIZE):
+        batch = chunks[i:i + EMBED_BATCH_SIZE]
+        texts = [c.page_content for c in batch]
+
+        start = time.perf_counter()
+        vectors = embeddings.embed_documents(texts)
+        timings["embed_s"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        text_embeddings = list(zip(texts, vectors))
+        metadatas = [c.metadata for c in batch]
+        ids = [c.metadata["chunk_id"] for c in batch]
+        if vectorstore is None:
+            vectorstore = FAISS.from_embeddings(text_embeddings, embeddings, metadatas=metadatas, ids=ids)
+        else:
+            vectorstore.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+        timings["add_s"] += time.perf_counter() - start
+    return vectorstore
+
+
+def index_settings() -> Dict:
+    # Any change here invalidates every stored vector, so the index is rebuilt
+    # metadata_version: bumped when chunk metadata changes (2: disease / source_file tags)
+    settings = {"embedding_model": EMBEDDING_MODEL, "chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP,
+                "metadata_version": 2}
+    # Only recorded for non-flat indexes, so manifests written before index types existed stay valid
+    if FAISS_INDEX_TYPE != "flat":
+        settings.update(index_type=FAISS_INDEX_TYPE, nlist=FAISS_NLIST, pq_m=FAISS_PQ_M, hnsw_m=FAISS_HNSW_M)
+    return settings
+
+
+def factory_string(index_type: str, n: int, dim: int) -> str:
+    """faiss.index_factory description of `index_type` sized for `n` vectors of `dim` dimensions."""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown FAISS_INDEX_TYPE {index_type!r}; expected one of {', '.join(INDEX_TYPES)}")
+    # faiss wants ~39 training points per centroid
+    nlist = FAISS_NLIST or int(4 * math.sqrt(n))
+    nlist = max(1, min(nlist, n // 39))
+    pq_m = max(m for m in range(1, min(FAISS_PQ_M, dim) + 1) if dim % m == 0)
+    return {
+        "flat": "Flat",
+        "ivf_flat": f"IVF{nlist},Flat",
+        "ivf_pq": f"IVF{nlist},PQ{pq_m}x{PQ_NBITS}",
+        "hnsw": f"HNSW{FAISS_HNSW_M}",
+        "sq8": "SQ8",
+        "fp16": "SQfp16",
+    }[index_type]
+
+
+def min_train_points(index_type: str) -> int:
+    if index_type == "ivf_pq":
+        return 39 * (1 << PQ_NBITS)
+    if index_type == "ivf_flat":
+        return 39
+    return 1
+
+
+def build_index(vectors: np.ndarray, index_type: Optional[str] = None):
+    """Train (when the type needs it) and fill a faiss index with `vectors`, keeping their order."""
+    index_type = index_type or FAISS_INDEX_TYPE
+    n, dim = vectors.shape
+    if n < min_train_points(index_type):
+        print(f"⚠️ {n} vectors are too few to train a {index_type} index (need {min_train_points(index_type)}); using flat")
+        index_type = "flat"
+    index = faiss.index_factory(dim, factory_string(index_type, n, dim), faiss.METRIC_L2)
+    if not index.is_trained:
+        sample = vectors
+        if n > FAISS_TRAIN_SIZE:
+            sample = vectors[np.random.default_rng(0).choice(n, FAISS_TRAIN_SIZE, replace=False)]
+        index.train(sample)
+    index.add(vectors)
+    apply_search_params(index)
+    return index
+
+
+def apply_search_params(index):
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = FAISS_EF_SEARCH
+    try:
+        faiss.extract_index_ivf(index).nprobe = FAISS_NPROBE
+    except RuntimeError:
+        pass  # not an IVF index
+
+
+def index_vectors(index) -> np.ndarray:
+    """All vectors of `index` in position order (approximate for quantized types)."""
+    try:
+        return index.reconstruct_n(0, index.ntotal)
+    except RuntimeError:
+        # IVF indexes only reconstruct by id once they keep an id -> list map
+        faiss.extract_index_ivf(index).make_direct_map()
+        return index.reconstruct_n(0, index.ntotal)
 
-def build_or_load_faiss():
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-    if os.path.exists(FAISS_PATH) and os.listdir(FAISS_PATH):
-        print("📂 Loading existing FAISS index...")
-        vectorstore = FAISS.load_local(FAISS_PATH, embeddings, allow_dangerous_deserialization=True)
-    else:
-        print("⚡ Building FAISS index from PDFs...")
-        pdf_files = [os.path.join(PDF_FOLDER,f) for f in os.listdir(PDF_FOLDER) if f.endswith(".pdf")]
-        docs = []
-        for pdf in pdf_files:
-            loader = PyPDFLoader(pdf)
-            docs.extend(loader.load())
 
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap = 150)
-        splits = text_splitter.split_documents(docs)
+def convert_index(vectorstore, index_type: Optional[str] = None):
+    """Swap the flat index built during ingestion for a trained `index_type` index over the same vectors."""
+    index_type = index_type or FAISS_INDEX_TYPE
+    if index_type == "flat":
+        return
+    vectorstore.index = build_index(index_vectors(vectorstore.index), index_type)
 
-        vectorstore = FAISS.from_documents(splits, embedding=embeddings)
 
-        os.makedirs(FAISS_PATH,exist_ok = True)
+def load_vectorstore(embeddings, mmap: bool = False):
+    """Load faiss_db/; with `mmap` the index file is mapped read-only instead of read into RAM."""
+    io_flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0
+    vectorstore = FAISS.load_local(FAISS_PATH, embeddings, allow_dangerous_deserialization=True, io_flags=io_flags)
+    apply_search_params(vectorstore.index)
+    return vectorstore
+
+
+def read_manifest() -> Dict:
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH) as f:
+        return json.load(f)
+
+
+def write_manifest(files: Dict[str, Dict]):
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({**index_settings(), "files": files}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def load_bm25(vectorstore) -> BM25Index:
+    """Keyword index saved next to the vectors; (re)built when missing or out of step with the FAISS docstore."""
+    bm25 = BM25Index.load(BM25_PATH)
+    if bm25 is None or set(bm25.doc_ids) != set(vectorstore.index_to_docstore_id.values()):
+        print("🔤 Building BM25 index from the FAISS docstore...")
+        bm25 = BM25Index.from_vectorstore(vectorstore)
+        bm25.save(BM25_PATH)
+    return bm25
+
+
+def update_vectorstore(embeddings, rebuild: bool = False):
+    """
+    Sync faiss_db/ with context/ using per-file content hashes from faiss_db/manifest.json:
+    embed only new/changed PDFs and delete the chunks of changed/removed ones.
+    Returns (vectorstore, summary with counts and per-stage seconds).
+    """
+    timings = {}
+    manifest = read_manifest()
+    index_exists = os.path.exists(os.path.join(FAISS_PATH, "index.faiss"))
+
+    if not rebuild and index_exists and not manifest:
+        print("⚠️ FAISS index has no manifest (built before incremental updates); rebuilding once")
+        rebuild = True
+    if not rebuild and manifest and (
+        {k: manifest.get(k) for k in index_settings()} != index_settings()
+        or manifest.get("index_type", "flat") != FAISS_INDEX_TYPE
+    ):
+        print("⚠️ Embedding model, chunking or index type changed; rebuilding FAISS index")
+        rebuild = True
+
+    start = time.perf_counter()
+    current = {name: file_sha256(os.path.join(PDF_FOLDER, name)) for name in list_pdfs()}
+    timings["hash_s"] = time.perf_counter() - start
+
+    known = {} if rebuild else manifest.get("files", {})
+    if known and FAISS_INDEX_TYPE not in DELETABLE_INDEX_TYPES and any(
+        current.get(name) != entry["sha256"] for name, entry in known.items()
+    ):
+        print(f"⚠️ {FAISS_INDEX_TYPE} indexes cannot drop vectors; rebuilding for changed/removed PDFs")
+        rebuild, known = True, {}
+
+    vectorstore = None
+    if index_exists and not rebuild:
+        vectorstore = load_vectorstore(embeddings)
+    fresh = vectorstore is None
+
+    added = [name for name in current if name not in known]
+    changed = [name for name in current if name in known and known[name]["sha256"] != current[name]]
+    removed = [name for name in known if name not in current]
+
+    start = time.perf_counter()
+    stale_ids = [cid for name in changed + removed for cid in known[name]["chunk_ids"]]
+    if stale_ids and vectorstore is not None:
+        vectorstore.delete(stale_ids)
+    timings["delete_s"] = time.perf_counter() - start
+
+    # Streaming ingestion: workers parse the next PDFs while this process embeds,
+    # and chunks are added to the index every INGEST_ADD_BATCH so memory stays bounded
+    files = {name: entry for name, entry in known.items() if name in current and name not in changed}
+    timings.update(parse_wait_s=0.0, embed_s=0.0, add_s=0.0)
+    chunks_embedded = pages_parsed = 0
+    buffer: List[Document] = []
+
+    ingest_start = time.perf_counter()
+    parsed = iter_parsed(added + changed, current)
+    while True:
+        start = time.perf_counter()
+        item = next(parsed, None)
+        timings["parse_wait_s"] += time.perf_counter() - start
+        if item is None:
+            break
+        name, chunks, pages = item
+        files[name] = {
+            "sha256": current[name],
+            "chunk_ids": [c.metadata["chunk_id"] for c in chunks],
+            "disease": chunks[0].metadata["disease"] if chunks else None,
+        }
+        pages_parsed += pages
+        buffer.extend(chunks)
+        if len(buffer) >= INGEST_ADD_BATCH:
+            vectorstore = add_chunks(vectorstore, embeddings, buffer, timings)
+            chunks_embedded += len(buffer)
+            buffer = []
+    if buffer:
+        vectorstore = add_chunks(vectorstore, embeddings, buffer, timings)
+        chunks_embedded += len(buffer)
+    timings["ingest_s"] = time.perf_counter() - ingest_start
+
+    if vectorstore is None:
+        raise RuntimeError(f"No PDFs found in {PDF_FOLDER} to build the FAISS index from")
+
+    # Ingestion always fills a flat index; trained types are built from it in one pass
+    start = time.perf_counter()
+    if fresh:
+        convert_index(vectorstore)
+    timings["train_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if added or changed or removed or rebuild:
+        os.makedirs(FAISS_PATH, exist_ok=True)
         vectorstore.save_local(FAISS_PATH)
-        print(f"FAISS index saved to {FAISS_PATH}")
+        write_manifest(files)
+    timings["save_s"] = time.perf_counter() - start
+
+    # Rebuilt from the docstore rather than patched: tokenizing is cheap next to embedding
+    start = time.perf_counter()
+    if added or changed or removed or rebuild or not os.path.exists(BM25_PATH):
+        BM25Index.from_vectorstore(vectorstore).save(BM25_PATH)
+    timings["bm25_s"] = time.perf_counter() - start
+
+    summary = {
+        "added": len(added),
+        "changed": len(changed),
+        "removed": len(removed),
+        "unchanged": len(current) - len(added) - len(changed),
+        "pages_parsed": pages_parsed,
+        "chunks_embedded": chunks_embedded,
+        "chunks_deleted": len(stale_ids),
+        "total_vectors": int(vectorstore.index.ntotal),
+        "index_type": type(vectorstore.index).__name__,
+        **{k: round(v, 3) for k, v in timings.items()},
+        "pdfs_per_s": round(len(added + changed) / timings["ingest_s"], 2) if timings["ingest_s"] > 0 else None,
+        "pages_per_s": round(pages_parsed / timings["ingest_s"], 2) if timings["ingest_s"] > 0 else None,
+        "chunks_per_s_embed": round(chunks_embedded / timings["embed_s"], 1) if timings["embed_s"] > 0 else None,
+    }
+    return vectorstore, summary
+
+
+def build_or_load_vectorstore(embeddings):
+    if os.path.exists(FAISS_PATH) and os.listdir(FAISS_PATH) and not FAISS_AUTO_UPDATE:
+        print(f"📂 Loading existing FAISS index{' (memory-mapped)' if FAISS_MMAP else ''}...")
+        vectorstore = load_vectorstore(embeddings, mmap=FAISS_MMAP)
+    else:
+        print("⚡ Building / updating FAISS index from PDFs...")
+        vectorstore, summary = update_vectorstore(embeddings)
+        print(f"FAISS index at {FAISS_PATH}: {summary}")
 
-    retriever = vectorstore.as_retriever(search_kwargs={"k":5})
+    return vectorstore
+
+
+def build_or_load_faiss():
+    embeddings = load_embeddings()
+    vectorstore = build_or_load_vectorstore(embeddings)
+    retriever = vectorstore.as_retriever(search_kwargs={"k":RETRIEVER_K})
     return retriever
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or incrementally update the FAISS index in faiss_db/ from context/*.pdf")
+    parser.add_argument("--update", action="store_true", help="Embed new/changed PDFs and drop chunks of changed/removed ones")
+    parser.add_argument("--rebuild", action="store_true", help="Re-embed every PDF from scratch")
+    args = parser.parse_args()
+
+    if not (args.update or args.rebuild):
+        build_or_load_faiss()
+        return
+
+    start = time.perf_counter()
+    embeddings = load_embeddings()
+    load_s = time.perf_counter() - start
+    _, summary = update_vectorstore(embeddings, rebuild=args.rebuild)
+    print(f"PDFs: +{summary['added']} added, ~{summary['changed']} changed, -{summary['removed']} removed, "
+          f"{summary['unchanged']} unchanged")
+    print(f"Chunks: {summary['chunks_embedded']} embedded, {summary['chunks_deleted']} deleted, "
+          f"{summary['total_vectors']} vectors in {summary['index_type']}")
+    print(f"Timing: model load {load_s:.2f}s | hash {summary['hash_s']:.2f}s | delete {summary['delete_s']:.2f}s | "
+          f"ingest {summary['ingest_s']:.2f}s (waiting on parsers {summary['parse_wait_s']:.2f}s, "
+          f"embed {summary['embed_s']:.2f}s, index add {summary['add_s']:.2f}s) | train {summary['train_s']:.2f}s | save {summary['save_s']:.2f}s | "
+          f"bm25 {summary['bm25_s']:.2f}s | "
+          f"total {time.perf_counter() - start:.2f}s")
+    print(f"Throughput ({INGEST_WORKERS} parser processes, embed batch {EMBED_BATCH_SIZE}): "
+          f"{summary['pdfs_per_s']} PDFs/s | {summary['pages_per_s']} pages/s | {summary['chunks_per_s_embed']} chunks/s embedded")
+
+
 if __name__ == "__main__":
-    retriever = build_or_load_faiss()
+    main()
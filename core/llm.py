@@ -6,10 +6,23 @@ load_dotenv()
 
 openrouter_api_key = os.getenv("OPENROUTER_API_KEY")
 
+# Any OpenAI-compatible endpoint works, e.g. benchmarks/stub_llm_server.py for local testing
+LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-4o-mini")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://openrouter.ai/api/v1")
+
+# Tag on the calls that write the user-facing answer; /chat/stream only forwards their tokens
+ANSWER_TAG = "answer"
+
 llm = ChatOpenAI(
-    model = "openai/gpt-4o-mini",
-    base_url= "https://openrouter.ai/api/v1",
+    model = LLM_MODEL,
+    base_url= LLM_BASE_URL,
     api_key = openrouter_api_key,
     temperature=0.0,
     max_tokens = 1000
-)
\ No newline at end of file
+)
+
+answer_llm = llm.with_config(tags=[ANSWER_TAG])
+
+# Tag on structured calls whose JSON carries the answer in an `answer` field after an `enough_info`
+# verdict (GRADER_MODE=combined); /chat/stream forwards the field's text once the verdict is true
+ANSWER_JSON_TAG = "answer_json"
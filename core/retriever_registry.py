@@ -0,0 +1,207 @@
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from core.bm25_index import reciprocal_rank_fusion
+
+# --- CONFIGURATION ---
+# vector: FAISS only | bm25: keywords only | hybrid: both, merged with reciprocal-rank fusion
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid").lower()
+# Chunks each retriever contributes to fusion / reranking before cutting to k
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+# 1: reorder the fused candidates with a local cross-encoder (sentence-transformers, CPU)
+RERANK_ENABLED = os.getenv("RERANK", "0") == "1"
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+# 1: search only the detected disease's chunks (plus general ones) when the chat knows the disease
+DISEASE_FILTER = os.getenv("DISEASE_FILTER", "1") == "1"
+
+
+def load_reranker():
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(RERANK_MODEL, device="cpu")
+
+
+class RetrieverRegistry:
+    """
+    Holds the embedding model, FAISS vectorstore, BM25 index and optional reranker for the whole process.
+    Loaded once (at API startup or on first use) and shared by every worker thread.
+    """
+
+    def __init__(self, k: Optional[int] = None):
+        self.k = k
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.embeddings = None
+        self.vectorstore = None
+        self.retriever = None
+        self.bm25 = None
+        self.reranker = None
+        self.partitions = None
+
+        self.load_time_s: Optional[float] = None
+        self.query_count = 0
+        self.total_query_time_s = 0.0
+        self.last_query_time_s: Optional[float] = None
+        self.stage_time_s = Counter()
+        self.scoped_query_count = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.retriever is not None
+
+    def load(self):
+        # Double-checked so concurrent first requests only load once
+        if self.is_loaded:
+            return self.retriever
+
+        with self._lock:
+            if self.is_loaded:
+                return self.retriever
+
+            # Imported here so importing the API doesn't pull in langchain_community/faiss
+            from core.faiss_setup import build_or_load_vectorstore, load_bm25, load_embeddings, RETRIEVER_K
+
+            start = time.perf_counter()
+            if self.k is None:
+                self.k = RETRIEVER_K
+            embeddings = load_embeddings()
+            vectorstore = build_or_load_vectorstore(embeddings)
+            if RETRIEVAL_MODE != "vector":
+                self.bm25 = load_bm25(vectorstore)
+            if RERANK_ENABLED:
+                self.reranker = load_reranker()
+            if DISEASE_FILTER:
+                from core.disease_partitions import DiseasePartitions
+                self.partitions = DiseasePartitions.build(vectorstore, self.bm25)
+                if self.partitions.untagged:
+                    print(f"⚠️ {self.partitions.untagged} indexed chunks have no disease tag, so DISEASE_FILTER only covers "
+                          f"the rest; re-tag them with `python -m core.faiss_setup --update` (or FAISS_AUTO_UPDATE=1)")
+                print(f"🗂️ Disease partitions: {self.partitions.sizes()}")
+
+            self.embeddings = embeddings
+            self.vectorstore = vectorstore
+            self.retriever = vectorstore.as_retriever(search_kwargs={"k": self.k})
+            self.load_time_s = time.perf_counter() - start
+
+            print(f"🧠 Retriever loaded in {self.load_time_s:.2f}s ({self.index_size} vectors)")
+
+        return self.retriever
+
+    def vector_ids(self, query: str, n: int, partition=None) -> List[str]:
+        vector = np.asarray([self.embeddings.embed_query(query)], dtype=np.float32)
+        if partition is not None:
+            return partition.vector_ids(self.vectorstore, vector, n)
+        _, rows = self.vectorstore.index.search(vector, n)
+        return [self.vectorstore.index_to_docstore_id[int(r)] for r in rows[0] if r != -1]
+
+    def retrieve(self, query: str, k: int, mode: str = RETRIEVAL_MODE, rerank: bool = RERANK_ENABLED,
+                 timings: Optional[Counter] = None, disease: Optional[str] = None) -> List[Document]:
+        """
+        Top-k chunks for `query`; `mode` and `rerank` default to the configured pipeline. Stage seconds go to `timings`.
+        With a known `disease` only its partition is searched (whole index for "Healthy" or untagged diseases).
+        """
+        self.load()
+        candidates = HYBRID_CANDIDATES if (mode == "hybrid" or rerank) else k
+        timings = Counter() if timings is None else timings
+        partition = self.partitions.get(disease) if self.partitions is not None else None
+
+        rankings = []
+        if mode in ("vector", "hybrid"):
+            start = time.perf_counter()
+            rankings.append(self.vector_ids(query, max(candidates, k), partition))
+            timings["vector"] += time.perf_counter() - start
+        if mode in ("bm25", "hybrid"):
+            start = time.perf_counter()
+            bm25 = self.bm25 or self._load_bm25()
+            subset = partition.bm25_rows if partition is not None else None
+            rankings.append([doc_id for doc_id, _ in bm25.search(query, max(candidates, k), subset=subset)])
+            timings["bm25"] += time.perf_counter() - start
+        if not rankings:
+            raise ValueError(f"Unknown RETRIEVAL_MODE {mode!r}; expected vector, bm25 or hybrid")
+
+        ids = [doc_id for doc_id, _ in reciprocal_rank_fusion(rankings, RRF_K)] if len(rankings) > 1 else rankings[0]
+        docs = [self.vectorstore.docstore.search(doc_id) for doc_id in ids]
+
+        if rerank and len(docs) > 1:
+            start = time.perf_counter()
+            reranker = self.reranker or self._load_reranker()
+            scores = reranker.predict([(query, d.page_content) for d in docs])
+            docs = [docs[i] for i in np.argsort(-np.asarray(scores))]
+            timings["rerank"] += time.perf_counter() - start
+
+        return docs[:k]
+
+    def _load_bm25(self):
+        # Benchmarks compare modes in one process; the configured mode may not have loaded BM25
+        from core.faiss_setup import load_bm25
+        with self._lock:
+            if self.bm25 is None:
+                self.bm25 = load_bm25(self.vectorstore)
+        return self.bm25
+
+    def _load_reranker(self):
+        with self._lock:
+            if self.reranker is None:
+                self.reranker = load_reranker()
+        return self.reranker
+
+    def search(self, query: str, disease: Optional[str] = None) -> List[Document]:
+        self.load()
+
+        start = time.perf_counter()
+        timings = Counter()
+        docs = self.retrieve(query, self.k, timings=timings, disease=disease)
+        elapsed = time.perf_counter() - start
+
+        with self._stats_lock:
+            self.stage_time_s.update(timings)
+            if self.partitions is not None and self.partitions.get(disease) is not None:
+                self.scoped_query_count += 1
+            self.query_count += 1
+            self.total_query_time_s += elapsed
+            self.last_query_time_s = elapsed
+
+        return docs
+
+    def partition_stats(self):
+        if self.partitions is None:
+            return None
+        if not self.partitions.partitions:
+            return "0 (index not tagged, run --update)"
+        return self.partitions.sizes()
+
+    @property
+    def index_size(self) -> int:
+        if self.vectorstore is None:
+            return 0
+        return int(self.vectorstore.index.ntotal)
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            avg = self.total_query_time_s / self.query_count if self.query_count else None
+            return {
+                "loaded": self.is_loaded,
+                "load_time_s": round(self.load_time_s, 4) if self.load_time_s is not None else None,
+                "index_size": self.index_size,
+                "index_type": type(self.vectorstore.index).__name__ if self.vectorstore is not None else None,
+                "query_count": self.query_count,
+                "avg_query_latency_ms": round(avg * 1000, 2) if avg is not None else None,
+                "mode": RETRIEVAL_MODE,
+                "rerank": RERANK_ENABLED,
+                "avg_stage_latency_ms": {
+                    stage: round(total / self.query_count * 1000, 2) for stage, total in self.stage_time_s.items()
+                } if self.query_count else {},
+                "disease_filter": DISEASE_FILTER,
+                "partitions": self.partition_stats(),
+                "scoped_query_count": self.scoped_query_count,
+                "last_query_latency_ms": round(self.last_query_time_s * 1000, 2) if self.last_query_time_s is not None else None,
+            }
+
+
+retriever_registry = RetrieverRegistry()
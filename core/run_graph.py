@@ -1,10 +1,33 @@
-from core.build_graph import build_graph
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+import json
+import re
+import threading
+import time
+import uuid
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk, SystemMessage
 
-app = build_graph()
+from core.callbacks import LLMCallCounter
+from core.speculation import path_latency, speculation_registry, turn_path
 
-def run_graph(user_input: str, messages=None, system_context: str | None = None):
-    print("In the run graph")
+_app = None
+_app_lock = threading.Lock()
+
+
+def get_graph():
+    """Compile the agent graph on first use (importing agents/tools/LLM clients only then)."""
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                from core.build_graph import build_graph
+                _app = build_graph()
+    return _app
+
+
+def is_graph_loaded() -> bool:
+    return _app is not None
+
+
+def prepare_messages(user_input: str, messages=None, system_context: str | None = None):
     if messages is None:
         messages = []
 
@@ -14,21 +37,168 @@ def run_graph(user_input: str, messages=None, system_context: str | None = None)
 
     # Append user message (✅ FIXED)
     messages.append(HumanMessage(content=user_input))
-    print("Graph fed message: ",messages)
-
-    result = app.invoke(
-        {
-            "question": user_input,
-            "messages": messages,
-            "route": None,
-            "retrieved_docs": [],
-            "web_retrievals": [],
-            "enough_info": None,
-            "final_answer": None
-        }
-    )
+    print(f"Graph fed {len(messages)} messages")
+    return messages
+
+
+def initial_state(user_input: str, messages, detected_disease: str | None = None) -> dict:
+    return {
+        # Keys this run's speculative web search (GRAPH_MODE=speculative)
+        "run_id": uuid.uuid4().hex,
+        "question": user_input,
+        "messages": messages,
+        "route": None,
+        "routed_to": None,
+        "route_confidence": None,
+        # Scopes retrieval to this disease's chunks (see core.disease_partitions)
+        "detected_disease": detected_disease,
+        "retrieved_docs": [],
+        "web_retrievals": [],
+        "enough_info": None,
+        "final_answer": None
+    }
+
+
+def append_answer(user_input: str, answer: str, messages=None, system_context: str | None = None):
+    """Record a turn answered without running the graph (e.g. from the answer cache)."""
+    messages = prepare_messages(user_input, messages, system_context)
+    messages.append(AIMessage(content=answer))
+    return messages
+
+
+def record_turn(counter: LLMCallCounter, state: dict, stats: dict | None, elapsed_s: float):
+    summary = counter.summary()
+    path = turn_path(state)
+    path_latency.record(path, elapsed_s)
+    print(f"🧮 LLM calls this turn: {summary['llm_calls']} {summary['llm_calls_by_node']} | "
+          f"prompt tokens: {summary['prompt_tokens']} {summary['prompt_tokens_by_node']} | "
+          f"path {path} in {elapsed_s * 1000:.0f} ms")
+    if stats is not None:
+        stats.update(summary)
+        stats["path"] = path
+        stats["graph_ms"] = round(elapsed_s * 1000, 2)
+        # Final route ("web" after a RAG fallback) and grader verdict, e.g. for the answer cache
+        stats["route"] = state.get("route")
+        stats["enough_info"] = state.get("enough_info")
+
+
+async def run_graph(user_input: str, messages=None, system_context: str | None = None, stats: dict | None = None,
+                    detected_disease: str | None = None):
+    # Optional per-turn stats (LLM calls, route, enough_info) are written into `stats` when given
+    print("In the run graph")
+    messages = prepare_messages(user_input, messages, system_context)
+
+    # Async nodes: concurrent chats overlap their LLM I/O on the event loop
+    counter = LLMCallCounter()
+    state = initial_state(user_input, messages, detected_disease)
+    start = time.perf_counter()
+    try:
+        result = await get_graph().ainvoke(state, config={"callbacks": [counter]})
+    finally:
+        # A speculative search nobody consumed (chat route, errors) must not outlive the turn
+        speculation_registry.cancel(state["run_id"])
+    record_turn(counter, result, stats, time.perf_counter() - start)
 
     # Append AI response
     messages.append(AIMessage(content=result["final_answer"]))
 
-    return result["final_answer"], messages
\ No newline at end of file
+    return result["final_answer"], messages
+
+
+class StreamedAnswerField:
+    """
+    Pulls the `answer` string out of a streamed GradedAnswer JSON (GRADER_MODE=combined) as it grows,
+    once `enough_info` is true; a "no" verdict streams nothing and the graph falls back.
+    """
+
+    _VERDICT = re.compile(r'"enough_info"\s*:\s*(true|false)')
+    _ANSWER = re.compile(r'"answer"\s*:\s*"')
+
+    def __init__(self):
+        self.raw = ""
+        self.emitted = 0
+
+    def feed(self, fragment: str) -> str:
+        """New answer text made available by `fragment` ("" while the verdict or answer is pending)."""
+        self.raw += fragment
+        verdict = self._VERDICT.search(self.raw)
+        start = self._ANSWER.search(self.raw)
+        if verdict is None or verdict.group(1) != "true" or start is None:
+            return ""
+        text = self._decode(self.raw[start.end():])
+        new, self.emitted = text[self.emitted:], max(self.emitted, len(text))
+        return new
+
+    @staticmethod
+    def _decode(body: str) -> str:
+        # Up to the closing quote; an escape cut off at the end waits for the next fragment
+        i = 0
+        while i < len(body):
+            if body[i] == "\\":
+                i += 2
+                continue
+            if body[i] == '"':
+                body = body[:i]
+                break
+            i += 1
+        for cut in range(len(body), max(len(body) - 6, -1), -1):
+            try:
+                return json.loads(f'"{body[:cut]}"')
+            except ValueError:
+                continue
+        return ""
+
+
+def _chunk_text(message: AIMessageChunk) -> str:
+    # json_schema structured output streams as content; function calling as tool-call argument chunks
+    if message.content:
+        return message.content if isinstance(message.content, str) else ""
+    return "".join(chunk.get("args") or "" for chunk in message.tool_call_chunks)
+
+
+async def stream_graph(user_input: str, messages=None, system_context: str | None = None, stats: dict | None = None,
+                       detected_disease: str | None = None):
+    """
+    Run the graph and yield events as they happen:
+    ("node", name) when a node finishes, ("token", text) for each answer token,
+    then ("done", final_answer). The AI reply is appended to `messages`.
+    """
+    from core.llm import ANSWER_JSON_TAG, ANSWER_TAG
+
+    print("In the stream graph")
+    messages = prepare_messages(user_input, messages, system_context)
+
+    final_answer = None
+    final_state = {}
+    counter = LLMCallCounter()
+    config = {"callbacks": [counter]}
+    state = initial_state(user_input, messages, detected_disease)
+    graded_answer = StreamedAnswerField()
+    start = time.perf_counter()
+    try:
+        async for mode, chunk in get_graph().astream(state, config=config, stream_mode=["updates", "messages"]):
+            if mode == "updates":
+                for node, update in chunk.items():
+                    if update:
+                        final_state.update({k: update[k] for k in ("route", "routed_to", "enough_info") if k in update})
+                    if update and update.get("final_answer"):
+                        final_answer = update["final_answer"]
+                    yield "node", node
+            else:
+                message, metadata = chunk
+                # Router/grader/tool-calling output is internal; only stream the answer calls
+                if not isinstance(message, AIMessageChunk):
+                    continue
+                tags = metadata.get("tags", [])
+                if ANSWER_TAG in tags and message.content:
+                    yield "token", message.content
+                elif ANSWER_JSON_TAG in tags:
+                    text = graded_answer.feed(_chunk_text(message))
+                    if text:
+                        yield "token", text
+    finally:
+        speculation_registry.cancel(state["run_id"])
+
+    record_turn(counter, final_state, stats, time.perf_counter() - start)
+    messages.append(AIMessage(content=final_answer or ""))
+    yield "done", final_answer or ""
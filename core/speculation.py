@@ -0,0 +1,126 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Awaitable, Dict, Optional
+
+import numpy as np
+
+# --- CONFIGURATION ---
+# sequential: retriever -> grader -> (web fallback) | speculative: start the web search alongside
+# retrieval when the router is unsure, drop it if the grader accepts the RAG context
+GRAPH_MODE = os.getenv("GRAPH_MODE", "sequential").lower()
+# RAG routes below this confidence (or without one, e.g. decided by the LLM) speculate
+SPECULATIVE_CONFIDENCE = float(os.getenv("SPECULATIVE_CONFIDENCE", "0.8"))
+
+
+class SpeculationRegistry:
+    """In-flight speculative web searches, keyed by the graph run that started them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._started_at: Dict[str, float] = {}
+
+        self.started = 0
+        self.used = 0
+        self.cancelled = 0
+        self.saved_s = 0.0
+        self.wasted_s = 0.0
+
+    @staticmethod
+    async def _timed(coro: Awaitable):
+        result = await coro
+        return result, time.perf_counter()
+
+    def start(self, run_id: str, coro: Awaitable):
+        task = asyncio.ensure_future(self._timed(coro))
+        # Keeps a failed, never-awaited search from logging "exception was never retrieved"
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        with self._lock:
+            self._tasks[run_id] = task
+            self._started_at[run_id] = time.perf_counter()
+            self.started += 1
+
+    async def take(self, run_id: Optional[str]):
+        """Result of the run's speculative search (None if there was none); waits for it if still running."""
+        with self._lock:
+            task = self._tasks.pop(run_id, None)
+            started_at = self._started_at.pop(run_id, None)
+        if task is None:
+            return None
+        needed_at = time.perf_counter()
+        result, finished_at = await task
+        with self._lock:
+            self.used += 1
+            # Whatever the search did before the fallback needed it ran in parallel with RAG
+            self.saved_s += min(needed_at, finished_at) - started_at
+        return result
+
+    def cancel(self, run_id: Optional[str]):
+        with self._lock:
+            task = self._tasks.pop(run_id, None)
+            started_at = self._started_at.pop(run_id, None)
+        if task is None:
+            return
+        if not task.done():
+            task.cancel()
+        with self._lock:
+            self.cancelled += 1
+            self.wasted_s += time.perf_counter() - started_at
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "mode": GRAPH_MODE,
+                "confidence_threshold": SPECULATIVE_CONFIDENCE,
+                "in_flight": len(self._tasks),
+                "started": self.started,
+                "used_by_fallback": self.used,
+                "cancelled": self.cancelled,
+                "fallback_time_saved_s": round(self.saved_s, 3),
+                "discarded_search_time_s": round(self.wasted_s, 3),
+            }
+
+
+def turn_path(state: dict) -> str:
+    """
+    Which way a finished turn went: chat, rag, web, or rag_then_web (grader fallback). Decided from the
+    router's own route and the final one, so a fallback after failed or empty retrieval still counts.
+    """
+    route = state.get("route")
+    if state.get("routed_to") == "rag" and route == "web":
+        return "rag_then_web"
+    return route or "unknown"
+
+
+class PathLatencyStats:
+    """End-to-end graph latency per path, so speculative and sequential runs can be compared."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self.window = window
+        self._latencies: Dict[str, list] = {}
+
+    def record(self, path: str, elapsed_s: float):
+        with self._lock:
+            samples = self._latencies.setdefault(path, [])
+            samples.append(elapsed_s * 1000)
+            if len(samples) > self.window:
+                del samples[0]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                path: {
+                    "turns": len(samples),
+                    "avg_ms": round(float(np.mean(samples)), 2),
+                    "p50_ms": round(float(np.percentile(samples, 50)), 2),
+                    "p95_ms": round(float(np.percentile(samples, 95)), 2),
+                }
+                for path, samples in self._latencies.items() if samples
+            }
+
+
+speculation_registry = SpeculationRegistry()
+path_latency = PathLatencyStats()
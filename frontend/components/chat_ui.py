@@ -1,5 +1,6 @@
 import streamlit as st
-from frontend.services.chat_service import chat_backend
+from frontend.config import CHAT_STREAMING
+from frontend.services.chat_service import chat_backend, stream_chat_backend
 from frontend.state import save_persisted_state
 
 
@@ -19,14 +20,20 @@ def chat_ui(disease):
         st.chat_message("user").write(user_input)
 
         session_id = st.session_state.get("session_id", "default")
-        response, stored_disease = chat_backend(
-            user_input,
-            disease,
-            session_id=session_id,
-            report=st.session_state.get("detection_result", {}).get("report"),
-        )
-
-        st.chat_message("assistant").write(response)
+        report = st.session_state.get("detection_result", {}).get("report")
+        if CHAT_STREAMING:
+            # Render tokens as they arrive; write_stream returns the full text
+            response = st.chat_message("assistant").write_stream(
+                stream_chat_backend(user_input, disease, session_id=session_id, report=report)
+            )
+        else:
+            response, stored_disease = chat_backend(
+                user_input,
+                disease,
+                session_id=session_id,
+                report=report,
+            )
+            st.chat_message("assistant").write(response)
 
         # Update local chat history for UI display only
         st.session_state[history_key].append(("user", user_input))
@@ -8,10 +8,20 @@ from frontend.services.detection_service import detect_disease
 def _render_detection(result: dict) -> str:
     """Render detection details and return the detected disease name."""
     
-    # 1️⃣ Image Handling (Base64)
-    image_data = result.get("output_image_path")  # The "data:image/jpeg;base64,..." string
-    
-    if image_data:
+    # 1️⃣ Image Handling (URL reference or Base64 data URL)
+    image_data = result.get("output_image_path")
+
+    if image_data and image_data.startswith(("http://", "https://")):
+        # Served from the backend's /static/outputs; nothing to decode here
+        st.image(
+            image_data,
+            caption="AI Annotated Result",
+            width=420,
+            use_container_width=False,
+        )
+        st.link_button("📥 Download Annotated Image", image_data)
+
+    elif image_data:
         # Streamlit natively displays Base64 data URLs
         st.image(
             image_data,
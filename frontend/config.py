@@ -0,0 +1,7 @@
+# How /detect should return the annotated image: "url" (link under /static/outputs,
+# smallest JSON payload), "base64" (inline data URL) or "binary" (multipart/mixed, JPEG part
+# shown as a data URL). Persisted history always keeps the image inline; `url` links expire.
+IMAGE_DELIVERY = "url"
+
+# Stream chat answers token by token from /chat/stream instead of waiting on /chat
+CHAT_STREAMING = True
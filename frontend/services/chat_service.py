@@ -1,25 +1,57 @@
+import json
+
 import requests
 import streamlit as st
 
 API_URL = "http://127.0.0.1:8000/chat"
 
 
-def chat_backend(message, disease, session_id="default", report=None):
+def _chat_payload(message, disease, session_id, report):
     # Track first message for this session+disease combo
     session_key = f"api_session_{session_id}_{disease}"
     is_first = session_key not in st.session_state
     if is_first:
         st.session_state[session_key] = True
 
-    payload = {
+    return {
         "message": message,
         "detected_disease": disease,
         "report": report,
         "session_id": session_id,
         "is_first_message": is_first,
     }
+
+
+def chat_backend(message, disease, session_id="default", report=None):
+    payload = _chat_payload(message, disease, session_id, report)
     print("payload: ",payload)
     res = requests.post(API_URL, json=payload)
     res.raise_for_status()
     response_data = res.json()
-    return response_data["answer"], response_data.get("detected_disease")
\ No newline at end of file
+    return response_data["answer"], response_data.get("detected_disease")
+
+
+def stream_chat_backend(message, disease, session_id="default", report=None):
+    """
+    Yield answer tokens from POST /chat/stream as they arrive (for st.write_stream).
+    If the server streamed no tokens, the final answer is yielded in one piece.
+    """
+    payload = _chat_payload(message, disease, session_id, report)
+    streamed = False
+    event = None
+    with requests.post(f"{API_URL}/stream", json=payload, stream=True, timeout=120) as res:
+        res.raise_for_status()
+        for line in res.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+                continue
+            if not line.startswith("data:"):
+                continue
+            data = json.loads(line[len("data:"):])
+            if event == "token":
+                streamed = True
+                yield data["text"]
+            elif event == "done" and not streamed:
+                yield data["answer"]
+            elif event == "error":
+                raise RuntimeError(f"Chat API error: {data['detail']}")
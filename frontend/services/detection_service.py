@@ -1,7 +1,51 @@
+import base64
+import json
+from email import policy
+from email.parser import BytesParser
+
 import requests
+from frontend.config import IMAGE_DELIVERY
 
 API_URL = "http://127.0.0.1:8000/detect"
 
+
+def to_data_url(image_jpeg: bytes) -> str:
+    return f"data:image/jpeg;base64,{base64.b64encode(image_jpeg).decode('utf-8')}"
+
+
+def _parse_multipart(res) -> dict:
+    """JSON report + raw JPEG of a multipart/mixed (binary delivery) response; the JPEG becomes a data URL."""
+    header = f"Content-Type: {res.headers['Content-Type']}\r\n\r\n".encode()
+    message = BytesParser(policy=policy.default).parsebytes(header + res.content)
+    result, image_jpeg = None, None
+    for part in message.iter_parts():
+        if part.get_content_type() == "application/json":
+            result = json.loads(part.get_payload(decode=True))
+        elif part.get_content_maintype() == "image":
+            image_jpeg = part.get_payload(decode=True)
+    if result is None:
+        raise ValueError("multipart response has no JSON part")
+    if image_jpeg is not None:
+        result["output_image_path"] = to_data_url(image_jpeg)
+    return result
+
+
+def inline_image(result: dict) -> dict:
+    """
+    Copy of `result` with a `url` image replaced by a data URL, for history kept past the
+    backend's OUTPUT_TTL_SECONDS. Falls back to the link if the image can't be fetched.
+    """
+    image_url = (result or {}).get("output_image_path") or ""
+    if not image_url.startswith(("http://", "https://")):
+        return result
+    try:
+        res = requests.get(image_url, timeout=10)
+        res.raise_for_status()
+    except requests.RequestException:
+        return result
+    return {**result, "output_image_path": to_data_url(res.content), "source_image_url": image_url}
+
+
 def detect_disease(image_file):
     # Streamlit's UploadedFile needs to be converted into a proper multipart tuple
     try:
@@ -10,8 +54,10 @@ def detect_disease(image_file):
         content_type = getattr(image_file, "type", None) or "image/jpeg"
 
         files = {"file": (filename, file_bytes, content_type)}
-        res = requests.post(API_URL, files=files, timeout=30)
+        res = requests.post(API_URL, files=files, params={"image_delivery": IMAGE_DELIVERY}, timeout=30)
         res.raise_for_status()
+        if res.headers.get("Content-Type", "").startswith("multipart/"):
+            return _parse_multipart(res)
         return res.json()
     except requests.HTTPError as e:
         # Surface server-side error details if available
@@ -23,4 +69,4 @@ def detect_disease(image_file):
         raise RuntimeError(f"Detection API error: {e}. Response: {detail}")
     except ValueError as e:
         # JSON decode errors
-        raise RuntimeError(f"Invalid JSON from Detection API: {e}")
\ No newline at end of file
+        raise RuntimeError(f"Invalid JSON from Detection API: {e}")
@@ -2,6 +2,8 @@ import streamlit as st
 import uuid
 from typing import Optional, Dict, Any
 
+from frontend.services.detection_service import inline_image
+
 
 def _get_or_set_query_session_id() -> str:
     """Get a stable session id that survives browser refresh via query params."""
@@ -26,10 +28,25 @@ def load_persisted_state(session_id: str) -> Optional[Dict[str, Any]]:
     return store.get(session_id)
 
 
+def _persistable(detection_result: Any, previous: Any) -> Any:
+    """
+    `url` images expire on the backend (OUTPUT_TTL_SECONDS), so the copy kept for a page refresh holds
+    them inline; live session state keeps the link. Fetched once per image, then reused.
+    """
+    image_url = (detection_result or {}).get("output_image_path") or ""
+    if not image_url.startswith(("http://", "https://")):
+        return detection_result
+    # Links are content-hashed: the same link was already inlined on an earlier rerun
+    if previous and previous.get("source_image_url") == image_url:
+        return {**detection_result, "output_image_path": previous["output_image_path"], "source_image_url": image_url}
+    return inline_image(detection_result)
+
+
 def save_persisted_state(session_id: str, detection_result: Any, chat_history: Any) -> None:
     store = get_persistent_store()
+    previous = (store.get(session_id) or {}).get("detection_result")
     store[session_id] = {
-        "detection_result": detection_result,
+        "detection_result": _persistable(detection_result, previous),
         "chat_history": chat_history,
     }
 
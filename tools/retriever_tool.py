@@ -1,25 +1,41 @@
-from typing import TypedDict, Annotated, Sequence, Optional, List, Literal
-from langchain_core.messages import BaseMessage, ToolMessage, SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
-from langgraph.graph import StateGraph, START, END
-from langgraph.graph.message import add_messages
+from typing import Annotated, Optional
+
 from dotenv import load_dotenv
-import os
-from langchain_core.tools import tool
-from langgraph.prebuilt import ToolNode
+from langchain_core.tools import InjectedToolArg, StructuredTool
 
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from tavily import TavilyClient
-from core.faiss_setup import build_or_load_faiss
+from core.context_budget import CHUNK_SEPARATOR
+from core.retriever_registry import retriever_registry
+from tools.runner import retriever_executor
 
 load_dotenv()
 
-@tool
-def retriever_tool(query: str) -> str:
+
+def retrieve_chunks(query: str, disease: Annotated[Optional[str], InjectedToolArg] = None) -> str:
     """
     Retrieve relevant document chunks from FAISS.
     """
-    print("In the Retriever tool")
-    retriever = build_or_load_faiss()
-    docs = retriever._get_relevant_documents(query, run_manager=None)
-    return "\n\n".join([d.page_content for d in docs])
+    print(f"In the Retriever tool (disease: {disease})")
+    # Shared, already-warm retriever (no per-call model/index reload); `disease` is filled
+    # from the session by the agent, never by the LLM, and limits the search to that disease
+    docs = retriever_registry.search(query, disease=disease)
+    return CHUNK_SEPARATOR.join([d.page_content for d in docs])
+
+
+async def aretrieve_chunks(query: str, disease: Annotated[Optional[str], InjectedToolArg] = None) -> str:
+    # On the dedicated retriever pool, so concurrent searches don't queue behind other to_thread work
+    return await retriever_executor.run(retrieve_chunks, query, disease)
+
+
+async def warm_retriever():
+    # Cold load (STARTUP_MODE=lazy) takes longer than TOOL_TIMEOUT_S; the runner awaits it before timing the call
+    if not retriever_registry.is_loaded:
+        await retriever_executor.run(retriever_registry.load)
+
+
+retriever_tool = StructuredTool.from_function(
+    func=retrieve_chunks,
+    coroutine=aretrieve_chunks,
+    name="retriever_tool",
+    description="Retrieve relevant document chunks from FAISS.",
+    metadata={"warm_up": warm_retriever},
+)
@@ -0,0 +1,122 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from langchain_core.tools import BaseTool
+
+# --- CONFIGURATION ---
+# Threads for FAISS/BM25 searches, kept apart from the default pool used by other to_thread work
+RETRIEVER_WORKERS = int(os.getenv("RETRIEVER_WORKERS", str(min(8, (os.cpu_count() or 1) + 2))))
+# Per tool call; a timed-out call yields an error message instead of stalling the turn
+TOOL_TIMEOUT_S = float(os.getenv("TOOL_TIMEOUT_S", "10"))
+
+
+class RetrieverExecutor:
+    """Dedicated thread pool for blocking retrieval, created on first use."""
+
+    def __init__(self, workers: int = RETRIEVER_WORKERS):
+        self.workers = workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="retriever")
+        return self._pool
+
+    async def run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._get_pool(), fn, *args)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+class ToolCallStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.fan_out_turns = 0
+        self.saved_s = 0.0
+
+    def record(self, durations: List[float], wall_s: float, timeouts: int, errors: int):
+        with self._lock:
+            self.calls += len(durations)
+            self.timeouts += timeouts
+            self.errors += errors
+            if len(durations) > 1:
+                self.fan_out_turns += 1
+                self.saved_s += max(sum(durations) - wall_s, 0.0)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "fan_out_turns": self.fan_out_turns,
+                "wall_clock_saved_s": round(self.saved_s, 3),
+            }
+
+
+retriever_executor = RetrieverExecutor()
+tool_stats = ToolCallStats()
+
+
+class ToolResult(NamedTuple):
+    output: str
+    # ok | timeout | error
+    status: str
+    duration_s: float
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+async def _timed_call(tool: BaseTool, args: Dict[str, Any], timeout_s: float) -> ToolResult:
+    start = time.perf_counter()
+    try:
+        # A tool's cold resource load (e.g. the retriever under STARTUP_MODE=lazy) is not part of its timeout
+        warm_up = (tool.metadata or {}).get("warm_up")
+        if warm_up is not None:
+            await warm_up()
+            start = time.perf_counter()
+        result = await asyncio.wait_for(tool.ainvoke(args), timeout_s)
+        status = "ok"
+    except asyncio.TimeoutError:
+        result, status = f"{tool.name} timed out after {timeout_s:.0f}s", "timeout"
+    except Exception as e:
+        result, status = f"{tool.name} failed: {e}", "error"
+    if status != "ok":
+        print(f"⚠️ {result}")
+    return ToolResult(str(result), status, time.perf_counter() - start)
+
+
+async def run_tool_calls(calls: List[Tuple[BaseTool, Dict[str, Any]]], timeout_s: float = TOOL_TIMEOUT_S) -> List[ToolResult]:
+    """
+    Run (tool, args) pairs concurrently and return their results in call order.
+    Failed calls carry an error message and a non-ok status; callers keep them out of the context.
+    Logs the wall-clock time saved against running them one after another.
+    """
+    if not calls:
+        return []
+    start = time.perf_counter()
+    results = await asyncio.gather(*(_timed_call(tool, args, timeout_s) for tool, args in calls))
+    wall_s = time.perf_counter() - start
+
+    durations = [r.duration_s for r in results]
+    statuses = [r.status for r in results]
+    tool_stats.record(durations, wall_s, statuses.count("timeout"), statuses.count("error"))
+    if len(calls) > 1:
+        print(f"⚡ {len(calls)} tool calls in {wall_s * 1000:.0f} ms "
+              f"(sequential ~{sum(durations) * 1000:.0f} ms, saved {max(sum(durations) - wall_s, 0) * 1000:.0f} ms)")
+    return list(results)
@@ -1,31 +1,66 @@
-from typing import TypedDict, Annotated, Sequence, Optional, List, Literal
-from langchain_core.messages import BaseMessage, ToolMessage, SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
-from langgraph.graph import StateGraph, START, END
-from langgraph.graph.message import add_messages
-from dotenv import load_dotenv
 import os
-from langchain_core.tools import tool
-from langgraph.prebuilt import ToolNode
+import threading
+
+from dotenv import load_dotenv
+from langchain_core.tools import StructuredTool
 
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from tavily import TavilyClient
+from core.context_budget import CHUNK_SEPARATOR
 
 load_dotenv()
 
-tavily_api_key = os.getenv("TAVILY_API_KEY")
-tavily = TavilyClient(api_key = tavily_api_key)
+_tavily = None
+_async_tavily = None
+_tavily_lock = threading.Lock()
+
+
+def get_tavily_client():
+    """Create the Tavily client on first web search instead of at import time."""
+    global _tavily
+    if _tavily is None:
+        with _tavily_lock:
+            if _tavily is None:
+                from tavily import TavilyClient
+                _tavily = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+    return _tavily
+
+
+def get_async_tavily_client():
+    global _async_tavily
+    if _async_tavily is None:
+        with _tavily_lock:
+            if _async_tavily is None:
+                from tavily import AsyncTavilyClient
+                _async_tavily = AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+    return _async_tavily
+
 
-@tool
-def tavily_search_tool(query: str) -> str:
+def format_results(web_data) -> str:
+    results = [r["content"] for r in web_data.get("results", [])]
+    return CHUNK_SEPARATOR.join(results) if results else "No web results found."
+
+
+def web_search(query: str) -> str:
     """
     Perform web scraping for the query using Tavily.
     Returns a combined string of results.
     """
     print("🌍 In Tavily Search Tool")
     try:
-        web_data = tavily.search(query, max_results=3)
-        results = [r["content"] for r in web_data.get("results", [])]
-        return "\n\n".join(results) if results else "No web results found."
+        return format_results(get_tavily_client().search(query, max_results=3))
     except Exception as e:
-        return f"Web search failed: {str(e)}"
\ No newline at end of file
+        return f"Web search failed: {str(e)}"
+
+
+async def aweb_search(query: str) -> str:
+    # Native async client: concurrent searches share the event loop instead of a thread each.
+    # Errors propagate so tools.runner marks the call failed and keeps it out of the context
+    print("🌍 In Tavily Search Tool")
+    return format_results(await get_async_tavily_client().search(query, max_results=3))
+
+
+tavily_search_tool = StructuredTool.from_function(
+    func=web_search,
+    coroutine=aweb_search,
+    name="tavily_search_tool",
+    description="Perform web scraping for the query using Tavily.\nReturns a combined string of results.",
+)
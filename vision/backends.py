@@ -0,0 +1,252 @@
+import ast
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from vision.nms import iou_matrix
+
+# --- CONFIGURATION ---
+# torch | onnx | onnx-int8 | openvino
+VISION_BACKEND = os.getenv("VISION_BACKEND", "torch").lower()
+# 0 lets ONNX Runtime pick (one thread per physical core)
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))
+ONNX_INTER_OP_THREADS = int(os.getenv("ONNX_INTER_OP_THREADS", "0"))
+# Where ONNX / OpenVINO exports are written; defaults to the weights' folder (models/)
+VISION_EXPORT_DIR = os.getenv("VISION_EXPORT_DIR", "")
+
+# Same defaults as ultralytics' predictor so every backend feeds identical
+# candidates into vision.nms.filter_and_resolve
+PREDICT_CONF = 0.25
+PREDICT_IOU = 0.7
+MAX_DET = 300
+MAX_NMS = 30000
+_CLASS_OFFSET = 7680
+
+
+_export_lock = threading.Lock()
+
+
+def weights_digest(weights_path: Path) -> str:
+    """Short content hash of the .pt weights; names their exports so new weights never reuse old ones."""
+    digest = hashlib.sha256()
+    with open(weights_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def export_dir_for(weights_path: Path) -> Path:
+    return Path(VISION_EXPORT_DIR) if VISION_EXPORT_DIR else weights_path.parent
+
+
+def _export_with_ultralytics(weights_path: Path, fmt: str, target: Path) -> Path:
+    """
+    Run an ultralytics export into `target`. The weights are exported from a copy in a scratch
+    folder next to `target`, since ultralytics writes beside the .pt (read-only in some deploys).
+    """
+    from ultralytics import YOLO
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=target.parent) as scratch:
+        scratch_weights = Path(scratch) / weights_path.name
+        shutil.copy2(weights_path, scratch_weights)
+        # dynamic=True keeps the batch axis free for micro-batching / batch detection
+        exported = Path(YOLO(str(scratch_weights)).export(format=fmt, dynamic=True))
+        # Another process may have finished the same export meanwhile; keep the first one
+        if not target.exists():
+            os.replace(exported, target)
+    return target
+
+
+def export_onnx(weights_path: Path, int8: bool = False) -> Path:
+    """
+    Export the .pt weights to ONNX once and reuse the file afterwards. Files are named after the
+    weights' content hash and written to VISION_EXPORT_DIR (default: next to the weights).
+    """
+    base = export_dir_for(weights_path) / f"{weights_path.stem}-{weights_digest(weights_path)}"
+    onnx_path = base.with_suffix(".onnx")
+    with _export_lock:
+        if not onnx_path.exists():
+            print(f"📦 Exporting {weights_path.name} to ONNX ({onnx_path})...")
+            _export_with_ultralytics(weights_path, "onnx", onnx_path)
+
+        if not int8:
+            return onnx_path
+
+        int8_path = onnx_path.with_name(f"{onnx_path.stem}_int8.onnx")
+        if not int8_path.exists():
+            import onnx
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            print(f"📦 Quantizing {onnx_path.name} to INT8...")
+            tmp_path = int8_path.with_name(f"{int8_path.stem}.{os.getpid()}.tmp.onnx")
+            quantize_dynamic(str(onnx_path), str(tmp_path), weight_type=QuantType.QUInt8)
+            # quantize_dynamic drops model metadata; copy names/imgsz over
+            source, target = onnx.load(str(onnx_path)), onnx.load(str(tmp_path))
+            for prop in source.metadata_props:
+                meta = target.metadata_props.add()
+                meta.key, meta.value = prop.key, prop.value
+            onnx.save(target, str(tmp_path))
+            os.replace(tmp_path, int8_path)
+        return int8_path
+
+
+def export_openvino(weights_path: Path) -> Path:
+    export_dir = export_dir_for(weights_path) / f"{weights_path.stem}-{weights_digest(weights_path)}_openvino_model"
+    with _export_lock:
+        if not export_dir.exists():
+            print(f"📦 Exporting {weights_path.name} to OpenVINO ({export_dir})...")
+            _export_with_ultralytics(weights_path, "openvino", export_dir)
+    return export_dir
+
+
+class OnnxBoxes:
+    """Minimal stand-in for ultralytics `Boxes`: the attributes vision.nms reads."""
+
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray):
+        self.xyxy = xyxy
+        self.conf = conf
+        self.cls = cls
+
+    def __len__(self):
+        return len(self.conf)
+
+
+class OnnxResult:
+    def __init__(self, boxes: OnnxBoxes, names: Dict[int, str], orig_shape):
+        self.boxes = boxes
+        self.names = names
+        self.orig_shape = orig_shape
+
+    def __repr__(self):
+        return f"OnnxResult(boxes={len(self.boxes)}, orig_shape={self.orig_shape})"
+
+
+class OnnxYoloModel:
+    """
+    YOLO detector served by ONNX Runtime on CPU. Callable like `ultralytics.YOLO`
+    (single image or list of BGR images) and returns result objects exposing
+    `.boxes.xyxy/.conf/.cls`, so vision.inference works unchanged.
+    """
+
+    def __init__(self, onnx_path: Path, intra_op_threads: int = ONNX_INTRA_OP_THREADS, inter_op_threads: int = ONNX_INTER_OP_THREADS):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        if inter_op_threads:
+            options.inter_op_num_threads = inter_op_threads
+            options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+
+        self.path = Path(onnx_path)
+        self.session = ort.InferenceSession(str(self.path), sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        # A static batch axis is an int; dynamic exports use a symbolic name
+        self.static_batch = isinstance(self.session.get_inputs()[0].shape[0], int)
+
+        meta = self.session.get_modelmeta().custom_metadata_map
+        self.names: Dict[int, str] = ast.literal_eval(meta["names"])
+        imgsz = ast.literal_eval(meta.get("imgsz", "[640, 640]"))
+        self.imgsz = (imgsz, imgsz) if isinstance(imgsz, int) else tuple(imgsz)
+
+    def __call__(self, source, verbose: bool = False, **kwargs) -> List[OnnxResult]:
+        images = source if isinstance(source, list) else [source]
+        if not images:
+            return []
+
+        tensors = [self._letterbox(image) for image in images]
+        if self.static_batch:
+            outputs = [self.session.run(None, {self.input_name: t[None]})[0] for t in tensors]
+            predictions = np.concatenate(outputs, axis=0)
+        else:
+            predictions = self.session.run(None, {self.input_name: np.stack(tensors)})[0]
+
+        return [self._postprocess(pred, image.shape) for pred, image in zip(predictions, images)]
+
+    def _letterbox(self, image: np.ndarray) -> np.ndarray:
+        # Mirrors ultralytics LetterBox(auto=False, center=True) used for exported models
+        h, w = image.shape[:2]
+        new_h, new_w = self.imgsz
+        r = min(new_h / h, new_w / w)
+        unpad_w, unpad_h = int(round(w * r)), int(round(h * r))
+        dw, dh = (new_w - unpad_w) / 2, (new_h - unpad_h) / 2
+        if (w, h) != (unpad_w, unpad_h):
+            image = cv2.resize(image, (unpad_w, unpad_h), interpolation=cv2.INTER_LINEAR)
+        top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+        left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+        image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+        # BGR HWC uint8 -> RGB CHW float32 in [0, 1]
+        return np.ascontiguousarray(image[..., ::-1].transpose(2, 0, 1), dtype=np.float32) / 255.0
+
+    def _postprocess(self, pred: np.ndarray, orig_shape) -> OnnxResult:
+        # pred: (4 + num_classes, num_anchors) with xywh in letterboxed pixels
+        pred = pred.T
+        scores_all = pred[:, 4:]
+        cls = scores_all.argmax(axis=1)
+        conf = scores_all[np.arange(len(cls)), cls]
+        keep = conf > PREDICT_CONF
+        xywh, conf, cls = pred[keep, :4], conf[keep], cls[keep]
+
+        order = np.argsort(-conf, kind="stable")[:MAX_NMS]
+        xywh, conf, cls = xywh[order], conf[order], cls[order]
+        xyxy = np.concatenate([xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, :2] + xywh[:, 2:] / 2], axis=1)
+
+        keep = _nms(xyxy + (cls * _CLASS_OFFSET)[:, None], PREDICT_IOU)[:MAX_DET]
+        xyxy, conf, cls = xyxy[keep], conf[keep], cls[keep]
+
+        # Undo letterbox: remove padding, rescale, clip to the original frame
+        h, w = orig_shape[:2]
+        gain = min(self.imgsz[0] / h, self.imgsz[1] / w)
+        pad_x = round((self.imgsz[1] - w * gain) / 2 - 0.1)
+        pad_y = round((self.imgsz[0] - h * gain) / 2 - 0.1)
+        xyxy = (xyxy - [pad_x, pad_y, pad_x, pad_y]) / gain
+        xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, w)
+        xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, h)
+
+        boxes = OnnxBoxes(xyxy.astype(np.float32), conf.astype(np.float32), cls.astype(np.float32))
+        return OnnxResult(boxes, self.names, orig_shape)
+
+
+def _nms(boxes: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy NMS over score-sorted boxes; returns kept indices in score order (O(n) memory)."""
+    order = np.arange(len(boxes))
+    kept = []
+    while order.size:
+        i = order[0]
+        kept.append(i)
+        rest = order[1:]
+        if not rest.size:
+            break
+        ious = iou_matrix(boxes[i:i + 1], boxes[rest])[0]
+        order = rest[ious <= iou_threshold]
+    return np.array(kept, dtype=np.int64)
+
+
+def load_model(backend: str, weights_path: Path, intra_op_threads: Optional[int] = None, inter_op_threads: Optional[int] = None):
+    """Load the detector for `backend`, exporting the weights on first use when needed."""
+    if backend == "torch":
+        from ultralytics import YOLO
+        return YOLO(str(weights_path))
+
+    if backend in ("onnx", "onnx-int8"):
+        onnx_path = export_onnx(weights_path, int8=backend == "onnx-int8")
+        return OnnxYoloModel(
+            onnx_path,
+            intra_op_threads=ONNX_INTRA_OP_THREADS if intra_op_threads is None else intra_op_threads,
+            inter_op_threads=ONNX_INTER_OP_THREADS if inter_op_threads is None else inter_op_threads,
+        )
+
+    if backend == "openvino":
+        from ultralytics import YOLO
+        return YOLO(str(export_openvino(weights_path)), task="detect")
+
+    raise ValueError(f"Unknown VISION_BACKEND: {backend!r} (use torch, onnx, onnx-int8 or openvino)")
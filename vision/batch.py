@@ -0,0 +1,201 @@
+"""
+Batch detection for whole-field image sets.
+
+    python -m vision.batch path/to/photos            # directory (recursive) or .zip
+    python -m vision.batch photos.zip --format csv --output field_report.csv --batch-size 16
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from vision.batching import YOLO_MAX_BATCH
+from vision.inference import analyze_result, decode_image, predict_batch
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+BATCH_SIZE = YOLO_MAX_BATCH
+CSV_FIELDS = ["file", "detected_disease", "severity_level", "primary_confidence", "detections", "co_infections", "alert_type", "error"]
+
+
+def is_image_name(name: str) -> bool:
+    return Path(name).suffix.lower() in IMAGE_EXTENSIONS and not Path(name).name.startswith(".")
+
+
+class ZipLimitError(ValueError):
+    """Raised when a zip holds more images or uncompressed bytes than allowed."""
+
+
+def iter_zip_images(data: bytes, max_images: Optional[int] = None, max_bytes: Optional[int] = None) -> Iterator[Tuple[str, bytes]]:
+    """
+    (name, bytes) for every image inside a zip archive. Limits are checked against each member's
+    declared size before it is decompressed (zipfile never inflates past it), so zip bombs stop early.
+    """
+    images = total_bytes = 0
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not is_image_name(info.filename):
+                continue
+            images += 1
+            total_bytes += info.file_size
+            if max_images is not None and images > max_images:
+                raise ZipLimitError(f"more than {max_images} images")
+            if max_bytes is not None and total_bytes > max_bytes:
+                raise ZipLimitError(f"more than {max_bytes // 2**20} MB of uncompressed images")
+            yield info.filename, archive.read(info)
+
+
+def iter_source(source: Path) -> Iterator[Tuple[str, Callable[[], bytes]]]:
+    """(name, loader) pairs from a directory or a zip; bytes are read lazily by the decode pool."""
+    if source.is_dir():
+        for path in sorted(source.rglob("*")):
+            if path.is_file() and is_image_name(path.name):
+                yield str(path.relative_to(source)), path.read_bytes
+    elif zipfile.is_zipfile(source):
+        for name, data in iter_zip_images(source.read_bytes()):
+            yield name, (lambda data=data: data)
+    else:
+        raise ValueError(f"{source} is neither a directory nor a zip archive")
+
+
+def _load_and_decode(item):
+    name, load = item
+    try:
+        return name, decode_image(load()), None
+    except Exception as e:
+        return name, None, str(e)
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _error_row(name: str, error: str) -> Dict:
+    return {"file": name, "detected_disease": None, "detections": [], "report": None, "error": error}
+
+
+def _predict_each(images: List) -> List:
+    """Per-image fallback when a batched forward pass fails: one bad image only fails its own row."""
+    results = []
+    for image in images:
+        try:
+            results.append(predict_batch([image])[0])
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def detect_batch(decoded: List[Tuple[str, object, str]]) -> List[Dict]:
+    """Batched YOLO over already-decoded images; failed decodes, predictions and reports become error rows."""
+    valid = [(i, image) for i, (_, image, _) in enumerate(decoded) if image is not None]
+    images = [image for _, image in valid]
+    try:
+        results = list(predict_batch(images)) if valid else []
+        if len(results) != len(valid):
+            raise RuntimeError(f"batch inference returned {len(results)} results for {len(valid)} images")
+    except Exception as e:
+        print(f"⚠️ Batch of {len(valid)} images failed ({e}); retrying one by one")
+        results = _predict_each(images)
+
+    rows = {}
+    for (i, image), result in zip(valid, results):
+        name = decoded[i][0]
+        if isinstance(result, Exception):
+            rows[i] = _error_row(name, f"inference failed: {result}")
+            continue
+        try:
+            kept, report = analyze_result(result, image.shape)
+        except Exception as e:
+            rows[i] = _error_row(name, f"analysis failed: {e}")
+            continue
+        rows[i] = {"file": name, "detected_disease": report["primary_diagnosis"], "detections": kept, "report": report, "error": None}
+
+    return [rows.get(i) or _error_row(name, error) for i, (name, _, error) in enumerate(decoded)]
+
+
+def detect_images(items: List[Tuple[str, bytes]], batch_size: int = BATCH_SIZE) -> List[Dict]:
+    """In-memory variant used by `POST /detect/batch`: decode + batched inference, input order kept."""
+    rows = []
+    for chunk in _chunks(items, batch_size):
+        decoded = [_load_and_decode((name, lambda data=data: data)) for name, data in chunk]
+        rows.extend(detect_batch(decoded))
+    return rows
+
+
+def stream_detections(source: Path, batch_size: int = BATCH_SIZE, decode_workers: int = 4) -> Iterator[Dict]:
+    """
+    Yield one row per image. Decoding of the next batch overlaps with
+    inference on the current one, and at most two batches are held in memory.
+    """
+    with ThreadPoolExecutor(max_workers=decode_workers, thread_name_prefix="decode") as pool:
+        pending = None
+        for chunk in _chunks(iter_source(source), batch_size):
+            submitted = pool.map(_load_and_decode, chunk)
+            if pending is not None:
+                yield from detect_batch(list(pending))
+            pending = submitted
+        if pending is not None:
+            yield from detect_batch(list(pending))
+
+
+def _csv_row(row: Dict) -> Dict:
+    report = row["report"] or {}
+    return {
+        "file": row["file"],
+        "detected_disease": row["detected_disease"],
+        "severity_level": report.get("severity_level"),
+        "primary_confidence": report.get("primary_confidence"),
+        "detections": len(row["detections"]),
+        "co_infections": ";".join(report.get("co_infections") or []),
+        "alert_type": report.get("alert_type"),
+        "error": row["error"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", type=Path, help="Directory of images (searched recursively) or a .zip archive")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--output", type=Path, default=None, help="Report path (default: detections.<format>)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--decode-workers", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    output = args.output or Path(f"detections.{args.format}")
+    total = failed = 0
+    start = time.perf_counter()
+
+    with open(output, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS) if args.format == "csv" else None
+        if writer:
+            writer.writeheader()
+
+        for row in stream_detections(args.source, args.batch_size, args.decode_workers):
+            total += 1
+            failed += row["error"] is not None
+            if writer:
+                writer.writerow(_csv_row(row))
+            else:
+                f.write(json.dumps(row) + "\n")
+            f.flush()
+
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"✅ {total} images ({failed} failed) in {elapsed:.2f}s — {rate:.2f} images/sec → {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
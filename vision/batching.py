@@ -0,0 +1,97 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+# --- CONFIGURATION ---
+# Off by default: batching only pays off when several uploads are in flight,
+# i.e. with the thread inference executor and INFERENCE_WORKERS > 1
+YOLO_BATCHING = os.getenv("YOLO_BATCHING", "0") == "1"
+YOLO_MAX_BATCH = int(os.getenv("YOLO_MAX_BATCH", "8"))
+YOLO_MAX_WAIT_MS = float(os.getenv("YOLO_MAX_WAIT_MS", "10"))
+
+
+class MicroBatcher:
+    """
+    Collects single-image requests from many threads into one batched forward pass.
+    A batch is flushed when it reaches `max_batch` images or the oldest request
+    has waited `max_wait_ms`, whichever comes first.
+    """
+
+    def __init__(self, infer_fn: Callable[[List], List], max_batch: int = YOLO_MAX_BATCH, max_wait_ms: float = YOLO_MAX_WAIT_MS):
+        self.infer_fn = infer_fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.items = 0
+        self.batch_size_counts: Dict[int, int] = {}
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="yolo-batcher", daemon=True)
+                    self._worker.start()
+
+    def submit(self, image) -> Future:
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((image, future))
+        return future
+
+    def predict(self, image):
+        """Blocking single-image call; returns that image's result object."""
+        return self.submit(image).result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            images = [image for image, _ in batch]
+            try:
+                results = list(self.infer_fn(images))
+                if len(results) != len(batch):
+                    raise RuntimeError(f"Batch inference returned {len(results)} results for {len(batch)} images")
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                # Every request in the batch must resolve, or its caller blocks forever
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+            with self._lock:
+                self.batches += 1
+                self.items += len(batch)
+                self.batch_size_counts[len(batch)] = self.batch_size_counts.get(len(batch), 0) + 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": True,
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait_s * 1000,
+                "batches": self.batches,
+                "images": self.items,
+                "avg_batch_size": round(self.items / self.batches, 2) if self.batches else None,
+                "batch_size_counts": dict(sorted(self.batch_size_counts.items())),
+                "pending": self._queue.qsize(),
+            }
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+# --- CONFIGURATION ---
+DETECTION_CACHE_SIZE = int(os.getenv("DETECTION_CACHE_SIZE", "256"))
+# Empty disables the on-disk tier
+DETECTION_CACHE_DIR = os.getenv("DETECTION_CACHE_DIR", "")
+DETECTION_CACHE_DISK_MB = float(os.getenv("DETECTION_CACHE_DISK_MB", "512"))
+
+
+class DetectionCache:
+    """
+    Content-addressed cache of finished detections (detections, report, annotated JPEG).
+
+    Keys hash the uploaded bytes together with a fingerprint of everything that
+    affects the output (model weights, thresholds), so a model or threshold
+    change never serves stale results. Memory tier is an LRU of `max_entries`;
+    the optional disk tier is bounded by total size and evicts least recently used files.
+    """
+
+    def __init__(self, fingerprint: str, max_entries: int = DETECTION_CACHE_SIZE, disk_dir: str = DETECTION_CACHE_DIR, disk_max_mb: float = DETECTION_CACHE_DISK_MB):
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = int(disk_max_mb * 1024 * 1024)
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(p.stat().st_size for p in self.disk_dir.glob("*") if p.is_file())
+
+    def key_for(self, image_bytes: bytes) -> str:
+        digest = hashlib.sha256(image_bytes)
+        digest.update(self.fingerprint.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._put_memory(key, entry)
+        return entry
+
+    def put(self, key: str, entry: Dict):
+        with self._lock:
+            self._put_memory(key, entry)
+        self._write_disk(key, entry)
+
+    def _put_memory(self, key: str, entry: Dict):
+        # Caller holds the lock
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.memory_evictions += 1
+
+    # --- disk tier ---
+
+    def _paths(self, key: str):
+        return self.disk_dir / f"{key}.json", self.disk_dir / f"{key}.jpg"
+
+    def _read_disk(self, key: str) -> Optional[Dict]:
+        if self.disk_dir is None:
+            return None
+        meta_path, image_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+            image_jpeg = image_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        # Refresh mtime so disk eviction is least-recently-used
+        for path in (meta_path, image_path):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return {**meta, "image_jpeg": image_jpeg}
+
+    def _write_disk(self, key: str, entry: Dict):
+        if self.disk_dir is None:
+            return
+        meta_path, image_path = self._paths(key)
+        meta = {k: v for k, v in entry.items() if k != "image_jpeg"}
+        try:
+            meta_bytes = json.dumps(meta).encode("utf-8")
+            image_path.write_bytes(entry["image_jpeg"])
+            meta_path.write_bytes(meta_bytes)
+        except (OSError, TypeError) as e:
+            print(f"⚠️ Detection cache write failed: {e}")
+            return
+        with self._lock:
+            self._disk_bytes += len(meta_bytes) + len(entry["image_jpeg"])
+            over_budget = self._disk_bytes > self.disk_max_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        files = [p for p in self.disk_dir.glob("*") if p.is_file()]
+        files.sort(key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        # Trim to 90% so we don't evict on every single write
+        target = int(self.disk_max_bytes * 0.9)
+        removed = 0
+        for path in files:
+            if total <= target:
+                break
+            try:
+                size = path.stat().st_size
+                path.unlink()
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+        with self._lock:
+            self._disk_bytes = total
+            self.disk_evictions += removed
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None,
+                "memory_evictions": self.memory_evictions,
+                "disk_evictions": self.disk_evictions,
+                "disk_enabled": self.disk_dir is not None,
+                "disk_bytes": self._disk_bytes,
+            }
+
+
+def detection_fingerprint() -> str:
+    """Everything besides the image bytes that changes a detection result."""
+    from vision.model import MODEL_VERSION
+    from vision import inference
+
+    return json.dumps({
+        "model": MODEL_VERSION,
+        "priority_labels": sorted(inference.HIGH_PRIORITY_DISEASES),
+        "priority_conf": inference.PRIORITY_CONF_THRESHOLD,
+        "conf": inference.CONF_THRESHOLD,
+        "overlap_iou": inference.OVERLAP_IOU_THRESHOLD,
+    }, sort_keys=True)
+
+
+detection_cache = DetectionCache(detection_fingerprint())
@@ -0,0 +1,125 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+# --- CONFIGURATION ---
+# "thread": each worker thread gets its own YOLO copy (models are not thread-safe); "process": one per worker process
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread").lower()
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Max requests running + waiting before new uploads get rejected with 429
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", str(INFERENCE_WORKERS * 4)))
+
+
+class InferenceBusyError(RuntimeError):
+    """Raised when the executor already holds INFERENCE_MAX_QUEUE jobs."""
+
+
+class InferenceExecutor:
+    """
+    Bounded pool that runs blocking vision work off the event loop.
+    Admission is checked up-front so a saturated pool fails fast instead of
+    building an unbounded backlog.
+    """
+
+    def __init__(self, kind: str = INFERENCE_EXECUTOR, workers: int = INFERENCE_WORKERS, max_queue: int = INFERENCE_MAX_QUEUE):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unsupported INFERENCE_EXECUTOR: {kind!r} (use 'thread' or 'process')")
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max(max_queue, workers)
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self.total_wait_ms = 0.0
+        self.total_run_ms = 0.0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.kind == "process":
+                        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        return self._pool
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def run(self, fn: Callable, *args):
+        """Run `fn(*args)` in the pool. Raises InferenceBusyError when saturated."""
+        with self._lock:
+            if self._in_flight >= self.max_queue:
+                self.rejected += 1
+                raise InferenceBusyError(
+                    f"Inference queue is full ({self._in_flight}/{self.max_queue}). Try again shortly."
+                )
+            self._in_flight += 1
+
+        submitted = time.perf_counter()
+        try:
+            future = self._get_pool().submit(_timed_call, fn, args)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        # The slot is freed when the job finishes, not when the caller stops waiting: a disconnected
+        # client cancels the await, but a started job keeps running in the pool and must keep counting
+        future.add_done_callback(lambda f: self._finish(f, submitted))
+        result, _ = await asyncio.wrap_future(future)
+        return result
+
+    def _finish(self, future: Future, submitted: float):
+        finished = time.perf_counter()
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self.failed += 1
+                return
+            _, started = future.result()
+            self.completed += 1
+            if self.kind == "thread":
+                # perf_counter is only comparable within one process; queue wait is measured by the worker itself
+                self.total_wait_ms += (started - submitted) * 1000
+                self.total_run_ms += (finished - started) * 1000
+            else:
+                self.total_run_ms += (finished - submitted) * 1000
+
+    def stats(self) -> Dict:
+        with self._lock:
+            done = self.completed or 1
+            return {
+                "kind": self.kind,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "failed": self.failed,
+                "avg_queue_wait_ms": round(self.total_wait_ms / done, 2),
+                "avg_run_ms": round(self.total_run_ms / done, 2),
+            }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def _timed_call(fn: Callable, args: tuple):
+    # Module-level so it can be pickled into process workers
+    started = time.perf_counter()
+    return fn(*args), started
+
+
+inference_executor = InferenceExecutor()
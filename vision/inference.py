@@ -1,11 +1,19 @@
+import time
 import cv2
 import numpy as np
-from typing import List, Dict, Tuple
-from vision.model import yolo_model
+from typing import List, Dict, Tuple, Optional
+from vision.model import class_names, get_yolo_model
+from vision.batching import MicroBatcher, YOLO_BATCHING
+from vision.nms import boxes_to_arrays, filter_and_resolve
 
 # --- CONFIGURATION ---
 # We treat Late Blight as "High Priority" due to its rapid spread
 HIGH_PRIORITY_DISEASES = {"Late Blight"}
+# Dynamic thresholding: Late Blight is shown even at 45% confidence
+PRIORITY_CONF_THRESHOLD = 0.45
+CONF_THRESHOLD = 0.60
+# Boxes overlapping a stronger box above this IoU are merged into its notes
+OVERLAP_IOU_THRESHOLD = 0.5
 
 # Treatment Dictionary for your specific 7 classes
 TREATMENT_ADVISOR = {
@@ -18,65 +26,62 @@ TREATMENT_ADVISOR = {
     "Healthy": "Plant looks great! Keep monitoring and maintain regular watering/fertilizing."
 }
 
-def iou(boxA, boxB):
-    xA = max(boxA["x1"], boxB["x1"])
-    yA = max(boxA["y1"], boxB["y1"])
-    xB = min(boxA["x2"], boxB["x2"])
-    yB = min(boxA["y2"], boxB["y2"])
-    interW, interH = max(0, xB - xA), max(0, yB - yA)
-    interArea = interW * interH
-    boxAArea = (boxA["x2"] - boxA["x1"]) * (boxA["y2"] - boxA["y1"]) 
-    boxBArea = (boxB["x2"] - boxB["x1"]) * (boxB["y2"] - boxB["y1"]) 
-    denom = boxAArea + boxBArea - interArea
-    return interArea / denom if denom > 0 else 0.0
-
-def run_yolo_inference(image_bytes: bytes):
-    # 1. Decode Image
+# Shared batcher: concurrent requests are merged into one YOLO forward pass
+yolo_batcher = MicroBatcher(lambda images: get_yolo_model()(images)) if YOLO_BATCHING else None
+
+def predict(image):
+    """Run YOLO on one decoded image and return its result object."""
+    if yolo_batcher is not None:
+        return yolo_batcher.predict(image)
+    return get_yolo_model()(image)[0]
+
+def decode_image(image_bytes: bytes):
     np_arr = np.frombuffer(image_bytes, np.uint8)
     image = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
     if image is None:
         raise ValueError("Failed to decode image")
-    h, w = image.shape[:2]
+    return image
+
+def predict_batch(images: List) -> List:
+    """One YOLO forward pass over a list of decoded images (already batched, so no batcher)."""
+    return get_yolo_model()(images, verbose=False)
+
+def run_yolo_inference(image_bytes: bytes, timings: Optional[Dict[str, float]] = None):
+    # Optional per-stage timings (ms) are written into `timings` when given
+    if timings is None:
+        timings = {}
+    start = time.perf_counter()
+
+    # 1. Decode Image
+    image = decode_image(image_bytes)
+    timings["decode_ms"] = (time.perf_counter() - start) * 1000
 
     # 2. YOLO Inference
-    results = yolo_model(image)
-    print(results)
-    result = results[0]
-    
-    raw_detections: List[Dict] = []
-    if result.boxes is not None:
-        for box in result.boxes:
-            cls_id = int(box.cls[0])
-            label = yolo_model.names[cls_id]
-            conf = float(box.conf[0])
-            x1, y1, x2, y2 = box.xyxy[0].tolist()
-
-            # Dynamic Thresholding: Late Blight is shown even at 45% confidence
-            threshold = 0.45 if label in HIGH_PRIORITY_DISEASES else 0.60
-            
-            if conf >= threshold:
-                raw_detections.append({
-                    "x1": x1, "y1": y1, "x2": x2, "y2": y2,
-                    "confidence": conf, "label": label,
-                    "notes": [], "is_priority": label in HIGH_PRIORITY_DISEASES
-                })
-
-    # 3. Conflict Resolution (Overlap Handling)
-    # Sort by confidence so we process strongest matches first
-    raw_detections.sort(key=lambda x: x["confidence"], reverse=True)
-    kept: List[Dict] = []
-    
-    for i, current in enumerate(raw_detections):
-        keep_current = True
-        for j, other in enumerate(kept):
-            if iou(current, other) > 0.5:
-                # If they overlap, add the "loser" to the "winner's" notes
-                if current["label"] != other["label"]:
-                    other["notes"].append(f"Symptoms also resemble {current['label']}")
-                keep_current = False
-                break
-        if keep_current:
-            kept.append(current)
+    start = time.perf_counter()
+    result = predict(image)
+    timings["inference_ms"] = (time.perf_counter() - start) * 1000
+
+    # 3-5. Detections + report
+    start = time.perf_counter()
+    kept, report = analyze_result(result, image.shape)
+    timings["postprocess_ms"] = (time.perf_counter() - start) * 1000
+
+    return image, kept, report
+
+def analyze_result(result, image_shape) -> Tuple[List[Dict], Dict]:
+    """Turn one YOLO result into the kept detections and the structured report."""
+    h, w = image_shape[:2]
+
+    # 3. Thresholding + Conflict Resolution (Overlap Handling), vectorized
+    xyxy, conf, cls = boxes_to_arrays(result.boxes)
+    kept: List[Dict] = filter_and_resolve(
+        xyxy, conf, cls,
+        names=class_names(),
+        priority_labels=HIGH_PRIORITY_DISEASES,
+        priority_threshold=PRIORITY_CONF_THRESHOLD,
+        default_threshold=CONF_THRESHOLD,
+        iou_threshold=OVERLAP_IOU_THRESHOLD,
+    )
 
     # 4. Analyze Results for Report
     if not kept:
@@ -92,7 +97,6 @@ def run_yolo_inference(image_bytes: bytes):
             primary_diag = max(diseases_found, key=lambda x: x["confidence"])["label"]
         
         count = len(diseases_found)
-        print("Number of diseases: ", count)
         
         total_disease_area = sum((d["x2"]-d["x1"])*(d["y2"]-d["y1"]) for d in diseases_found)
         coverage = total_disease_area / (w * h)
@@ -107,7 +111,6 @@ def run_yolo_inference(image_bytes: bytes):
 
     # 5. Build Final Report
     co_infections = list(set([d["label"] for d in kept if d["label"] != primary_diag and d["label"] != "Healthy"]))
-    print(primary_diag)
     
     # --- Aggregate confidence per disease ---
     disease_conf_map = {}
@@ -138,7 +141,4 @@ def run_yolo_inference(image_bytes: bytes):
         "treatment_steps": TREATMENT_ADVISOR.get(primary_diag, "Monitor plant health."),
         "alert_type": "EMERGENCY" if primary_diag == "Late_blight" else "STANDARD"
     }
-    print("kept: ",kept)
-    print("report: ",report)
-
-    return image, kept, report
\ No newline at end of file
+    return kept, report
\ No newline at end of file
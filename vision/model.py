@@ -1,5 +1,6 @@
+import threading
 from pathlib import Path
-from ultralytics import YOLO
+from vision.backends import load_model, VISION_BACKEND
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 MODEL_PATH = BASE_DIR / "models" / "tomato_leaf_disease_detector_v1.pt"
@@ -7,6 +8,63 @@ MODEL_PATH = BASE_DIR / "models" / "tomato_leaf_disease_detector_v1.pt"
 if not MODEL_PATH.exists():
     raise FileNotFoundError(f"YOLO model not found at {MODEL_PATH}")
 
-yolo_model = YOLO(str(MODEL_PATH))
+# Identifies the loaded weights, e.g. for cache keys; changes when the file or backend changes
+_model_stat = MODEL_PATH.stat()
+MODEL_VERSION = f"{MODEL_PATH.name}:{_model_stat.st_size}:{int(_model_stat.st_mtime)}:{VISION_BACKEND}"
 
-# This file keeps preventing reloading model on every request
\ No newline at end of file
+# Ultralytics models keep per-call predictor state and are not thread-safe, so every thread
+# that runs inference gets its own copy (process workers have one thread, hence one copy)
+_thread_local = threading.local()
+_loaded_models = []  # every copy loaded in this process
+_spare_models = []   # warmed copies not yet claimed by a thread
+_model_lock = threading.Lock()
+
+
+def _load_copy():
+    model = load_model(VISION_BACKEND, MODEL_PATH)
+    with _model_lock:
+        _loaded_models.append(model)
+    return model
+
+
+def get_yolo_model():
+    """
+    The calling thread's detector, loaded on its first use (or taken from the copies warmed at API start-up).
+    PyTorch by default; VISION_BACKEND=onnx / onnx-int8 / openvino serves an exported copy.
+    """
+    model = getattr(_thread_local, "model", None)
+    if model is None:
+        with _model_lock:
+            model = _spare_models.pop() if _spare_models else None
+        if model is None:
+            model = _load_copy()
+        _thread_local.model = model
+    return model
+
+
+def warm_yolo_models(copies: int = 1):
+    """Preload `copies` detectors for inference threads to claim, so none loads on a request."""
+    for _ in range(copies - len(_loaded_models)):
+        model = _load_copy()
+        with _model_lock:
+            _spare_models.append(model)
+
+
+def class_names():
+    """Label names of the detector, without loading a copy for a thread that only post-processes."""
+    with _model_lock:
+        model = _loaded_models[0] if _loaded_models else None
+    return (model or get_yolo_model()).names
+
+
+def is_model_loaded() -> bool:
+    return bool(_loaded_models)
+
+
+def __getattr__(name):
+    # Keeps `from vision.model import yolo_model` working (loads on access)
+    if name == "yolo_model":
+        return get_yolo_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# This file keeps preventing reloading model on every request
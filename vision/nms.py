@@ -0,0 +1,124 @@
+import numpy as np
+from typing import Dict, List, Mapping, Set, Tuple
+
+
+def iou(boxA, boxB):
+    xA = max(boxA["x1"], boxB["x1"])
+    yA = max(boxA["y1"], boxB["y1"])
+    xB = min(boxA["x2"], boxB["x2"])
+    yB = min(boxA["y2"], boxB["y2"])
+    interW, interH = max(0, xB - xA), max(0, yB - yA)
+    interArea = interW * interH
+    boxAArea = (boxA["x2"] - boxA["x1"]) * (boxA["y2"] - boxA["y1"])
+    boxBArea = (boxB["x2"] - boxB["x1"]) * (boxB["y2"] - boxB["y1"])
+    denom = boxAArea + boxBArea - interArea
+    return interArea / denom if denom > 0 else 0.0
+
+
+def _to_numpy(values) -> np.ndarray:
+    # Ultralytics gives torch tensors (possibly on GPU); other backends give arrays
+    if hasattr(values, "cpu"):
+        values = values.cpu().numpy()
+    return np.asarray(values)
+
+
+def boxes_to_arrays(boxes) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(xyxy, conf, cls) arrays straight from a YOLO `Boxes` object, no per-box conversion."""
+    if boxes is None or len(boxes) == 0:
+        return np.zeros((0, 4)), np.zeros(0), np.zeros(0, dtype=np.int64)
+    xyxy = _to_numpy(boxes.xyxy).astype(np.float64).reshape(-1, 4)
+    conf = _to_numpy(boxes.conf).astype(np.float64).reshape(-1)
+    cls = _to_numpy(boxes.cls).astype(np.int64).reshape(-1)
+    return xyxy, conf, cls
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between (n, 4) and (m, 4) xyxy boxes; same arithmetic as `iou`."""
+    xA = np.maximum(a[:, None, 0], b[None, :, 0])
+    yA = np.maximum(a[:, None, 1], b[None, :, 1])
+    xB = np.minimum(a[:, None, 2], b[None, :, 2])
+    yB = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.maximum(0, xB - xA) * np.maximum(0, yB - yA)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    denom = area_a[:, None] + area_b[None, :] - inter
+    out = np.zeros_like(inter)
+    np.divide(inter, denom, out=out, where=denom > 0)
+    return out
+
+
+def filter_and_resolve(
+    xyxy: np.ndarray,
+    conf: np.ndarray,
+    cls: np.ndarray,
+    names: Mapping[int, str],
+    priority_labels: Set[str],
+    priority_threshold: float,
+    default_threshold: float,
+    iou_threshold: float,
+) -> List[Dict]:
+    """
+    Confidence thresholding + greedy overlap suppression on arrays.
+
+    Boxes are visited in descending confidence; a box overlapping an already
+    kept box above `iou_threshold` is dropped and, if its label differs, noted
+    on the first kept box it overlaps ("Symptoms also resemble ...").
+    """
+    if len(conf) == 0:
+        return []
+    if not isinstance(names, Mapping):
+        names = dict(enumerate(names))
+
+    # Per-class lookup tables instead of per-box dict lookups
+    num_classes = max(max(names) + 1, int(cls.max()) + 1)
+    labels_by_id = np.array([names.get(i, str(i)) for i in range(num_classes)], dtype=object)
+    priority_by_id = np.array([label in priority_labels for label in labels_by_id], dtype=bool)
+
+    # 1. Dynamic thresholding
+    is_priority = priority_by_id[cls]
+    thresholds = np.where(is_priority, priority_threshold, default_threshold)
+    mask = conf >= thresholds
+    if not mask.any():
+        return []
+
+    # 2. Stable descending sort == list.sort(key=conf, reverse=True)
+    idx = np.flatnonzero(mask)
+    idx = idx[np.argsort(-conf[idx], kind="stable")]
+    boxes = xyxy[idx]
+    scores = conf[idx]
+    class_ids = cls[idx]
+    n = len(idx)
+
+    # 3. Greedy suppression: only kept boxes are iterated, each suppresses
+    #    every later, still-alive box it overlaps
+    overlaps = iou_matrix(boxes, boxes) > iou_threshold
+    positions = np.arange(n)
+    suppressed = np.zeros(n, dtype=bool)
+    owner = np.full(n, -1, dtype=np.int64)
+    kept_positions = []
+    for i in range(n):
+        if suppressed[i]:
+            continue
+        kept_positions.append(i)
+        newly = overlaps[i] & ~suppressed & (positions > i)
+        owner[newly] = i
+        suppressed |= newly
+
+    detections_by_position = {}
+    for i in kept_positions:
+        label = labels_by_id[class_ids[i]]
+        x1, y1, x2, y2 = boxes[i].tolist()
+        detections_by_position[i] = {
+            "x1": x1, "y1": y1, "x2": x2, "y2": y2,
+            "confidence": float(scores[i]), "label": label,
+            "notes": [], "is_priority": bool(priority_by_id[class_ids[i]])
+        }
+
+    # 4. Note attribution, in the order the suppressed boxes were visited
+    for j in np.flatnonzero(suppressed).tolist():
+        winner = detections_by_position[int(owner[j])]
+        loser_label = labels_by_id[class_ids[j]]
+        if loser_label != winner["label"]:
+            winner["notes"].append(f"Symptoms also resemble {loser_label}")
+
+    return [detections_by_position[i] for i in kept_positions]
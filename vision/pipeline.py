@@ -0,0 +1,65 @@
+import time
+from typing import Dict
+
+import cv2
+import numpy as np
+
+from vision.inference import run_yolo_inference, decode_image
+from vision.utils import draw_boxes
+
+
+def process_image(image_bytes: bytes) -> Dict:
+    """
+    Full synchronous detection pipeline for one upload:
+    decode -> YOLO -> report -> draw boxes -> JPEG encode.
+    Runs inside the inference executor, never on the event loop.
+    """
+    timings: Dict[str, float] = {}
+    total_start = time.perf_counter()
+
+    # 1️⃣ Run YOLO inference (supports 3- or 4-value return)
+    inference_result = run_yolo_inference(image_bytes, timings=timings)
+    if not isinstance(inference_result, tuple):
+        raise ValueError("run_yolo_inference did not return a tuple as expected")
+
+    if len(inference_result) == 3:
+        first, second, third = inference_result
+        if isinstance(first, np.ndarray):
+            # Current signature: (image, detections, report)
+            image, detections, report = first, second, third
+            detected_disease = (report or {}).get("primary_diagnosis", "Healthy")
+        elif isinstance(first, str):
+            # Legacy signature: (detected_disease, detections, image)
+            detected_disease, detections, image = first, second, third
+            report = None
+        else:
+            raise ValueError("Unsupported return signature from run_yolo_inference (len=3)")
+    else:
+        raise ValueError(f"run_yolo_inference returned unexpected tuple length {len(inference_result)}")
+
+    # 2️⃣ Ensure image is a numpy array and draw bounding boxes
+    start = time.perf_counter()
+    if image is None or not hasattr(image, "shape"):
+        # Fallback: decode again from the original bytes
+        image = decode_image(image_bytes)
+    annotated_img = draw_boxes(image, detections)
+    timings["draw_ms"] = (time.perf_counter() - start) * 1000
+
+    if annotated_img is None:
+        raise ValueError("Annotated image is empty")
+
+    # 3️⃣ Encode annotated image as JPEG
+    start = time.perf_counter()
+    ok, buffer = cv2.imencode('.jpg', annotated_img)
+    if not ok:
+        raise RuntimeError("cv2.imencode failed")
+    timings["encode_ms"] = (time.perf_counter() - start) * 1000
+    timings["total_ms"] = (time.perf_counter() - total_start) * 1000
+
+    return {
+        "detected_disease": detected_disease,
+        "detections": detections,
+        "report": report,
+        "image_jpeg": buffer.tobytes(),
+        "timings": {k: round(v, 2) for k, v in timings.items()},
+    }